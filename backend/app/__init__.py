@@ -1,31 +1,82 @@
 from flask import Flask
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from app.config import Config
-from app.extensions import db
-from flask_jwt_extended import JWTManager
 
-def create_app():
+from app.extensions import db, jwt
+
+def create_app(config_class=Config):
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(config_class)
+
+    # Behind N reverse proxies the client address comes from X-Forwarded-For
+    # (rate limits key on it); 0 trusts no forwarded headers
+    proxies = app.config.get('TRUSTED_PROXIES', 0)
+    if proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
 
     # Initialize Plugins
+    from app.services import database, json_provider
+    json_provider.init_app(app)
+    database.configure_engine(app)
     db.init_app(app)
-    JWTManager(app)
+    database.init_app(app)
+    # Schema changes go through migrations (`flask init-db` / `flask db upgrade`), never
+    # at boot. FAST_STARTUP skips loading Flask-Migrate (and alembic) for serving;
+    # `flask init-db` still works, it loads them itself.
+    if not app.config.get('FAST_STARTUP', False):
+        database.init_migrations(app)
+    app.cli.add_command(database.init_db_command)
+    jwt.init_app(app)
     CORS(app, supports_credentials=True)
 
-    with app.app_context():
-        # This now works because of Step 3!
-        from app.models import User
-        db.create_all()
+    from app.services.availability import availability_cache
+    from app.services.background import background
+    from app.services.google_tokens import token_manager
+    from app.services.jobs import job_runner
+    from app.services.llm_cache import llm_cache
+    from app.services.outbound import outbound
+    from app.services.recurrence import expansion_cache
+    availability_cache.init_app(app)
+    background.init_app(app)
+    token_manager.init_app(app)
+    job_runner.init_app(app)
+    llm_cache.init_app(app)
+    outbound.init_app(app)
+    expansion_cache.init_app(app)
+
+    from app.services import identity
+    from app.services.passwords import password_hasher
+    from app.services.ratelimit import login_limiter
+    identity.init_app(app)
+    password_hasher.init_app(app)
+    login_limiter.init_app(app)
+
+    from app.services.sync import init_change_tracking
+    init_change_tracking()
+
+    from app.services.reminders import reminder_scheduler
+    reminder_scheduler.init_app(app)
+
+    from app.services import metrics
+    metrics.init_app(app)
+
+    from app.services.warmup import pool_warmer
+    pool_warmer.init_app(app)
+
+    # Models must be imported so migrations (and create_all in tests) see them
+    from app import models  # noqa: F401
 
     from app.routes.auth import auth_bp
     from app.routes.tasks import tasks_bp
     from app.routes.calendar import calendar_bp
     from app.routes.ai import ai_bp
+    from app.routes.metrics import metrics_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(tasks_bp)
     app.register_blueprint(calendar_bp)
     app.register_blueprint(ai_bp)
+    app.register_blueprint(metrics_bp)
     
     return app
\ No newline at end of file
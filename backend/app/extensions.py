@@ -3,4 +3,4 @@ from flask_jwt_extended import JWTManager
 
 # Initialize these here (not in __init__.py)
 db = SQLAlchemy()
-jwt = JWTManager()
\ No newline at end of file
+jwt = JWTManager()
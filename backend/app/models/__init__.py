@@ -1,2 +1,4 @@
 from .user import User
-from .task import Task
\ No newline at end of file
+from .task import Task
+from .tombstone import TaskTombstone
+from .calendar_event import CalendarEvent
\ No newline at end of file
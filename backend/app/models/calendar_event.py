@@ -0,0 +1,33 @@
+from app.extensions import db
+
+class CalendarEvent(db.Model):
+    """Local mirror of a Google Calendar event (see services/calendar_sync.py)."""
+    __tablename__ = 'calendar_events'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'google_id', name='uq_calendar_events_user_google_id'),
+        db.Index('ix_calendar_events_user_start', 'user_id', 'start'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    google_id = db.Column(db.String(255), nullable=False)
+
+    summary = db.Column(db.Text, nullable=True)
+    start = db.Column(db.DateTime, nullable=False)  # UTC
+    end = db.Column(db.DateTime, nullable=False)    # UTC
+    all_day = db.Column(db.Boolean, default=False)
+    # 'opaque' blocks time, 'transparent' shows as free (same as freeBusy)
+    transparency = db.Column(db.String(20), default='opaque')
+    html_link = db.Column(db.Text, nullable=True)
+    updated = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        """Helper to convert the event to JSON"""
+        return {
+            'id': self.google_id,
+            'summary': self.summary,
+            'start': self.start.isoformat(),
+            'end': self.end.isoformat(),
+            'all_day': self.all_day,
+            'link': self.html_link
+        }
@@ -3,10 +3,20 @@ from datetime import datetime
 
 class Task(db.Model):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Listing filters by user, then status/deadline; keyset paging sorts by these
+        db.Index('ix_tasks_user_status_deadline', 'user_id', 'status', 'deadline'),
+        db.Index('ix_tasks_user_created', 'user_id', 'created_at'),
+        db.Index('ix_tasks_user_version', 'user_id', 'version'),
+    )
+
+    # Columns the API may return (and that `fields=` may select)
+    API_FIELDS = ('id', 'description', 'priority', 'deadline', 'estimated_duration',
+                  'status', 'scheduled_start', 'scheduled_end', 'recurrence_rule', 'reminder_minutes')
 
     id = db.Column(db.Integer, primary_key=True)
     # Link to the User table
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     
     # Task Details
     description = db.Column(db.Text, nullable=False)
@@ -20,17 +30,22 @@ class Task(db.Model):
     scheduled_end = db.Column(db.DateTime, nullable=True)
     google_event_id = db.Column(db.String(255), nullable=True)
 
+    # Recurrence: one RRULE string per task, expanded on demand (services/recurrence.py)
+    recurrence_rule = db.Column(db.String(255), nullable=True)
+    recurrence_start = db.Column(db.DateTime, nullable=True)
+
+    # Reminder lead time, and the due time of the last reminder sent (services/reminders.py)
+    reminder_minutes = db.Column(db.Integer, nullable=True)
+    reminder_sent_through = db.Column(db.DateTime, nullable=True)
+
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # User's change version when this row last changed (see services/sync.py)
+    version = db.Column(db.Integer, nullable=True, default=0)
 
     def to_dict(self):
-        """Helper to convert the task to JSON"""
-        return {
-            'id': self.id,
-            'description': self.description,
-            'priority': self.priority,
-            'deadline': self.deadline.isoformat() if self.deadline else None,
-            'estimated_duration': self.estimated_duration,
-            'status': self.status,
-            'scheduled_start': self.scheduled_start.isoformat() if self.scheduled_start else None,
-            'scheduled_end': self.scheduled_end.isoformat() if self.scheduled_end else None
-        }
\ No newline at end of file
+        """Helper to convert the task to JSON (datetimes are encoded by app.json as ISO 8601)"""
+        return {field: getattr(self, field) for field in self.API_FIELDS}
+
+    def recurrence_anchor(self):
+        """First occurrence of the rule: explicit start, else the schedule, deadline or creation time."""
+        return self.recurrence_start or self.scheduled_start or self.deadline or self.created_at
\ No newline at end of file
@@ -0,0 +1,15 @@
+from app.extensions import db
+from datetime import datetime
+
+class TaskTombstone(db.Model):
+    """Remembers deleted tasks so delta sync can tell clients to drop them."""
+    __tablename__ = 'task_tombstones'
+    __table_args__ = (
+        db.Index('ix_task_tombstones_user_version', 'user_id', 'version'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    task_id = db.Column(db.Integer, nullable=False)
+    version = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -1,5 +1,5 @@
 from app.extensions import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.services.passwords import password_hasher
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -11,9 +11,23 @@ class User(db.Model):
     preferences = db.Column(db.JSON, nullable=True)
     google_access_token = db.Column(db.Text, nullable=True)
     google_refresh_token = db.Column(db.Text, nullable=True)
+    google_token_expires_at = db.Column(db.DateTime, nullable=True)  # UTC
+
+    # Incremental Google Calendar sync state (services/calendar_sync.py)
+    google_sync_token = db.Column(db.Text, nullable=True)
+    calendar_synced_at = db.Column(db.DateTime, nullable=True)
+
+    # Bumped on every task create/update/delete (ETags and delta sync)
+    task_version = db.Column(db.Integer, nullable=True, default=0)
+    # Tombstones up to this version may be pruned; older delta clients must resync in full
+    tombstones_pruned_through = db.Column(db.Integer, nullable=True, default=0)
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """True if the hash predates the current PASSWORD_HASH_METHOD."""
+        return password_hasher.needs_rehash(self.password_hash)
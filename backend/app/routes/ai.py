@@ -1,56 +1,78 @@
-from flask import Blueprint, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.services.ai import generate_suggestions
-from app.models import Task, User
+import json
+import logging
+import time
 from datetime import datetime, timedelta
-import requests
 
-ai_bp = Blueprint('ai', __name__, url_prefix='/api/ai')
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
+from flask_jwt_extended import jwt_required
+from app.extensions import db
+from app.services.ai import SuggestionStreamError, stream_suggestions, write_reasons
+from app.services.availability import availability_window
+from app.services.background import background
+from app.services.calendar_sync import lookup_busy_slots
+from app.services.google_tokens import token_manager
+from app.services.identity import current_user_id, load_current_user
+from app.services.jobs import QueueFullError, job_runner
+from app.services.llm_cache import llm_cache
+from app.services.metrics import metrics
+from app.routes.metrics import check_metrics_token
+from app.services.scheduler import find_slots, plan_tasks
+from app.services.timeline import user_timezone, working_intervals
+from app.models import Task, User
 
-# --- HELPER: GET USER FROM DB ---
-def get_current_user():
-    user_id = get_jwt_identity()
-    return User.query.get(user_id)
+ai_bp = Blueprint('ai', __name__, url_prefix='/api/ai')
+logger = logging.getLogger(__name__)
 
 # --- HELPER: GET BUSY SLOTS ---
-def get_google_calendar_busy_slots(user):
-    """Fetches busy slots for the next 3 days from Google."""
-    if not user.google_access_token:
+def get_google_calendar_busy_slots(user, days=3):
+    """Fetches busy slots for the next `days` days from Google."""
+    token = token_manager.get_access_token(user)
+    if not token:
         return []
 
-    token = user.google_access_token
-    now = datetime.utcnow()
-    end = now + timedelta(days=3)
-    
-    headers = {'Authorization': f'Bearer {token}'}
-    body = {
-        "timeMin": now.isoformat() + 'Z',
-        "timeMax": end.isoformat() + 'Z',
-        "timeZone": "UTC",
-        "items": [{"id": "primary"}]
-    }
+    time_min, time_max = availability_window(days=days)
 
     try:
-        response = requests.post(
-            'https://www.googleapis.com/calendar/v3/freeBusy',
-            headers=headers,
-            json=body
-        )
-        if response.status_code == 200:
-            data = response.json()
-            return data.get('calendars', {}).get('primary', {}).get('busy', [])
+        status, busy_slots = lookup_busy_slots(user, token, time_min, time_max)
+        if status == 401:
+            # Revoked or expired early: one retry with a forced refresh
+            token = token_manager.renew(user, token)
+            if token:
+                status, busy_slots = lookup_busy_slots(user, token, time_min, time_max)
+        if status == 200:
+            return busy_slots
     except Exception as e:
-        print(f"Calendar Error: {e}")
+        logger.warning("Calendar error: %s", e)
     
     return []
 
+
+# --- HELPER: WORKING HOURS ---
+def user_hours(user, days=3):
+    """(working hours as naive UTC intervals for the next `days` days, timezone) from User.preferences."""
+    # From midnight (UTC) with a day of slack at the end: the same all day long, so
+    # cache keys built from it stay stable; the scheduler clips it to its own window
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    hours = working_intervals(user.preferences, today, today + timedelta(days=days + 2))
+    return hours, user_timezone(user.preferences)
+
+
+def busy_slots_for_user(user_id, days=3):
+    """Same as get_google_calendar_busy_slots, by id (runs in its own app context)."""
+    user = db.session.get(User, user_id)
+    return get_google_calendar_busy_slots(user, days=days) if user else []
+
+
 @ai_bp.route('/suggest', methods=['POST'])
 @jwt_required()
 def suggest_task_time():
-    current_user = get_current_user()
+    current_user = load_current_user()
     if not current_user:
         return jsonify({"error": "User not found"}), 404
 
+    # Start the calendar lookup (network) while the task loads; an unknown task wastes it
+    busy_future = background.submit(busy_slots_for_user, current_user.id)
+
     data = request.get_json()
     task_id = data.get('task_id')
     
@@ -58,15 +80,184 @@ def suggest_task_time():
     if not task or task.user_id != current_user.id:
         return jsonify({"error": "Task not found"}), 404
 
-    # 1. Get Real Busy Slots from Google
-    busy_slots = get_google_calendar_busy_slots(current_user)
-    
-    # 2. Ask Gemini
-    # (The generate_suggestions function in services/ai.py handles the logic)
-    suggestion_json = generate_suggestions(task, busy_slots)
+    # Nothing else needs the DB here: free the connection while we wait
+    db.session.close()
+    return jsonify(build_suggestions(current_user, task, busy_slots=busy_future.result())), 200
+
+
+def build_suggestions(user, task, busy_slots=None):
+    """Suggestion payload for one task (shared by the sync and queued paths)."""
+    # 1. Get Real Busy Slots from Google (unless the caller already has them)
+    if busy_slots is None:
+        busy_slots = get_google_calendar_busy_slots(user)
     
-    if not suggestion_json:
-        return jsonify({"error": "AI failed to generate suggestions"}), 500
+    # 2. Pick slots locally (pure interval arithmetic, no network), in the user's working hours
+    hours, tz = user_hours(user)
+    slots = find_slots(
+        task,
+        busy_slots,
+        limit=current_app.config.get('AI_SUGGESTION_COUNT', 3),
+        hours=hours,
+        tz=tz
+    )
+
+    # 3. Optionally let Gemini phrase the reasons
+    if current_app.config.get('AI_LLM_REASONS', False):
+        # Give the pooled DB connection back before a possibly slow LLM call;
+        # the loaded task attributes stay readable
+        db.session.close()
+        slots = write_reasons(task, slots)
+
+    # 4. Same shape the frontend already parses: {"suggestions": [...]}
+    return {"suggestions": {"suggestions": slots}}
+
+
+# --- HELPER: SERVER-SENT EVENT ---
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@ai_bp.route('/suggest/stream', methods=['POST'])
+@jwt_required()
+def stream_task_suggestions():
+    """
+    Same input as /suggest, answered as Server-Sent Events: one `suggestion`
+    event per slot as soon as Gemini has finished writing it, then `done`.
+    Without Gemini (or if it fails before the first suggestion) the local
+    scheduler's slots are sent instead.
+    """
+    started = time.perf_counter()
+
+    current_user = load_current_user()
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+
+    busy_future = background.submit(busy_slots_for_user, current_user.id)
+
+    data = request.get_json()
+    task = Task.query.get(data.get('task_id'))
+    if not task or task.user_id != current_user.id:
+        return jsonify({"error": "Task not found"}), 404
+
+    hours, tz = user_hours(current_user)
+    # The stream can stay open for seconds; don't hold a DB connection meanwhile
+    db.session.close()
+    busy_slots = busy_future.result()
+
+    def events():
+        sent = 0
+        source = 'llm'
+        try:
+            for suggestion in stream_suggestions(task, busy_slots, hours):
+                if not sent:
+                    metrics.observe('ai_time_to_first_suggestion_seconds', time.perf_counter() - started, source=source)
+                sent += 1
+                yield sse('suggestion', suggestion)
+        except SuggestionStreamError as e:
+            if sent:
+                yield sse('error', {"error": str(e)})
+            else:
+                source = 'local'
+                for slot in find_slots(task, busy_slots, limit=current_app.config.get('AI_SUGGESTION_COUNT', 3),
+                                       hours=hours, tz=tz):
+                    if not sent:
+                        metrics.observe('ai_time_to_first_suggestion_seconds', time.perf_counter() - started, source=source)
+                    sent += 1
+                    yield sse('suggestion', slot)
+
+        metrics.observe('ai_stream_duration_seconds', time.perf_counter() - started, source=source)
+        yield sse('done', {"count": sent, "source": source})
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def run_suggestion_job(user_id, task_id):
+    """Background version of build_suggestions (runs in a job worker)."""
+    user = User.query.get(user_id)
+    task = Task.query.get(task_id)
+    if not user or not task or task.user_id != user.id:
+        raise ValueError("Task not found")
+    return build_suggestions(user, task)
+
+
+@ai_bp.route('/suggest/async', methods=['POST'])
+@jwt_required()
+def submit_suggestion_job():
+    """Queues a suggestion request and returns a job id immediately."""
+    current_user = load_current_user()
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+
+    data = request.get_json()
+    task_id = data.get('task_id')
+
+    task = Task.query.get(task_id)
+    if not task or task.user_id != current_user.id:
+        return jsonify({"error": "Task not found"}), 404
+
+    # Same task already queued/running -> same job
+    try:
+        job_id = job_runner.submit(f"suggest:{task.id}", current_user.id,
+                                   run_suggestion_job, current_user.id, task.id)
+    except QueueFullError:
+        return jsonify({"error": "Too many pending AI requests, try again shortly"}), 503
+
+    return jsonify({"job_id": job_id, "status_url": f"/api/ai/jobs/{job_id}"}), 202
+
+
+@ai_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    """Status (queued/running/finished/failed) and, once done, the result."""
+    job = job_runner.get(job_id)
+    if not job or job['owner'] != str(current_user_id()):
+        return jsonify({"error": "Job not found"}), 404
+
+    return jsonify({
+        "job_id": job['id'],
+        "status": job['status'],
+        "result": job['result'],
+        "error": job['error']
+    }), 200
+
+
+@ai_bp.route('/plan', methods=['POST'])
+@jwt_required()
+def plan_pending_tasks():
+    """Schedules every Pending task in one pass (one DB query, one freeBusy call)."""
+    current_user = load_current_user()
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+
+    days = current_app.config.get('AI_PLAN_DAYS', 7)
+
+    # 1. All pending tasks in a single query
+    tasks = Task.query.filter_by(user_id=current_user.id, status='Pending').all()
+
+    # 2. Busy slots once for the whole planning window
+    busy_slots = get_google_calendar_busy_slots(current_user, days=days)
+
+    # 3. Pack everything without double-booking, inside the user's working hours
+    hours, tz = user_hours(current_user, days=days)
+    plan, unscheduled = plan_tasks(
+        tasks,
+        busy_slots,
+        days=days,
+        max_tasks=current_app.config.get('AI_PLAN_MAX_TASKS', 500),
+        hours=hours,
+        tz=tz
+    )
+
+    return jsonify({
+        "plan": plan,
+        "unscheduled": unscheduled,
+        "days": days
+    }), 200
+
 
-    # 3. Return Raw JSON (Frontend will parse it)
-    return jsonify({"suggestions": suggestion_json}), 200
\ No newline at end of file
+@ai_bp.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Hit rates of the Gemini response cache (shared by all users, so behind METRICS_TOKEN like /metrics)."""
+    check_metrics_token()
+    return jsonify({"llm_cache": llm_cache.stats()}), 200
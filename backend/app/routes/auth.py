@@ -1,7 +1,11 @@
 from flask import Blueprint, request, jsonify
 from app.models.user import User
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required, current_user
 from app import db
+from app.services.identity import identity_claims
+from app.services.metrics import metrics
+from app.services.passwords import HashingBusyError
+from app.services.ratelimit import login_limiter
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/api/auth')
 
@@ -18,7 +22,10 @@ def register():
         return jsonify({'message': 'Email already exists'}), 400
 
     new_user = User(email=email)
-    new_user.set_password(password)
+    try:
+        new_user.set_password(password)
+    except HashingBusyError:
+        return jsonify({'message': 'Server busy, try again shortly'}), 503
     
     db.session.add(new_user)
     db.session.commit()
@@ -31,10 +38,33 @@ def login():
     email = data.get('email')
     password = data.get('password')
 
+    # Throttle before any lookup or hashing happens
+    retry_after = login_limiter.check(request.remote_addr, email)
+    if retry_after is not None:
+        metrics.inc('auth_login_attempts_total', outcome='throttled')
+        response = jsonify({'message': 'Too many login attempts, try again later'})
+        response.headers['Retry-After'] = str(max(1, round(retry_after)))
+        return response, 429
+
     user = User.query.filter_by(email=email).first()
 
-    if user and user.check_password(password):
-        access_token = create_access_token(identity=str(user.id))
+    try:
+        valid = bool(user and password and user.check_password(password))
+    except HashingBusyError:
+        metrics.inc('auth_login_attempts_total', outcome='busy')
+        return jsonify({'message': 'Server busy, try again shortly'}), 503
+
+    if valid:
+        metrics.inc('auth_login_attempts_total', outcome='success')
+        # Upgrade hashes made with an older method/cost while we have the password
+        if user.password_needs_rehash():
+            try:
+                user.set_password(password)
+                db.session.commit()
+            except HashingBusyError:
+                pass
+
+        access_token = create_access_token(identity=str(user.id), additional_claims=identity_claims(user))
         return jsonify({
         "access_token": access_token,
         "user": {
@@ -43,7 +73,9 @@ def login():
         }
         }), 200
 
-    
+
+    metrics.inc('auth_login_attempts_total', outcome='invalid')
+    login_limiter.record_failure(request.remote_addr, email)
     return jsonify({'message': 'Invalid credentials'}), 401
 
 @auth_bp.route("/logout", methods=["POST"])
@@ -53,13 +85,8 @@ def logout():
 @auth_bp.route("/me", methods=["GET"])
 @jwt_required()
 def me():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user:
-        return jsonify({"message": "User not found"}), 404
-
+    # Resolved from the token (and the user cache), no query of its own
     return jsonify({
-        "id": user.id,
-        "email": user.email
+        "id": current_user.id,
+        "email": current_user.email
     }), 200
\ No newline at end of file
@@ -1,69 +1,57 @@
 from flask import Blueprint, redirect, request, jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
-import requests
+from flask_jwt_extended import current_user, jwt_required
 from app.extensions import db
-from app.models import User, Task
+from app.models import Task, CalendarEvent
+from app.services.availability import availability_cache, availability_window
+from app.services.calendar_sync import apply_event_changes, calendar_api_url, ensure_synced, lookup_busy_slots
+from app.services.google_batch import event_id_for, get_event, insert_events
+from app.services.google_tokens import token_manager
+from app.services.identity import load_current_user
+from app.services.outbound import circuit_open_error, outbound
+from app.services.timeline import (PreferencesError, build_timeline, parse_preferences, selected_calendars,
+                                   user_timezone, working_hours)
 from datetime import datetime, timedelta
 
 calendar_bp = Blueprint('calendar', __name__, url_prefix='/api/calendar')
 
-# --- HELPER: GET USER FROM DB ---
-def get_current_user():
-    user_id = get_jwt_identity()
-    return User.query.get(user_id)
-
-# --- HELPER: REFRESH GOOGLE TOKEN ---
-def refresh_google_token(user):
-    """Uses the long-lived refresh token to get a new access token."""
-    if not user.google_refresh_token:
-        return None
-
-    payload = {
-        'client_id': current_app.config['GOOGLE_CLIENT_ID'],
-        'client_secret': current_app.config['GOOGLE_CLIENT_SECRET'],
-        'refresh_token': user.google_refresh_token,
-        'grant_type': 'refresh_token'
-    }
-    
-    try:
-        response = requests.post(current_app.config['GOOGLE_TOKEN_URL'], data=payload)
-        tokens = response.json()
-        
-        if 'access_token' in tokens:
-            user.google_access_token = tokens['access_token']
-            db.session.commit()
-            return tokens['access_token']
-    except Exception as e:
-        print(f"Error refreshing token: {e}")
-    
-    return None
 
+# Registered on OSError, the base of requests' RequestException, so requests
+# need not be imported when the blueprint is
+@calendar_bp.errorhandler(OSError)
+def upstream_error(e):
+    """Google timed out, was unreachable or its circuit is open: a JSON error instead of a 500."""
+    from requests import RequestException
+
+    if not isinstance(e, RequestException):
+        raise e
+    if isinstance(e, circuit_open_error()):
+        return jsonify({"error": "Google Calendar is temporarily unavailable, try again shortly"}), 503
+    return jsonify({"error": "Google Calendar did not respond", "details": str(e)}), 502
 
 
 @calendar_bp.route('/status', methods=['GET'])
 @jwt_required()
 def get_connection_status():
     """Checks if the user has a valid Google Refresh Token."""
-    user = get_current_user()
-    if not user:
-        return jsonify({"connected": False}), 404
-        
     # If they have a refresh token, they are permanently connected
-    is_connected = bool(user.google_refresh_token)
-    return jsonify({"connected": is_connected})
+    # (cached with the identity, so this needs no query)
+    return jsonify({"connected": current_user.google_connected})
 
 
 # --- HELPER: GET VALID TOKEN ---
 def get_valid_token(user):
-    """Checks if access token exists, attempts refresh if needed."""
-    # 1. Check if user has any token
-    if not user.google_access_token:
-        return None
-    
-    # 2. In a real app, we check expiry time here.
-    # For now, we return the current token. If it fails (401),
-    # the calling function should handle the refresh logic or we do it proactively.
-    return user.google_access_token
+    """Access token that stays valid for a while (refreshed ahead of expiry)."""
+    return token_manager.get_access_token(user)
+
+
+# --- HELPER: PARSE TASK ID ---
+def parse_task_id(value):
+    """Task id from JSON: an int or a string of digits ("5"); None if it is neither."""
+    if isinstance(value, str) and value.strip().isdecimal():
+        return int(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
 
 
 # 1. GENERATE LOGIN URL
@@ -91,7 +79,7 @@ def get_google_auth_url():
 @calendar_bp.route('/auth/exchange', methods=['POST'])
 @jwt_required()
 def exchange_google_code():
-    current_user = get_current_user()
+    current_user = load_current_user()
     if not current_user:
         return jsonify({"error": "User not found"}), 404
 
@@ -111,18 +99,14 @@ def exchange_google_code():
     }
 
     try:
-        response = requests.post(current_app.config['GOOGLE_TOKEN_URL'], data=token_data)
+        response = outbound.post(current_app.config['GOOGLE_TOKEN_URL'], data=token_data, idempotent=False)
         tokens = response.json()
 
         if "error" in tokens:
             return jsonify({"error": tokens.get("error_description")}), 400
 
-        # Save tokens
-        current_user.google_access_token = tokens.get('access_token')
-        if tokens.get('refresh_token'):
-            current_user.google_refresh_token = tokens.get('refresh_token')
-        
-        db.session.commit()
+        # Save tokens (and when the access token expires)
+        token_manager.store(current_user, tokens)
 
         return jsonify({"message": "Google Calendar connected successfully!"}), 200
 
@@ -134,7 +118,7 @@ def exchange_google_code():
 @calendar_bp.route('/availability', methods=['GET'])
 @jwt_required()
 def get_availability():
-    current_user = get_current_user()
+    current_user = load_current_user()
     if not current_user:
         return jsonify({"error": "User not found"}), 404
 
@@ -143,49 +127,29 @@ def get_availability():
         return jsonify({"error": "Google Calendar not connected"}), 400
 
     # Range: Now to +3 Days (Matches AI logic)
-    now = datetime.utcnow()
-    end = now + timedelta(days=3)
-    
-    time_min = now.isoformat() + 'Z'
-    time_max = end.isoformat() + 'Z'
-
-    headers = {'Authorization': f'Bearer {token}'}
-    body = {
-        "timeMin": time_min,
-        "timeMax": time_max,
-        "timeZone": "UTC",
-        "items": [{"id": "primary"}]
-    }
+    time_min, time_max = availability_window(days=3)
 
-    # First Attempt
-    response = requests.post(
-        'https://www.googleapis.com/calendar/v3/freeBusy',
-        headers=headers,
-        json=body
-    )
+    # Local event mirror (or the cached freeBusy call when the mirror is off)
+    status, busy_slots = lookup_busy_slots(current_user, token, time_min, time_max)
 
-    # Retry if Unauthorized (Token Expired)
-    if response.status_code == 401:
-        new_token = refresh_google_token(current_user)
-        if new_token:
-            headers['Authorization'] = f'Bearer {new_token}'
-            response = requests.post(
-                'https://www.googleapis.com/calendar/v3/freeBusy',
-                headers=headers,
-                json=body
-            )
-        else:
-             return jsonify({"error": "Token expired, please reconnect calendar"}), 401
-
-    if response.status_code != 200:
+    # Retry once with a forced refresh (the token may have been revoked early)
+    if status == 401:
+        token = token_manager.renew(current_user, token)
+        status, busy_slots = lookup_busy_slots(current_user, token, time_min, time_max) if token else (401, None)
+    if status == 401:
+        token_manager.forget(current_user.id)
+        return jsonify({"error": "Token expired, please reconnect calendar"}), 401
+
+    if status != 200:
         return jsonify({"error": "Failed to fetch calendar data"}), 400
 
-    data = response.json()
-    busy_slots = data.get('calendars', {}).get('primary', {}).get('busy', [])
-    
+    # Busy/free/off timeline in the user's timezone and working hours
+    timeline = build_timeline(busy_slots, time_min, time_max, current_user.preferences)
     return jsonify({
         "time_range": {"start": time_min, "end": time_max},
-        "busy_slots": busy_slots
+        "calendars": list(selected_calendars(current_user.preferences)),
+        "busy_slots": busy_slots,
+        **timeline
     })
 
 
@@ -193,7 +157,7 @@ def get_availability():
 @calendar_bp.route('/schedule', methods=['POST'])
 @jwt_required()
 def schedule_task():
-    current_user = get_current_user()
+    current_user = load_current_user()
     if not current_user:
         return jsonify({"error": "User not found"}), 404
 
@@ -219,6 +183,8 @@ def schedule_task():
     if not end_time.endswith('Z'): end_time += 'Z'
 
     event_body = {
+        # Fixed id: a retry after a lost reply finds the event instead of duplicating it
+        "id": event_id_for(task.id, start_time),
         "summary": task.description,
         "description": "Scheduled via Productivity Planner",
         "start": {"dateTime": start_time},
@@ -226,41 +192,231 @@ def schedule_task():
     }
 
     # Send to Google
-    headers = {'Authorization': f'Bearer {token}'}
-    response = requests.post(
-        'https://www.googleapis.com/calendar/v3/calendars/primary/events',
-        headers=headers,
-        json=event_body
-    )
-
-    # Retry Logic
+    def insert(token):
+        return outbound.post(
+            f"{calendar_api_url()}/calendars/primary/events",
+            headers={'Authorization': f'Bearer {token}'},
+            json=event_body,
+            idempotent=False
+        )
+
+    response = insert(token)
+    # Retry once with a forced refresh; a 401 means nothing was created
     if response.status_code == 401:
-        new_token = refresh_google_token(current_user)
-        if new_token:
-            headers['Authorization'] = f'Bearer {new_token}'
-            response = requests.post(
-                'https://www.googleapis.com/calendar/v3/calendars/primary/events',
-                headers=headers,
-                json=event_body
-            )
-        else:
+        token = token_manager.renew(current_user, token)
+        if not token:
+            token_manager.forget(current_user.id)
             return jsonify({"error": "Token expired"}), 401
+        response = insert(token)
+    status = response.status_code
+    google_event = response.json() if status == 200 else None
+
+    # Created by an earlier attempt whose reply never arrived
+    if status == 409:
+        status, google_event = get_event(token, event_body['id'])
 
-    if response.status_code != 200:
-        return jsonify({"error": "Google Error", "details": response.text}), 400
+    if status == 401:
+        token_manager.forget(current_user.id)
+        return jsonify({"error": "Token expired"}), 401
 
-    google_event = response.json()
+    if status != 200:
+        return jsonify({"error": "Google Error", "details": google_event or response.text}), 400
 
     # Update DB
     task.status = 'Scheduled'
     task.scheduled_start = datetime.fromisoformat(start_time.replace('Z', ''))
     task.scheduled_end = datetime.fromisoformat(end_time.replace('Z', ''))
     task.google_event_id = google_event.get('id')
+
+    # Put the new event in the local mirror right away
+    apply_event_changes(current_user.id, [google_event])
     
     db.session.commit()
 
+    # The new event makes any cached free/busy for this user stale
+    availability_cache.invalidate_user(current_user.id)
+
     return jsonify({
         "message": "Task scheduled successfully", 
         "google_event_id": task.google_event_id,
         "link": google_event.get('htmlLink')
-    }), 200
\ No newline at end of file
+    }), 200
+
+
+# 4b. SCHEDULE MANY TASKS AT ONCE
+@calendar_bp.route('/schedule/batch', methods=['POST'])
+@jwt_required()
+def schedule_tasks_batch():
+    """
+    Body: {"items": [{"task_id", "start_time", "end_time"}, ...]}
+    All events go to Google in one batch request (CALENDAR_BATCH_SIZE per call) and
+    every successful task is updated in a single commit. Results are per item, in
+    request order; the response is 207 when only some items succeeded.
+    """
+    current_user = load_current_user()
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+
+    items = (request.get_json() or {}).get('items')
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "items must be a non-empty list"}), 400
+
+    limit = current_app.config.get('CALENDAR_BATCH_MAX', 100)
+    if len(items) > limit:
+        return jsonify({"error": f"At most {limit} items per batch"}), 400
+
+    token = get_valid_token(current_user)
+    if not token:
+        return jsonify({"error": "Google Calendar not connected"}), 401
+
+    # One query for every task in the batch
+    task_ids = [parse_task_id(item.get('task_id')) for item in items if isinstance(item, dict)]
+    tasks = {
+        task.id: task
+        for task in Task.query.filter(Task.id.in_([i for i in task_ids if i is not None]),
+                                      Task.user_id == current_user.id)
+    }
+
+    results = [None] * len(items)
+    pending = []  # (position, task, start, end, event_body)
+    seen = set()
+    for position, item in enumerate(items):
+        if not isinstance(item, dict) or not all([item.get('task_id'), item.get('start_time'), item.get('end_time')]):
+            results[position] = {"task_id": item.get('task_id') if isinstance(item, dict) else None,
+                                 "status": 400, "error": "Missing required fields"}
+            continue
+
+        task_id = parse_task_id(item['task_id'])
+        if task_id is None:
+            results[position] = {"task_id": item['task_id'], "status": 400, "error": "Invalid task_id"}
+            continue
+        if task_id in seen:
+            results[position] = {"task_id": task_id, "status": 400, "error": "Duplicate task_id in batch"}
+            continue
+        seen.add(task_id)
+
+        task = tasks.get(task_id)
+        if task is None:
+            results[position] = {"task_id": task_id, "status": 404, "error": "Task not found or unauthorized"}
+            continue
+
+        start_time, end_time = item['start_time'], item['end_time']
+        if not isinstance(start_time, str) or not isinstance(end_time, str):
+            results[position] = {"task_id": task.id, "status": 400, "error": "Invalid date format"}
+            continue
+        if not start_time.endswith('Z'): start_time += 'Z'
+        if not end_time.endswith('Z'): end_time += 'Z'
+        try:
+            start = datetime.fromisoformat(start_time.replace('Z', ''))
+            end = datetime.fromisoformat(end_time.replace('Z', ''))
+        except ValueError:
+            results[position] = {"task_id": task.id, "status": 400, "error": "Invalid date format"}
+            continue
+
+        pending.append((position, task, start, end, {
+            "id": event_id_for(task.id, start_time),
+            "summary": task.description,
+            "description": "Scheduled via Productivity Planner",
+            "start": {"dateTime": start_time},
+            "end": {"dateTime": end_time}
+        }))
+
+    responses = insert_events(token, [body for *_, body in pending]) if pending else {}
+
+    created = []
+    for index, (position, task, start, end, _) in enumerate(pending):
+        status, payload = responses[index]
+        if status != 200 or not isinstance(payload, dict):
+            results[position] = {"task_id": task.id, "status": status, "error": "Google Error", "details": payload}
+            continue
+
+        task.status = 'Scheduled'
+        task.scheduled_start = start
+        task.scheduled_end = end
+        task.google_event_id = payload.get('id')
+        created.append(payload)
+        results[position] = {"task_id": task.id, "status": 200,
+                             "google_event_id": task.google_event_id, "link": payload.get('htmlLink')}
+
+    if any(result['status'] == 401 for result in results):
+        token_manager.forget(current_user.id)
+
+    # Every scheduled task and its mirrored event in one transaction
+    if created:
+        apply_event_changes(current_user.id, created)
+        db.session.commit()
+        availability_cache.invalidate_user(current_user.id)
+
+    succeeded = len(created)
+    code = 200 if succeeded == len(items) else (207 if succeeded else 400)
+    return jsonify({"scheduled": succeeded, "failed": len(items) - succeeded, "results": results}), code
+
+
+# 5. LIST EVENTS (served from the local mirror)
+@calendar_bp.route('/events', methods=['GET'])
+@jwt_required()
+def get_events():
+    """Events between ?start and ?end (ISO, UTC). Defaults to the next 30 days."""
+    current_user = load_current_user()
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+
+    token = get_valid_token(current_user)
+    if not token:
+        return jsonify({"error": "Google Calendar not connected"}), 400
+
+    try:
+        start = datetime.fromisoformat(request.args['start'].replace('Z', '')) if request.args.get('start') \
+            else datetime.utcnow() - timedelta(days=1)
+        end = datetime.fromisoformat(request.args['end'].replace('Z', '')) if request.args.get('end') \
+            else start + timedelta(days=30)
+    except ValueError:
+        return jsonify({"error": "Invalid date format"}), 400
+
+    # Incremental sync (only changed events) when the mirror is stale
+    status = ensure_synced(current_user, token)
+    if status == 401:
+        token = token_manager.renew(current_user, token)
+        status = ensure_synced(current_user, token) if token else 401
+    if status == 401:
+        token_manager.forget(current_user.id)
+        return jsonify({"error": "Token expired, please reconnect calendar"}), 401
+    if status != 200 and not current_user.calendar_synced_at:
+        return jsonify({"error": "Failed to fetch calendar data"}), 400
+
+    events = CalendarEvent.query.filter(
+        CalendarEvent.user_id == current_user.id,
+        CalendarEvent.start < end,
+        CalendarEvent.end > start
+    ).order_by(CalendarEvent.start).all()
+
+    return jsonify([event.to_dict() for event in events]), 200
+
+
+# 6. CALENDAR SELECTION, TIMEZONE AND WORKING HOURS
+@calendar_bp.route('/preferences', methods=['GET', 'PUT'])
+@jwt_required()
+def calendar_preferences():
+    """
+    GET: the calendars availability reads from, the timezone and working hours.
+    PUT: any of {"calendars": [ids], "timezone": "Europe/Berlin",
+    "working_hours": {"start": "09:00", "end": "17:00", "days": [0, 1, 2, 3, 4]}}.
+    """
+    current_user = load_current_user()
+    if not current_user:
+        return jsonify({"error": "User not found"}), 404
+
+    if request.method == 'PUT':
+        try:
+            current_user.preferences = parse_preferences(request.get_json() or {}, current_user.preferences)
+        except PreferencesError as e:
+            return jsonify({"error": str(e)}), 400
+        db.session.commit()
+        availability_cache.invalidate_user(current_user.id)
+
+    start, end, days = working_hours(current_user.preferences)
+    return jsonify({
+        "calendars": list(selected_calendars(current_user.preferences)),
+        "timezone": user_timezone(current_user.preferences).key,
+        "working_hours": {"start": f"{start:%H:%M}", "end": f"{end:%H:%M}", "days": sorted(days)}
+    }), 200
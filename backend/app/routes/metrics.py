@@ -0,0 +1,25 @@
+from flask import Blueprint, Response, abort, current_app, jsonify, request
+from app.services.metrics import metrics, profiler
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+def check_metrics_token():
+    """If METRICS_TOKEN is configured, scrapers must send it as a bearer token."""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        abort(401)
+
+
+# Prometheus scrape endpoint
+@metrics_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    check_metrics_token()
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+# Hot stacks of the most recent slow requests (PROFILE_SLOW_REQUESTS=True)
+@metrics_bp.route('/metrics/profiles', methods=['GET'])
+def slow_request_profiles():
+    check_metrics_token()
+    return jsonify({"profiles": list(profiler.recent)})
@@ -1,18 +1,180 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import Blueprint, request, jsonify, current_app, make_response
+from flask_jwt_extended import jwt_required
+from sqlalchemy import and_, delete, or_, update
 from app.extensions import db
 from app.models import Task
-from datetime import datetime
+from app.services.identity import current_user_id
+from app.services.recurrence import RecurrenceError, expansion_cache, format_rule, occurrences, parse_rule
+from app.services.reminders import MAX_REMINDER_MINUTES, InAppDelivery, reminder_scheduler
+from app.services.sync import current_version, deleted_since, pruned_through, record_task_changes
+from datetime import datetime, timedelta
+import base64
+import hashlib
+import json
+from itertools import islice
 
 tasks_bp = Blueprint('tasks', __name__, url_prefix='/api/tasks')
 
+# --- HELPERS: LISTING ---
+SORT_COLUMNS = {'id': Task.id, 'created_at': Task.created_at, 'deadline': Task.deadline}
+NULLABLE_SORTS = {'deadline'}
+
+
+def encode_cursor(value, task_id):
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value, task_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor, sort_key):
+    value, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    if value is not None and sort_key in ('created_at', 'deadline'):
+        value = datetime.fromisoformat(value)
+    return value, int(task_id)
+
+
+def keyset_condition(column, nullable, descending, value, task_id):
+    """Rows strictly after (value, id) in the listing order (NULLs sort last)."""
+    after = column < value if descending else column > value
+    after_id = Task.id < task_id if descending else Task.id > task_id
+    if value is None:
+        return and_(column.is_(None), after_id)
+    condition = or_(after, and_(column == value, after_id))
+    return or_(column.is_(None), condition) if nullable else condition
+
+
+def versioned(response, etag, version):
+    response.set_etag(etag)
+    response.headers['X-Task-Version'] = str(version)
+    return response
+
+
+def serialize_row(row, fields):
+    """Plain dict from a column tuple, without building Task objects (app.json encodes the datetimes)."""
+    return dict(zip(fields, row))
+
+
+def serialize_rows(rows, fields, columnar=False):
+    """
+    List of row dicts, or with format=columns a table: field names once and
+    one array of values per row, {'fields': [...], 'rows': [[...], ...]}.
+    """
+    if not columnar:
+        return [serialize_row(row, fields) for row in rows]
+    width = len(fields)
+    return {'fields': fields, 'rows': [row[:width] for row in rows]}
+
+
 # 1. GET ALL TASKS
 @tasks_bp.route('', methods=['GET'])
 @jwt_required()
 def get_tasks():
+    """
+    Lists the user's tasks.
+    Optional: status/priority (comma separated), deadline_from/deadline_to,
+    sort (id, created_at, deadline; '-' prefix for descending),
+    fields (comma separated projection), limit + cursor (keyset paging),
+    since=<version> for a delta of changed rows and deleted ids (full_resync
+    with every row when tombstones that old were pruned),
+    format=columns to send every list of tasks as {fields, rows} arrays.
+    Without limit/cursor the full list is returned as before.
+    Responses carry an ETag; If-None-Match on an unchanged list gets a 304.
+    """
+    args = request.args
+    user_id = current_user_id()
+
+    # Cheap version check first: unchanged list -> 304 without touching tasks
+    version = current_version(user_id)
+    etag = f"{version}-{hashlib.md5(request.query_string).hexdigest()[:12]}"
+    if request.if_none_match.contains(etag):
+        return versioned(make_response('', 304), etag, version)
+
+    fields = args.get('fields')
+    fields = [f.strip() for f in fields.split(',') if f.strip()] if fields else list(Task.API_FIELDS)
+    unknown = [f for f in fields if f not in Task.API_FIELDS]
+    if unknown:
+        return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+    if args.get('format', 'objects') not in ('objects', 'columns'):
+        return jsonify({'error': 'Invalid format'}), 400
+    columnar = args.get('format') == 'columns'
+
+    sort = args.get('sort', 'id')
+    descending = sort.startswith('-')
+    sort_key = sort.lstrip('-')
+    if sort_key not in SORT_COLUMNS:
+        return jsonify({'error': 'Invalid sort'}), 400
+    sort_column = SORT_COLUMNS[sort_key]
+    nullable = sort_key in NULLABLE_SORTS
+
+    # Only load what we return, plus what the cursor needs
+    loaded = list(fields) + [f for f in ('id', sort_key) if f not in fields]
+
     # Only fetch tasks belonging to the logged-in user
-    tasks = Task.query.filter_by(user_id=get_jwt_identity()).all()
-    return jsonify([task.to_dict() for task in tasks]), 200
+    query = db.session.query(*[getattr(Task, f) for f in loaded]) \
+        .filter(Task.user_id == user_id)
+
+    # Delta mode: rows changed and ids deleted since the client's version
+    if 'since' in args:
+        try:
+            since = int(args['since'])
+        except ValueError:
+            return jsonify({'error': 'Invalid since'}), 400
+        # Tombstones older than `since` may be gone: send everything and let the client replace its copy
+        full_resync = since < pruned_through(user_id)
+        rows = (query if full_resync else query.filter(Task.version > since)).order_by(Task.id).all()
+        # A reused id that was deleted and created again is a change, not a deletion
+        changed_ids = {row.id for row in rows}
+        deleted = [] if full_resync else [i for i in deleted_since(user_id, since) if i not in changed_ids]
+        return versioned(jsonify({
+            'version': version,
+            'full_resync': full_resync,
+            'changed': serialize_rows(rows, fields, columnar),
+            'deleted': deleted
+        }), etag, version)
+
+    if args.get('status'):
+        query = query.filter(Task.status.in_(args['status'].split(',')))
+    if args.get('priority'):
+        query = query.filter(Task.priority.in_(args['priority'].split(',')))
+    try:
+        if args.get('deadline_from'):
+            query = query.filter(Task.deadline >= datetime.fromisoformat(args['deadline_from']))
+        if args.get('deadline_to'):
+            query = query.filter(Task.deadline <= datetime.fromisoformat(args['deadline_to']))
+    except ValueError:
+        return jsonify({'error': 'Invalid date format'}), 400
+
+    order = [sort_column.desc(), Task.id.desc()] if descending else [sort_column, Task.id]
+    if nullable:
+        order.insert(0, sort_column.is_(None))
+    query = query.order_by(*order)
+
+    paged = 'limit' in args or 'cursor' in args
+    if not paged:
+        return versioned(jsonify(serialize_rows(query.all(), fields, columnar)), etag, version)
+
+    try:
+        limit = min(int(args.get('limit', 50)), current_app.config.get('TASKS_PAGE_MAX', 500))
+        if args.get('cursor'):
+            value, last_id = decode_cursor(args['cursor'], sort_key)
+            query = query.filter(keyset_condition(sort_column, nullable, descending, value, last_id))
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Invalid limit or cursor'}), 400
+    if limit < 1:
+        return jsonify({'error': 'Invalid limit or cursor'}), 400
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = dict(zip(loaded, rows[-1]))
+        next_cursor = encode_cursor(last[sort_key], last['id'])
+
+    return versioned(jsonify({
+        'items': serialize_rows(rows, fields, columnar),
+        'next_cursor': next_cursor
+    }), etag, version)
 
 # 2. CREATE A TASK
 @tasks_bp.route('', methods=['POST'])
@@ -32,13 +194,20 @@ def create_task():
             return jsonify({'error': 'Invalid date format'}), 400
 
     new_task = Task(
-        user_id=get_jwt_identity(),
+        user_id=current_user_id(),
         description=data.get('description'),
         priority=data.get('priority', 'Medium'),
         estimated_duration=data.get('estimated_duration'), # e.g., 60 minutes
         deadline=deadline_dt
     )
 
+    try:
+        if data.get('recurrence'):
+            set_recurrence(new_task, data['recurrence'])
+        new_task.reminder_minutes = parse_reminder_minutes(data.get('reminder_minutes'))
+    except (RecurrenceError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
     db.session.add(new_task)
     db.session.commit()
 
@@ -51,7 +220,7 @@ def update_task(task_id):
     task = Task.query.get_or_404(task_id)
 
     # Security: Ensure user owns this task
-    if task.user_id != get_jwt_identity():
+    if task.user_id != current_user_id():
         return jsonify({'error': 'Unauthorized'}), 403
 
     data = request.get_json()
@@ -60,6 +229,11 @@ def update_task(task_id):
     task.priority = data.get('priority', task.priority)
     task.estimated_duration = data.get('estimated_duration', task.estimated_duration)
     task.status = data.get('status', task.status)
+    if 'reminder_minutes' in data:
+        try:
+            task.reminder_minutes = parse_reminder_minutes(data['reminder_minutes'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     
     db.session.commit()
     return jsonify(task.to_dict()), 200
@@ -70,9 +244,284 @@ def update_task(task_id):
 def delete_task(task_id):
     task = Task.query.get_or_404(task_id)
 
-    if task.user_id != get_jwt_identity():
+    if task.user_id != current_user_id():
         return jsonify({'error': 'Unauthorized'}), 403
 
     db.session.delete(task)
     db.session.commit()
-    return jsonify({'message': 'Task deleted'}), 200
\ No newline at end of file
+    expansion_cache.invalidate(task_id)
+    return jsonify({'message': 'Task deleted'}), 200
+
+# 5. BULK CREATE / UPDATE / DELETE
+BULK_UPDATABLE = ('description', 'priority', 'estimated_duration', 'status', 'deadline')
+
+
+def is_task_id(value):
+    # JSON ints only: lists/objects are unhashable and bools are ints in Python
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def parse_task_fields(data, allowed):
+    """
+    Validated column values from a request dict (deadline parsed from ISO).
+    Raises ValueError with a message for the client, so bad input is
+    rejected here instead of failing the whole batch at flush.
+    """
+    values = {key: data[key] for key in allowed if key in data}
+    if 'description' in values and not (isinstance(values['description'], str) and values['description'].strip()):
+        raise ValueError('description must be a non-empty string')
+    for key in ('priority', 'status'):
+        if key in values and not (isinstance(values[key], str) and len(values[key]) <= 50):
+            raise ValueError(f'{key} must be a string of at most 50 characters')
+    duration = values.get('estimated_duration')
+    if duration is not None and (isinstance(duration, bool) or not isinstance(duration, int) or duration < 0):
+        raise ValueError('estimated_duration must be a non-negative integer')
+    if 'deadline' in values:
+        deadline = values['deadline']
+        if deadline in (None, ''):
+            values['deadline'] = None
+        elif not isinstance(deadline, str):
+            raise ValueError('Invalid date format')
+        else:
+            try:
+                values['deadline'] = datetime.fromisoformat(deadline)
+            except ValueError:
+                raise ValueError('Invalid date format')
+    return values
+
+
+@tasks_bp.route('/bulk', methods=['POST'])
+@jwt_required()
+def bulk_tasks():
+    """
+    Applies a mixed batch in one transaction:
+    {"operations": [{"op": "create", "data": {...}},
+                    {"op": "update", "id": 1, "data": {...}},
+                    {"op": "delete", "id": 2}]}
+    Every operation gets its own result; invalid ones are skipped, the rest
+    are committed together.
+    """
+    user_id = current_user_id()
+    operations = (request.get_json() or {}).get('operations')
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'operations must be a non-empty list'}), 400
+    if len(operations) > current_app.config.get('TASKS_BULK_MAX', 5000):
+        return jsonify({'error': 'Too many operations'}), 400
+
+    results = [None] * len(operations)
+    creates, updates, deletes = [], [], []
+
+    # 1. Ownership of every referenced task with a single IN query
+    ids = {op.get('id') for op in operations
+           if isinstance(op, dict) and op.get('op') in ('update', 'delete') and is_task_id(op.get('id'))}
+    owners = dict(db.session.query(Task.id, Task.user_id).filter(Task.id.in_(ids)).all()) if ids else {}
+
+    # 2. Validate and sort into buckets
+    seen = set()
+    for index, op in enumerate(operations):
+        kind = op.get('op') if isinstance(op, dict) else None
+        task_id = op.get('id') if kind else None
+        data = (op.get('data') or {}) if kind else {}
+        error = None
+
+        if kind not in ('create', 'update', 'delete'):
+            error = (400, 'Unknown operation')
+        elif not isinstance(data, dict):
+            error = (400, 'data must be an object')
+        elif kind == 'create' and not data.get('description'):
+            error = (400, 'Description is required')
+        elif kind != 'create' and not is_task_id(task_id):
+            error = (400, 'id must be an integer')
+        elif kind != 'create' and task_id not in owners:
+            error = (404, 'Task not found')
+        elif kind != 'create' and owners[task_id] != user_id:
+            error = (403, 'Unauthorized')
+        elif kind != 'create' and task_id in seen:
+            error = (400, 'Task appears twice in the batch')
+
+        if error is None and kind != 'delete':
+            try:
+                values = parse_task_fields(data, BULK_UPDATABLE)
+            except ValueError as e:
+                error = (400, str(e))
+
+        if error:
+            results[index] = {'index': index, 'op': kind, 'id': task_id, 'status': error[0], 'error': error[1]}
+            continue
+
+        if kind == 'create':
+            creates.append((index, values))
+        elif kind == 'update':
+            seen.add(task_id)
+            updates.append((index, dict(values, id=task_id)))
+        else:
+            seen.add(task_id)
+            deletes.append((index, task_id))
+
+    # 3. Apply everything in one transaction
+    new_tasks = [
+        Task(user_id=user_id, **dict({'priority': 'Medium'}, **values))
+        for _, values in creates
+    ]
+    db.session.add_all(new_tasks)
+    db.session.flush()  # batched INSERTs; the change-tracking hook stamps versions
+
+    changed = [values['id'] for _, values in updates if len(values) > 1]
+    if changed:
+        db.session.execute(update(Task), [values for _, values in updates if len(values) > 1])
+    deleted = [task_id for _, task_id in deletes]
+    if deleted:
+        db.session.execute(delete(Task).where(Task.id.in_(deleted)), execution_options={'synchronize_session': False})
+
+    # Bulk statements skip the ORM flush, so record their versions/tombstones here
+    if changed or deleted:
+        record_task_changes(db.session.connection(), {user_id: changed}, {user_id: deleted})
+
+    for (index, _), task in zip(creates, new_tasks):
+        results[index] = {'index': index, 'op': 'create', 'id': task.id, 'status': 201, 'task': task.to_dict()}
+    for index, values in updates:
+        results[index] = {'index': index, 'op': 'update', 'id': values['id'], 'status': 200}
+    for index, task_id in deletes:
+        results[index] = {'index': index, 'op': 'delete', 'id': task_id, 'status': 200}
+
+    version = current_version(user_id)
+    db.session.commit()
+    # Bulk statements bypass the ORM hooks the reminder index listens to
+    reminder_scheduler.refresh(changed + deleted)
+    for task_id in deleted:
+        expansion_cache.invalidate(task_id)
+
+    failed = sum(1 for r in results if r['status'] >= 400)
+    return jsonify({
+        'results': results,
+        'applied': len(results) - failed,
+        'failed': failed,
+        'version': version
+    }), 200
+
+
+# 6. RECURRENCE
+def set_recurrence(task, value, dtstart=None):
+    """Stores a normalized RRULE on the task (None clears it). Raises RecurrenceError."""
+    if value is None:
+        task.recurrence_rule = None
+        task.recurrence_start = None
+    else:
+        task.recurrence_rule = format_rule(parse_rule(value))
+        if dtstart is not None:
+            task.recurrence_start = dtstart
+        elif task.recurrence_start is None:
+            # Pin the anchor so later deadline/schedule edits do not shift the series
+            task.recurrence_start = task.recurrence_anchor() or datetime.utcnow()
+    if task.id is not None:
+        expansion_cache.invalidate(task.id)
+
+
+@tasks_bp.route('/<int:task_id>/recurrence', methods=['POST'])
+@jwt_required()
+def set_task_recurrence(task_id):
+    """
+    Sets or clears a task's recurrence:
+    {"recurrence": "Daily" | "FREQ=WEEKLY;INTERVAL=2;COUNT=10" | {...} | null,
+     "start": optional ISO datetime of the first occurrence,
+     "reminder_minutes": optional lead time for each occurrence's reminder}
+    """
+    task = Task.query.get_or_404(task_id)
+    if task.user_id != current_user_id():
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    data = request.get_json() or {}
+    try:
+        dtstart = datetime.fromisoformat(data['start']) if data.get('start') else None
+    except ValueError:
+        return jsonify({'error': 'Invalid date format'}), 400
+    try:
+        set_recurrence(task, data.get('recurrence'), dtstart)
+        if 'reminder_minutes' in data:
+            task.reminder_minutes = parse_reminder_minutes(data['reminder_minutes'])
+    except (RecurrenceError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    db.session.commit()
+
+    upcoming = []
+    if task.recurrence_rule:
+        # A moving "now" window would never be hit again, so skip the cache
+        upcoming = islice(occurrences(task.recurrence_rule, task.recurrence_start, datetime.utcnow()), 5)
+    return jsonify({
+        'task': task.to_dict(),
+        'start': task.recurrence_start.isoformat() if task.recurrence_start else None,
+        'upcoming': [value.isoformat() for value in upcoming]
+    }), 200
+
+
+@tasks_bp.route('/<int:task_id>/occurrences', methods=['GET'])
+@jwt_required()
+def get_task_occurrences(task_id):
+    """
+    Occurrences of a recurring task in [start, end) (ISO datetimes; defaults
+    to 90 days from today), expanded on demand and never stored as rows.
+    At most `limit` (RECURRENCE_MAX_OCCURRENCES) are returned.
+    """
+    row = db.session.query(Task.user_id, Task.recurrence_rule, Task.recurrence_start) \
+        .filter(Task.id == task_id).first()
+    if row is None:
+        return jsonify({'error': 'Task not found'}), 404
+    if row.user_id != current_user_id():
+        return jsonify({'error': 'Unauthorized'}), 403
+
+    args = request.args
+    max_items = current_app.config.get('RECURRENCE_MAX_OCCURRENCES', 1000)
+    try:
+        # Default to today (UTC) rather than "now" so the window, and its cache key, is stable
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        start = datetime.fromisoformat(args['start']) if args.get('start') else today
+        end = datetime.fromisoformat(args['end']) if args.get('end') else start + timedelta(days=90)
+        limit = min(int(args.get('limit', max_items)), max_items)
+    except ValueError:
+        return jsonify({'error': 'Invalid start, end or limit'}), 400
+    if limit < 1 or end <= start:
+        return jsonify({'error': 'Invalid start, end or limit'}), 400
+
+    values = []
+    if row.recurrence_rule:
+        values = [value.isoformat() for value in expansion_cache.expand(
+            task_id, row.recurrence_rule, row.recurrence_start, start, end, limit=limit + 1)]
+
+    return jsonify({
+        'task_id': task_id,
+        'recurrence': row.recurrence_rule,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'occurrences': values[:limit],
+        'truncated': len(values) > limit
+    }), 200
+
+
+# 7. REMINDERS
+def parse_reminder_minutes(value):
+    """Minutes before the task (or each occurrence) to remind; None turns reminders off."""
+    if value is None or value == '':
+        return None
+    try:
+        minutes = int(value)
+    except (TypeError, ValueError):
+        raise ValueError('reminder_minutes must be a number')
+    if not 0 <= minutes <= MAX_REMINDER_MINUTES:
+        raise ValueError(f'reminder_minutes must be between 0 and {MAX_REMINDER_MINUTES}')
+    return minutes
+
+
+@tasks_bp.route('/reminders', methods=['GET'])
+@jwt_required()
+def get_reminders():
+    """Collects the caller's in-app reminders (REMINDER_DELIVERY='inapp'); each is returned once."""
+    delivery = reminder_scheduler.delivery
+    if not isinstance(delivery, InAppDelivery):
+        return jsonify([]), 200
+    return jsonify([{
+        'task_id': reminder.task_id,
+        'description': reminder.description,
+        'due_at': reminder.due_at.isoformat(),
+        'occurs_at': reminder.occurs_at.isoformat()
+    } for reminder in delivery.collect(current_user_id())]), 200
@@ -1,61 +1,87 @@
-import requests
 from flask import current_app
+from app.services.json_stream import JSONStreamParser, parse_json_text
+from app.services.llm_cache import fingerprint, llm_cache
+from app.services.metrics import metrics
+from app.services.outbound import outbound
+from app.services.prompts import reasons_prompt, suggestion_prompt
+from app.services.scheduler import busy_to_intervals
 from datetime import datetime
 import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+GEMINI_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent"
+GEMINI_STREAM_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:streamGenerateContent"
+
+
+class SuggestionStreamError(Exception):
+    """Raised when the streamed Gemini answer cannot be used."""
+
+
+def gemini_url():
+    """generateContent endpoint (overridable so benchmarks can hit a local stub)."""
+    return current_app.config.get('GEMINI_API_URL', GEMINI_URL)
+
+
+def gemini_stream_url():
+    """streamGenerateContent endpoint (same idea as gemini_url)."""
+    return current_app.config.get('GEMINI_STREAM_URL', GEMINI_STREAM_URL)
+
+
+def _suggestion_cache_key(task, busy_slots, now, hours=None):
+    # Same task + same availability + same day -> same answer, skip the network
+    return fingerprint(
+        'suggestions',
+        description=task.description,
+        priority=task.priority,
+        duration=task.estimated_duration,
+        deadline=task.deadline,
+        busy=[(s.isoformat(), e.isoformat()) for s, e in busy_to_intervals(busy_slots)],
+        today=now.strftime('%Y-%m-%d'),
+        hours=[(s.isoformat(), e.isoformat()) for s, e in hours] if hours is not None else None
+    )
+
+
+def _observe_prompt(kind, stats):
+    metrics.observe('ai_prompt_tokens', stats['tokens'], kind=kind)
+    if stats['degraded']:
+        metrics.inc('ai_prompt_degraded_total', kind=kind, step=stats['degraded'])
+
+
+def _suggestion_prompt(task, busy_slots, now, hours=None):
+    # Free windows per day instead of the raw busy list; size capped by AI_PROMPT_TOKEN_BUDGET
+    text, stats = suggestion_prompt(task, busy_slots, now, hours=hours,
+                                    budget=current_app.config.get('AI_PROMPT_TOKEN_BUDGET', 600))
+    _observe_prompt('suggestions', stats)
+    return text
+
 
 def generate_suggestions(task, busy_slots):
     """
-    Debug version: Returns the raw error from Google if something goes wrong.
+    Benchmark-only helper: one blocking Gemini call for the task's
+    suggestions, returned as a JSON string (errors too, as {"error", "details"}).
+    The routes use the local scheduler or stream_suggestions; this stays as
+    the non-streaming baseline for benchmarks/bench_suggest.py and
+    benchmarks/bench_stream.py.
     """
     api_key = current_app.config.get('GEMINI_API_KEY')
     if not api_key:
         return json.dumps({"error": "Configuration Error: GEMINI_API_KEY is missing in config.py"})
 
     # 1. Endpoint
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={api_key}"
+    url = f"{gemini_url()}?key={api_key}"
     
     # 2. Prompt
-    now = datetime.now()
-    prompt_text = f"""
-    Act as an expert Productivity Coach.
-    
-    CURRENT CONTEXT:
-    - Today: {now.strftime('%Y-%m-%d')}
-    - Working Hours: 09:00 to 17:00
-    - Busy Slots: {busy_slots}
-    
-    TASK DETAILS:
-    - Description: "{task.description}"
-    - Priority: {task.priority} (High priority = Schedule in morning/deep focus hours)
-    - Duration: {task.estimated_duration} mins
-    - Deadline: {task.deadline if task.deadline else "None"}
-
-    GOAL:
-    Find 3 optimal start times for this task over the next 3 days.
-    
-    LOGIC:
-    1. STRICTLY avoid the Busy Slots.
-    2. If Priority is 'High', prefer morning slots (09:00-12:00) for "Deep Work".
-    3. If Duration is short (<30m), try to fit it in small gaps.
-    4. Provide a "Reason" that explains the productivity benefit (e.g., "Morning slot for peak focus", "Fits in gap before lunch").
-
-    OUTPUT FORMAT:
-    Return valid JSON only. No markdown. No comments.
-    Structure:
-    {{
-        "suggestions": [
-            {{ "start": "YYYY-MM-DDTHH:MM:SS", "reason": "Why this time works" }},
-            {{ "start": "YYYY-MM-DDTHH:MM:SS", "reason": "Why this time works" }}
-        ]
-    }}
-    """
+    now = datetime.utcnow()
+    prompt_text = _suggestion_prompt(task, busy_slots, now)
 
     # 3. Request
     payload = { "contents": [{ "parts": [{"text": prompt_text}] }] }
     headers = {'Content-Type': 'application/json'}
 
     try:
-        response = requests.post(url, headers=headers, json=payload)
+        response = outbound.post(url, headers=headers, json=payload)
         
         # --- ERROR HANDLING ---
         if response.status_code != 200:
@@ -77,12 +103,123 @@ def generate_suggestions(task, busy_slots):
         # Success path
         text = data['candidates'][0]['content']['parts'][0]['text']
         
-        # Clean markdown
-        text = text.replace("```json", "").replace("```", "").strip()
-        return text
+        # Pull the JSON out of the answer (ignores ```json fences and chatter)
+        try:
+            answer = parse_json_text(text)
+        except ValueError:
+            return text.strip()
+        return json.dumps(answer)
 
     except Exception as e:
         return json.dumps({"error": "Python Exception", "details": str(e)})
-    
 
-    
\ No newline at end of file
+
+def stream_suggestions(task, busy_slots, hours=None):
+    """
+    Streaming version of generate_suggestions: yields each suggestion
+    ({"start", "reason"}) as soon as it is complete in Gemini's streamed answer.
+    `hours` is the user's working hours (see timeline.working_intervals).
+    Raises SuggestionStreamError if the call fails or the answer is unusable.
+    """
+    api_key = current_app.config.get('GEMINI_API_KEY')
+    if not api_key:
+        raise SuggestionStreamError("GEMINI_API_KEY is missing in config.py")
+
+    now = datetime.utcnow()
+    cache_key = _suggestion_cache_key(task, busy_slots, now, hours)
+    cached = llm_cache.get(cache_key)
+    if cached is not None:
+        yield from json.loads(cached)['suggestions']
+        return
+
+    payload = { "contents": [{ "parts": [{"text": _suggestion_prompt(task, busy_slots, now, hours)}] }] }
+    try:
+        response = outbound.post(f"{gemini_stream_url()}?alt=sse&key={api_key}", json=payload, stream=True)
+    except Exception as e:
+        raise SuggestionStreamError(str(e))
+
+    from requests import RequestException  # loaded by outbound by now, kept out of start-up
+
+    with response:
+        if response.status_code != 200:
+            raise SuggestionStreamError(f"Google API Error {response.status_code}: {response.text}")
+
+        # Server-Sent Events: one GenerateContentResponse per "data:" line
+        response.encoding = 'utf-8'
+        parser = JSONStreamParser(items_key='suggestions')
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line.startswith('data:'):
+                    continue
+                try:
+                    candidate = json.loads(line[5:])['candidates'][0]
+                except (ValueError, KeyError, IndexError):
+                    continue
+                for part in candidate.get('content', {}).get('parts', []):
+                    for suggestion in parser.feed(part.get('text', '')):
+                        if isinstance(suggestion, dict) and suggestion.get('start'):
+                            yield suggestion
+                if parser.done:
+                    break
+        except RequestException as e:
+            raise SuggestionStreamError(f"Stream interrupted: {e}")
+
+    try:
+        answer = parser.value()
+    except ValueError:
+        raise SuggestionStreamError("Incomplete answer from Gemini")
+    if isinstance(answer, dict) and isinstance(answer.get('suggestions'), list):
+        llm_cache.set(cache_key, json.dumps(answer))
+
+
+
+def write_reasons(task, slots):
+    """
+    Optional LLM step: asks Gemini to phrase the "reason" for slots that the
+    local scheduler already picked. Times are never changed here; on any
+    failure the scheduler's own reasons are kept.
+    """
+    api_key = current_app.config.get('GEMINI_API_KEY')
+    if not api_key or not slots:
+        return slots
+
+    cache_key = fingerprint(
+        'reasons',
+        description=task.description,
+        priority=task.priority,
+        duration=task.estimated_duration,
+        slots=[(slot['start'], slot['end']) for slot in slots]
+    )
+    reasons = llm_cache.get(cache_key)
+    if reasons is None:
+        reasons = _fetch_reasons(task, slots, api_key)
+        if reasons is None:
+            return slots
+        llm_cache.set(cache_key, reasons)
+
+    return [
+        dict(slot, reason=reasons[i]) if i < len(reasons) and isinstance(reasons[i], str) else slot
+        for i, slot in enumerate(slots)
+    ]
+
+
+def _fetch_reasons(task, slots, api_key):
+    """Asks Gemini for one reason per slot. Returns a list, or None on failure."""
+    prompt_text, stats = reasons_prompt(task, slots, budget=current_app.config.get('AI_PROMPT_TOKEN_BUDGET', 600))
+    _observe_prompt('reasons', stats)
+
+    payload = { "contents": [{ "parts": [{"text": prompt_text}] }] }
+    headers = {'Content-Type': 'application/json'}
+
+    try:
+        response = outbound.post(f"{gemini_url()}?key={api_key}", headers=headers, json=payload)
+        if response.status_code != 200:
+            return None
+
+        text = response.json()['candidates'][0]['content']['parts'][0]['text']
+        reasons = parse_json_text(text).get('reasons')
+    except Exception as e:
+        logger.warning("Reason generation failed: %s", e)
+        return None
+
+    return reasons if isinstance(reasons, list) else None
@@ -0,0 +1,150 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.services.outbound import outbound
+from app.services.timeline import intervals_to_slots, merge_busy, slots_to_intervals
+
+logger = logging.getLogger(__name__)
+
+FREEBUSY_URL = 'https://www.googleapis.com/calendar/v3/freeBusy'
+
+
+class AvailabilityCache:
+    """
+    Small thread-safe LRU cache for freeBusy results.
+    Keys are (user_id, time_min, time_max, calendars); entries expire after `ttl` seconds.
+    invalidate_user bumps a generation counter, so a fetch that started before
+    it cannot store its (now stale) result afterwards. Counters are striped by
+    user id: a bump only costs the users sharing its stripe one cache store.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60, stripes=256):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._generations = [0] * stripes
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.maxsize = app.config.get('AVAILABILITY_CACHE_SIZE', self.maxsize)
+        self.ttl = app.config.get('AVAILABILITY_CACHE_TTL', self.ttl)
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self, user_id):
+        """Take this before fetching and pass it to set()."""
+        with self._lock:
+            return self._generations[hash(user_id) % len(self._generations)]
+
+    def set(self, key, value, generation=None):
+        """Stores unless the user was invalidated since `generation` was taken."""
+        with self._lock:
+            if generation is not None and generation != self._generations[hash(key[0]) % len(self._generations)]:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id):
+        """Drops every cached window for one user (e.g. after creating an event)."""
+        with self._lock:
+            self._generations[hash(user_id) % len(self._generations)] += 1
+            for key in [k for k in self._data if k[0] == user_id]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+availability_cache = AvailabilityCache()
+
+
+def availability_window(days=3, now=None):
+    """
+    Returns (time_min, time_max) for the next `days` days.
+    The start is floored to AVAILABILITY_WINDOW_BUCKET minutes so that
+    requests made close together share the same cache key.
+    """
+    now = now or datetime.utcnow()
+    bucket = current_app.config.get('AVAILABILITY_WINDOW_BUCKET', 5)
+    start = now.replace(minute=now.minute - now.minute % bucket, second=0, microsecond=0)
+    end = start + timedelta(days=days)
+    return start.isoformat() + 'Z', end.isoformat() + 'Z'
+
+
+def fetch_busy_slots(user_id, token, time_min, time_max, calendars=('primary',)):
+    """
+    Returns (status_code, busy_slots) for the given calendars, asked for in a
+    single freeBusy request and merged into one sorted, non-overlapping list.
+    Calendars Google reports errors for (not found, no access) are skipped.
+    Successful lookups are cached; errors are never cached.
+    """
+    calendars = tuple(calendars)
+    key = (user_id, time_min, time_max, calendars)
+    cached = availability_cache.get(key)
+    if cached is not None:
+        return 200, cached
+    generation = availability_cache.generation(user_id)
+
+    headers = {'Authorization': f'Bearer {token}'}
+    body = {
+        "timeMin": time_min,
+        "timeMax": time_max,
+        "timeZone": "UTC",
+        "items": [{"id": calendar_id} for calendar_id in calendars]
+    }
+
+    response = outbound.post(
+        current_app.config.get('GOOGLE_FREEBUSY_URL', FREEBUSY_URL),
+        headers=headers,
+        json=body
+    )
+    if response.status_code != 200:
+        return response.status_code, None
+
+    data = response.json().get('calendars', {})
+    intervals = []
+    for calendar_id in calendars:
+        entry = data.get(calendar_id, {})
+        if entry.get('errors'):
+            logger.warning("freeBusy error for %s: %s", calendar_id, entry['errors'])
+            continue
+        intervals.extend(slots_to_intervals(entry.get('busy', [])))
+
+    busy_slots = intervals_to_slots(merge_busy(intervals))
+    availability_cache.set(key, busy_slots, generation)
+    return 200, busy_slots
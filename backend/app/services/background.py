@@ -0,0 +1,40 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+
+class BackgroundCalls:
+    """
+    Small shared pool for running I/O-bound calls alongside the request that
+    needs them (e.g. freeBusy while the task loads). Each call gets its own app
+    context, so it also gets its own DB session. Under the gevent server
+    (serve.py) the pool threads are greenlets.
+    """
+
+    def __init__(self, workers=16):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.workers = app.config.get('BACKGROUND_WORKERS', self.workers)
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='background')
+            return self._executor
+
+    def submit(self, fn, *args):
+        """Starts fn(*args) in a fresh app context of the current app; returns a Future."""
+        app = current_app._get_current_object()
+
+        def call():
+            with app.app_context():
+                return fn(*args)
+
+        return self._pool().submit(call)
+
+
+background = BackgroundCalls()
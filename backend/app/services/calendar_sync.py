@@ -0,0 +1,174 @@
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.extensions import db
+from app.models import CalendarEvent
+from app.services.availability import fetch_busy_slots
+from app.services.outbound import outbound
+from app.services.scheduler import parse_timestamp
+from app.services.timeline import DEFAULT_CALENDARS, selected_calendars
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_API_URL = 'https://www.googleapis.com/calendar/v3'
+
+# Users with a sync in progress; entries leave when their sync ends, so this
+# only ever holds the syncs running right now
+_syncing = set()
+_syncing_guard = threading.Lock()
+
+
+def calendar_api_url():
+    """Calendar API base (overridable so tests can point at a fake server)."""
+    return current_app.config.get('GOOGLE_CALENDAR_API_URL', CALENDAR_API_URL)
+
+
+def parse_event_time(value):
+    """Google start/end ({'dateTime': ...} or {'date': ...}) -> (naive UTC datetime, all_day)."""
+    if value.get('dateTime'):
+        return parse_timestamp(value['dateTime']), False
+    return datetime.fromisoformat(value['date']), True
+
+
+def apply_event_changes(user_id, items):
+    """Upserts one page of events; cancelled events are removed from the mirror."""
+    if not items:
+        return 0
+
+    existing = {
+        event.google_id: event
+        for event in CalendarEvent.query.filter(
+            CalendarEvent.user_id == user_id,
+            CalendarEvent.google_id.in_([item['id'] for item in items])
+        )
+    }
+
+    for item in items:
+        event = existing.get(item['id'])
+        if item.get('status') == 'cancelled' or 'start' not in item:
+            if event is not None:
+                db.session.delete(event)
+                existing.pop(item['id'])
+            continue
+
+        start, all_day = parse_event_time(item['start'])
+        end, _ = parse_event_time(item.get('end', item['start']))
+        if event is None:
+            event = CalendarEvent(user_id=user_id, google_id=item['id'])
+            db.session.add(event)
+            existing[item['id']] = event
+
+        event.summary = item.get('summary')
+        event.start = start
+        event.end = end
+        event.all_day = all_day
+        event.transparency = item.get('transparency', 'opaque')
+        event.html_link = item.get('htmlLink')
+        event.updated = parse_timestamp(item['updated']) if item.get('updated') else None
+
+    return len(items)
+
+
+def sync_events(user, token):
+    """
+    Pulls calendar changes into the local mirror.
+    The first run lists everything from CALENDAR_SYNC_PAST_DAYS ago; later runs
+    send the stored syncToken so Google only returns what changed. Returns the
+    HTTP status of the sync (200 on success).
+    """
+    url = f"{calendar_api_url()}/calendars/primary/events"
+    headers = {'Authorization': f'Bearer {token}'}
+
+    params = {'maxResults': current_app.config.get('CALENDAR_SYNC_PAGE_SIZE', 250), 'singleEvents': 'true'}
+    if user.google_sync_token:
+        params['syncToken'] = user.google_sync_token
+    else:
+        past = timedelta(days=current_app.config.get('CALENDAR_SYNC_PAST_DAYS', 30))
+        params['timeMin'] = (datetime.utcnow() - past).isoformat() + 'Z'
+
+    page_params = dict(params)
+    while True:
+        response = outbound.get(url, headers=headers, params=page_params)
+
+        # Sync token no longer valid: wipe the mirror and start over
+        if response.status_code == 410 and user.google_sync_token:
+            db.session.rollback()
+            CalendarEvent.query.filter_by(user_id=user.id).delete()
+            user.google_sync_token = None
+            db.session.commit()
+            return sync_events(user, token)
+
+        if response.status_code != 200:
+            db.session.rollback()
+            return response.status_code
+
+        data = response.json()
+        apply_event_changes(user.id, data.get('items', []))
+
+        if data.get('nextPageToken'):
+            page_params = dict(params, pageToken=data['nextPageToken'])
+            continue
+
+        user.google_sync_token = data.get('nextSyncToken')
+        user.calendar_synced_at = datetime.utcnow()
+        db.session.commit()
+        return 200
+
+
+def ensure_synced(user, token):
+    """
+    Syncs when the mirror is older than CALENDAR_SYNC_INTERVAL seconds.
+    If another request is already syncing this user, the current mirror is used.
+    """
+    interval = timedelta(seconds=current_app.config.get('CALENDAR_SYNC_INTERVAL', 60))
+    if user.calendar_synced_at and datetime.utcnow() - user.calendar_synced_at < interval:
+        return 200
+
+    with _syncing_guard:
+        if user.id in _syncing:
+            return 200 if user.calendar_synced_at else 409
+        _syncing.add(user.id)
+    try:
+        return sync_events(user, token)
+    finally:
+        with _syncing_guard:
+            _syncing.discard(user.id)
+
+
+def mirrored_busy_slots(user_id, time_min, time_max):
+    """Busy intervals from the mirror, in the same shape freeBusy returns."""
+    start = parse_timestamp(time_min)
+    end = parse_timestamp(time_max)
+    events = CalendarEvent.query.filter(
+        CalendarEvent.user_id == user_id,
+        CalendarEvent.start < end,
+        CalendarEvent.end > start,
+        CalendarEvent.transparency != 'transparent'
+    ).order_by(CalendarEvent.start).all()
+    return [{"start": e.start.isoformat() + 'Z', "end": e.end.isoformat() + 'Z'} for e in events]
+
+
+def lookup_busy_slots(user, token, time_min, time_max):
+    """
+    Returns (status_code, busy_slots) for the calendars the user selected
+    (preferences['calendars'], default primary). Reads the local mirror when
+    CALENDAR_USE_MIRROR is on and only the primary calendar is selected (the
+    mirror syncs primary only); otherwise, or when the sync fails for any
+    reason other than bad credentials, makes one (cached) freeBusy call.
+    """
+    calendars = selected_calendars(user.preferences)
+    if calendars == DEFAULT_CALENDARS and current_app.config.get('CALENDAR_USE_MIRROR', True):
+        try:
+            status = ensure_synced(user, token)
+        except Exception as e:
+            logger.warning("Calendar sync error: %s", e)
+            status = None
+        if status == 200:
+            return 200, mirrored_busy_slots(user.id, time_min, time_max)
+        if status == 401:
+            return 401, None
+
+    return fetch_busy_slots(user.id, token, time_min, time_max, calendars)
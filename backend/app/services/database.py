@@ -0,0 +1,96 @@
+import os
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from app.extensions import db
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                              'migrations')
+
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def is_memory(uri):
+    return make_url(uri).database in (None, '', ':memory:')
+
+
+def engine_options(config):
+    """
+    Pool settings for server databases (MySQL in production). SQLite keeps
+    SQLAlchemy's defaults; it is tuned with pragmas on connect instead.
+    Anything already in SQLALCHEMY_ENGINE_OPTIONS wins.
+    """
+    options = {}
+    if not is_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        options = {
+            'pool_size': config.get('DB_POOL_SIZE', 10),
+            'max_overflow': config.get('DB_MAX_OVERFLOW', 20),
+            'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+            # Check connections before use and drop them before MySQL's
+            # wait_timeout closes them on the server side
+            'pool_pre_ping': config.get('DB_POOL_PRE_PING', True),
+            'pool_recycle': config.get('DB_POOL_RECYCLE', 280),
+        }
+    options.update(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    return options
+
+
+def sqlite_pragmas(config):
+    """PRAGMA name -> value applied to every new SQLite connection."""
+    pragmas = {
+        'busy_timeout': config.get('SQLITE_BUSY_TIMEOUT', 5000),  # ms to wait on a locked db
+        'foreign_keys': 'ON',
+    }
+    if config.get('SQLITE_WAL', True) and not is_memory(config['SQLALCHEMY_DATABASE_URI']):
+        # Readers no longer block the writer (and the other way round)
+        pragmas['journal_mode'] = 'WAL'
+        pragmas['synchronous'] = config.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    pragmas['cache_size'] = config.get('SQLITE_CACHE_SIZE', -16000)  # negative = KiB
+    pragmas['temp_store'] = 'MEMORY'
+    pragmas.update(config.get('SQLITE_PRAGMAS') or {})
+    return pragmas
+
+
+def configure_engine(app):
+    """Call before db.init_app: fills SQLALCHEMY_ENGINE_OPTIONS from DB_* settings."""
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+
+
+def init_app(app):
+    """Call after db.init_app: installs the SQLite pragma hook on the app's engine."""
+    if not is_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+        return
+
+    pragmas = sqlite_pragmas(app.config)
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    with app.app_context():
+        event.listen(db.engine, 'connect', set_pragmas)
+
+
+def init_migrations(app):
+    """Registers Flask-Migrate (`flask db ...`). Imported here so alembic only loads when it is needed."""
+    from flask_migrate import Migrate
+    Migrate(app, db, directory=MIGRATIONS_DIR, render_as_batch=True)
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Creates the schema, or upgrades it to the latest migration."""
+    from flask_migrate import upgrade
+    if 'migrate' not in current_app.extensions:
+        init_migrations(current_app)
+    upgrade()
+    click.echo('Database schema is at the latest migration.')
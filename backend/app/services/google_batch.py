@@ -0,0 +1,160 @@
+import hashlib
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from email.parser import BytesParser
+from urllib.parse import urlsplit
+
+from flask import current_app
+
+from app.services.calendar_sync import calendar_api_url
+from app.services.outbound import outbound
+
+BATCH_URL = 'https://www.googleapis.com/batch/calendar/v3'
+
+
+def event_id_for(task_id, start_time):
+    """
+    Client-side Google event id for a task's slot (hex is valid base32hex).
+    Resending an insert whose reply was lost then gets a 409 instead of
+    creating the event twice.
+    """
+    return hashlib.sha1(f'task:{task_id}:{start_time}'.encode()).hexdigest()
+
+
+def get_event(token, event_id):
+    """(status_code, payload) of one primary calendar event."""
+    response = outbound.get(f"{calendar_api_url()}/calendars/primary/events/{event_id}",
+                            headers={'Authorization': f'Bearer {token}'})
+    try:
+        return response.status_code, response.json()
+    except ValueError:
+        return response.status_code, response.text
+
+
+def build_batch_body(path, bodies, boundary):
+    """multipart/mixed body with one 'POST <path>' sub-request per event."""
+    lines = []
+    for index, body in enumerate(bodies):
+        lines += [
+            f'--{boundary}',
+            'Content-Type: application/http',
+            f'Content-ID: <item-{index}>',
+            '',
+            f'POST {path}',
+            'Content-Type: application/json',
+            '',
+            json.dumps(body),
+        ]
+    lines.append(f'--{boundary}--')
+    return '\r\n'.join(lines).encode()
+
+
+def parse_batch_response(content_type, content):
+    """Returns {index: (status_code, json_or_text)} from a multipart/mixed batch reply."""
+    message = BytesParser().parsebytes(f'Content-Type: {content_type}\r\n\r\n'.encode() + content)
+    results = {}
+    for part in message.get_payload():
+        content_id = (part.get('Content-ID') or '').strip('<>')
+        if '-item-' not in content_id:
+            continue
+        try:
+            index = int(content_id.rsplit('-', 1)[1])
+        except ValueError:
+            # Unknown index: that item is reported as missing from the reply
+            continue
+
+        raw = part.get_payload(decode=True) or part.get_payload().encode()
+        head, _, body = raw.replace(b'\r\n', b'\n').partition(b'\n\n')
+        try:
+            status = int(head.split(b'\n', 1)[0].split()[1])
+        except (IndexError, ValueError):
+            results[index] = (502, 'Malformed batch response part')
+            continue
+        try:
+            results[index] = (status, json.loads(body))
+        except ValueError:
+            results[index] = (status, body.decode(errors='replace'))
+    return results
+
+
+def insert_events_batch(token, bodies):
+    """
+    Creates events with Google batch requests (CALENDAR_BATCH_SIZE per call).
+    Returns {index: (status_code, payload)}. Indexes missing from the reply are
+    reported as 502. If the batch endpoint is unavailable (404/501) the chunk is
+    sent as concurrent single inserts instead.
+    """
+    path = urlsplit(calendar_api_url()).path + '/calendars/primary/events'
+    batch_url = current_app.config.get('GOOGLE_CALENDAR_BATCH_URL', BATCH_URL)
+    size = current_app.config.get('CALENDAR_BATCH_SIZE', 50)
+
+    results = {}
+    for offset in range(0, len(bodies), size):
+        chunk = bodies[offset:offset + size]
+        boundary = f'batch_{uuid.uuid4().hex}'
+        response = outbound.post(
+            batch_url,
+            headers={
+                'Authorization': f'Bearer {token}',
+                'Content-Type': f'multipart/mixed; boundary={boundary}'
+            },
+            data=build_batch_body(path, chunk, boundary),
+            idempotent=False
+        )
+        if response.status_code in (404, 501):
+            fallback = insert_events_concurrently(token, chunk)
+            for index, result in fallback.items():
+                results[offset + index] = result
+            continue
+        if response.status_code != 200:
+            for index in range(len(chunk)):
+                results[offset + index] = (response.status_code, response.text)
+            continue
+
+        parsed = parse_batch_response(response.headers.get('Content-Type', ''), response.content)
+        for index in range(len(chunk)):
+            results[offset + index] = parsed.get(index, (502, 'Missing from batch response'))
+    return results
+
+
+def insert_events_concurrently(token, bodies):
+    """Fallback: one pooled request per event, CALENDAR_BATCH_WORKERS at a time."""
+    url = f"{calendar_api_url()}/calendars/primary/events"
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def insert(body):
+        try:
+            response = outbound.post(url, headers=headers, json=body, idempotent=False)
+        except Exception as e:
+            return 502, str(e)
+        try:
+            return response.status_code, response.json()
+        except ValueError:
+            return response.status_code, response.text
+
+    workers = current_app.config.get('CALENDAR_BATCH_WORKERS', 8)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(enumerate(pool.map(insert, bodies)))
+
+
+def insert_events(token, bodies):
+    """
+    Batch request by default; CALENDAR_BATCH_MODE='concurrent' uses parallel calls.
+    An event that already exists (409 on its id, from an earlier attempt) is
+    fetched and reported as created.
+    """
+    from requests import RequestException  # imported on first use, like outbound
+
+    if current_app.config.get('CALENDAR_BATCH_MODE', 'multipart') == 'concurrent':
+        results = insert_events_concurrently(token, bodies)
+    else:
+        results = insert_events_batch(token, bodies)
+
+    for index, (status, _) in results.items():
+        if status == 409 and bodies[index].get('id'):
+            try:
+                results[index] = get_event(token, bodies[index]['id'])
+            except RequestException as e:
+                results[index] = (502, str(e))
+    return results
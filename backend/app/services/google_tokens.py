@@ -0,0 +1,141 @@
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from flask import current_app
+
+from app.extensions import db
+from app.services.outbound import outbound
+
+logger = logging.getLogger(__name__)
+
+
+def expiry_from(tokens):
+    """Absolute expiry (naive UTC) from a token endpoint response."""
+    expires_in = tokens.get('expires_in')
+    if not expires_in:
+        return None
+    return datetime.utcnow() + timedelta(seconds=int(expires_in))
+
+
+class TokenManager:
+    """
+    Hands out Google access tokens that are valid for at least `margin` more
+    seconds. Tokens are refreshed ahead of expiry, concurrent callers for the
+    same user share one refresh (single-flight lock), and current tokens are
+    kept in a small in-memory LRU so most calls never touch the users row.
+    The per-user locks are a fixed set of stripes (user_id % stripes), so
+    memory stays flat however many users refresh; users sharing a stripe
+    only wait for each other's refresh.
+    """
+
+    def __init__(self, margin=300, maxsize=1024, stripes=64):
+        self.margin = margin
+        self.maxsize = maxsize
+        self.refreshes = 0
+        self._tokens = OrderedDict()  # user_id -> (access_token, expires_at)
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.margin = app.config.get('GOOGLE_TOKEN_REFRESH_MARGIN', self.margin)
+        self.maxsize = app.config.get('GOOGLE_TOKEN_CACHE_SIZE', self.maxsize)
+
+    def _fresh(self, expires_at):
+        return expires_at is not None and expires_at - timedelta(seconds=self.margin) > datetime.utcnow()
+
+    def _cached(self, user_id):
+        with self._lock:
+            entry = self._tokens.get(user_id)
+            if entry and self._fresh(entry[1]):
+                self._tokens.move_to_end(user_id)
+                return entry[0]
+        return None
+
+    def _remember(self, user_id, token, expires_at):
+        with self._lock:
+            self._tokens[user_id] = (token, expires_at)
+            self._tokens.move_to_end(user_id)
+            while len(self._tokens) > self.maxsize:
+                self._tokens.popitem(last=False)
+
+    def _user_lock(self, user_id):
+        return self._locks[hash(user_id) % len(self._locks)]
+
+    def store(self, user, tokens):
+        """Saves a token endpoint response (code exchange or refresh) on the user."""
+        user.google_access_token = tokens['access_token']
+        user.google_token_expires_at = expiry_from(tokens)
+        if tokens.get('refresh_token'):
+            user.google_refresh_token = tokens['refresh_token']
+        db.session.commit()
+        self._remember(user.id, user.google_access_token, user.google_token_expires_at)
+
+    def forget(self, user_id):
+        with self._lock:
+            self._tokens.pop(user_id, None)
+
+    def get_access_token(self, user):
+        """Returns a usable access token, refreshing ahead of expiry; None if not connected."""
+        token = self._cached(user.id)
+        if token:
+            return token
+
+        if not user.google_access_token:
+            return None
+        if self._fresh(user.google_token_expires_at):
+            self._remember(user.id, user.google_access_token, user.google_token_expires_at)
+            return user.google_access_token
+
+        # Expired, about to expire, or unknown expiry (rows saved before we tracked it)
+        if not user.google_refresh_token:
+            return user.google_access_token
+
+        with self._user_lock(user.id):
+            # Whoever held the lock before us may already have refreshed
+            token = self._cached(user.id)
+            if token:
+                return token
+            return self.refresh(user)
+
+    def renew(self, user, rejected):
+        """
+        Forces a refresh after Google answered 401 to `rejected` (revoked or
+        expired early). Concurrent callers share one refresh: whoever comes
+        second gets the new token. None if the refresh fails.
+        """
+        with self._user_lock(user.id):
+            token = self._cached(user.id)
+            if token and token != rejected:
+                return token
+            self.forget(user.id)
+            return self.refresh(user)
+
+    def refresh(self, user):
+        """Uses the long-lived refresh token to get a new access token."""
+        if not user.google_refresh_token:
+            return None
+
+        payload = {
+            'client_id': current_app.config['GOOGLE_CLIENT_ID'],
+            'client_secret': current_app.config['GOOGLE_CLIENT_SECRET'],
+            'refresh_token': user.google_refresh_token,
+            'grant_type': 'refresh_token'
+        }
+
+        try:
+            response = outbound.post(current_app.config['GOOGLE_TOKEN_URL'], data=payload)
+            tokens = response.json()
+
+            if 'access_token' in tokens:
+                self.refreshes += 1
+                self.store(user, tokens)
+                return tokens['access_token']
+        except Exception as e:
+            logger.warning("Error refreshing token: %s", e)
+
+        return None
+
+
+token_manager = TokenManager()
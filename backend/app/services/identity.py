@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import g
+from flask_jwt_extended import current_user
+from sqlalchemy import event
+
+from app.extensions import db, jwt
+from app.models import User
+
+# Hot columns most routes need; cheap to keep in memory, never written through
+CachedUser = namedtuple('CachedUser', 'id email preferences google_connected')
+
+
+class UserCache:
+    """
+    Short-TTL LRU of CachedUser by id, so an authenticated request does not
+    need a users query just to know who is calling. Entries are dropped when
+    the row is updated or deleted through the ORM.
+    """
+
+    def __init__(self, maxsize=4096, ttl=30):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.maxsize = app.config.get('USER_CACHE_SIZE', self.maxsize)
+        self.ttl = app.config.get('USER_CACHE_TTL', self.ttl)
+        self.clear()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(user_id)
+            if entry is None or entry[0] <= now:
+                self.misses += 1
+                return None
+            self._data.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, user):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._data[user.id] = (time.monotonic() + self.ttl, user)
+            self._data.move_to_end(user.id)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._data.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+user_cache = UserCache()
+
+
+def identity_claims(user):
+    """Extra JWT claims: the numeric id, so requests never re-parse 'sub'."""
+    return {"uid": user.id}
+
+
+@jwt.user_lookup_loader
+def _lookup_user(jwt_header, jwt_data):
+    """Resolves the token to a CachedUser (once per request; flask_jwt_extended keeps it)."""
+    user_id = jwt_data.get('uid')
+    if user_id is None:
+        # Tokens issued before the uid claim existed
+        user_id = int(jwt_data['sub'])
+
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    row = db.session.query(
+        User.id, User.email, User.preferences, User.google_refresh_token
+    ).filter(User.id == user_id).first()
+    if row is None:
+        return None  # flask_jwt_extended answers 401
+
+    cached = CachedUser(row.id, row.email, row.preferences, bool(row.google_refresh_token))
+    user_cache.set(cached)
+    return cached
+
+
+def current_user_id():
+    """Caller's id as an int (compare it directly with Task.user_id)."""
+    return current_user.id
+
+
+def load_current_user():
+    """The caller's full User row, for routes that read tokens or write to it. One lookup per request."""
+    if 'current_user_row' not in g:
+        g.current_user_row = db.session.get(User, current_user.id)
+    return g.current_user_row
+
+
+def _invalidate(mapper, connection, target):
+    user_cache.invalidate(target.id)
+
+
+def init_app(app):
+    user_cache.init_app(app)
+    if not event.contains(User, 'after_update', _invalidate):
+        event.listen(User, 'after_update', _invalidate)
+        event.listen(User, 'after_delete', _invalidate)
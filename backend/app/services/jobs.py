@@ -0,0 +1,206 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity."""
+
+
+# --- JOB STORES ---
+class MemoryJobStore:
+    """Keeps job state in a dict. Lost on restart, fine for a single process."""
+
+    def __init__(self):
+        self._jobs = {}
+        self._active = {}  # coalescing key -> job id (queued or running)
+        self._lock = threading.Lock()
+
+    def create_or_get(self, key, owner):
+        """Returns (job_id, created). Reuses an active job with the same key."""
+        with self._lock:
+            if key in self._active:
+                return self._active[key], False
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "id": job_id, "key": key, "owner": str(owner), "status": "queued",
+                "result": None, "error": None, "created_at": time.time(), "finished_at": None
+            }
+            self._active[key] = job_id
+            return job_id, True
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def update(self, job_id, status, result=None, error=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return
+            job.update(status=status, result=result, error=error)
+            if status in ('finished', 'failed'):
+                job['finished_at'] = time.time()
+                self._active.pop(job['key'], None)
+
+    def purge(self, older_than):
+        with self._lock:
+            for job_id in [j for j, job in self._jobs.items()
+                           if job['finished_at'] and job['finished_at'] < older_than]:
+                del self._jobs[job_id]
+
+
+class SqliteJobStore:
+    """Same interface, persisted in a SQLite file (or ':memory:')."""
+
+    def __init__(self, path=':memory:'):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY, key TEXT, owner TEXT, status TEXT,
+                    result TEXT, error TEXT, created_at REAL, finished_at REAL
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS ix_jobs_key_status ON jobs (key, status)")
+
+    def create_or_get(self, key, owner):
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE key = ? AND status IN ('queued', 'running')", (key,)
+            ).fetchone()
+            if row:
+                return row[0], False
+            job_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO jobs (id, key, owner, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, key, str(owner), time.time())
+            )
+            return job_id, True
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, key, owner, status, result, error, created_at, finished_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if not row:
+            return None
+        keys = ("id", "key", "owner", "status", "result", "error", "created_at", "finished_at")
+        job = dict(zip(keys, row))
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+
+    def update(self, job_id, status, result=None, error=None):
+        finished_at = time.time() if status in ('finished', 'failed') else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, finished_at, job_id)
+            )
+
+    def purge(self, older_than):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (older_than,))
+
+
+# --- RUNNER ---
+class JobRunner:
+    """
+    In-process background runner for slow upstream work (AI suggestions...).
+    A bounded queue feeds a fixed pool of worker threads; each job runs inside
+    an app context. Workers start on the first submission. Each worker is
+    bound to the queue it was started for; when init_app replaces the queue,
+    the old workers drain it and exit, and new ones start on the next submit.
+    """
+
+    def __init__(self, workers=2, queue_size=100, result_ttl=600, store=None):
+        self.app = None
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self.store = store or MemoryJobStore()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._threads = []
+        self._start_lock = threading.Lock()
+        self._last_purge = time.monotonic()
+
+    def init_app(self, app):
+        self.app = app
+        self.workers = app.config.get('JOB_WORKERS', self.workers)
+        self.result_ttl = app.config.get('JOB_RESULT_TTL', self.result_ttl)
+        with self._start_lock:
+            self._queue = queue.Queue(maxsize=app.config.get('JOB_QUEUE_SIZE', self._queue.maxsize))
+            self._threads = []
+        if app.config.get('JOB_BACKEND', 'memory') == 'sqlite':
+            self.store = SqliteJobStore(app.config.get('JOB_SQLITE_PATH', ':memory:'))
+        else:
+            self.store = MemoryJobStore()
+
+    def _ensure_workers(self):
+        with self._start_lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for _ in range(self.workers - len(self._threads)):
+                thread = threading.Thread(target=self._work, args=(self._queue,), daemon=True, name='job-worker')
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, key, owner, fn, *args):
+        """
+        Queues fn(*args) and returns its job id right away.
+        A second submission with the same key while the first is still queued
+        or running gets the existing job id instead of new work.
+        """
+        self._maybe_purge()
+        job_id, created = self.store.create_or_get(key, owner)
+        if not created:
+            return job_id
+
+        try:
+            self._queue.put_nowait((job_id, fn, args))
+        except queue.Full:
+            self.store.update(job_id, 'failed', error='Job queue is full')
+            raise QueueFullError("Job queue is full")
+
+        self._ensure_workers()
+        return job_id
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def _work(self, jobs):
+        while True:
+            try:
+                job_id, fn, args = jobs.get(timeout=1)
+            except queue.Empty:
+                if jobs is not self._queue:
+                    return  # replaced by init_app and drained
+                continue
+            self.store.update(job_id, 'running')
+            try:
+                if self.app is not None:
+                    with self.app.app_context():
+                        result = fn(*args)
+                else:
+                    result = fn(*args)
+                self.store.update(job_id, 'finished', result=result)
+            except Exception as e:
+                self.store.update(job_id, 'failed', error=str(e))
+            finally:
+                jobs.task_done()
+
+    def _maybe_purge(self):
+        now = time.monotonic()
+        if now - self._last_purge > 60:
+            self._last_purge = now
+            self.store.purge(time.time() - self.result_ttl)
+
+    def join(self):
+        """Blocks until every queued job is done (used by tests/benchmarks)."""
+        self._queue.join()
+
+
+job_runner = JobRunner()
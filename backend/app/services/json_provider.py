@@ -0,0 +1,68 @@
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional: the stdlib provider is used instead
+    orjson = None
+
+
+def _default(o):
+    # Dates go out as ISO 8601 (what to_dict always produced), not Flask's HTTP dates
+    if isinstance(o, date):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class ISOJSONProvider(DefaultJSONProvider):
+    """Flask's stdlib provider, with ISO 8601 dates and keys left in insertion order."""
+
+    default = staticmethod(_default)
+    sort_keys = False
+
+
+class OrjsonProvider(ISOJSONProvider):
+    """
+    orjson-backed provider. datetimes are encoded natively (same ISO 8601
+    text as isoformat()), and responses are written as bytes without a
+    str round trip. Anything orjson rejects (non-str keys, huge ints) and
+    calls with json.dumps keyword arguments fall back to the stdlib.
+    """
+
+    def dumps(self, obj, **kwargs):
+        if not kwargs:
+            try:
+                return orjson.dumps(obj, default=self.default).decode()
+            except TypeError:
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            option |= orjson.OPT_INDENT_2
+        try:
+            body = orjson.dumps(obj, default=self.default, option=option)
+        except TypeError:
+            return super().response(obj)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+PROVIDERS = {'stdlib': ISOJSONProvider, 'orjson': OrjsonProvider}
+
+
+def init_app(app):
+    """Installs app.json from JSON_PROVIDER: 'orjson' (default, when installed), 'stdlib' or a provider class."""
+    provider = app.config.get('JSON_PROVIDER', 'orjson')
+    if isinstance(provider, str):
+        if provider == 'orjson' and orjson is None:
+            provider = 'stdlib'
+        provider = PROVIDERS[provider]
+    app.json = provider(app)
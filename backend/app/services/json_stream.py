@@ -0,0 +1,86 @@
+import json
+
+
+class JSONStreamParser:
+    """
+    Incremental scanner for one JSON object arriving in chunks (an LLM answer).
+
+    Text before the first '{' or '[' and after the matching close is ignored,
+    so markdown fences and chatter around the JSON do not matter. When
+    `items_key` is set, every object in the top-level `items_key` array is
+    returned by feed() as soon as its closing brace arrives.
+    """
+
+    def __init__(self, items_key=None):
+        self.items_key = items_key
+        self.done = False
+        self._buf = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_key = None      # last string seen directly inside the top object
+        self._items_depth = None   # depth inside the target array
+        self._item_start = None
+
+    def feed(self, chunk):
+        """Consumes a chunk; returns the array items completed by it."""
+        items = []
+        for char in chunk:
+            if self.done:
+                break
+            if self._depth == 0 and char not in '{[':
+                continue
+
+            self._buf.append(char)
+            pos = len(self._buf) - 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = ''.join(self._buf[self._string_start + 1:pos])
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif char in '{[':
+                if self._items_depth is not None and self._depth == self._items_depth and self._item_start is None:
+                    self._item_start = pos
+                self._depth += 1
+                if char == '[' and self._depth == 2 and self.items_key and self._last_key == self.items_key:
+                    self._items_depth = 2
+            elif char in '}]':
+                self._depth -= 1
+                if self._item_start is not None and self._depth == self._items_depth:
+                    items.append(self._load(self._item_start, pos + 1))
+                    self._item_start = None
+                elif self._items_depth is not None and self._depth < self._items_depth:
+                    self._items_depth = None
+                if self._depth == 0:
+                    self.done = True
+        return [item for item in items if item is not None]
+
+    def _load(self, start, end):
+        try:
+            return json.loads(''.join(self._buf[start:end]))
+        except ValueError:
+            return None
+
+    def value(self):
+        """The complete top-level value; raises ValueError if it is missing or incomplete."""
+        if not self.done:
+            raise ValueError("Incomplete JSON")
+        return json.loads(''.join(self._buf))
+
+
+def parse_json_text(text):
+    """First JSON object/array in an LLM answer (fences and surrounding text ignored)."""
+    parser = JSONStreamParser()
+    parser.feed(text)
+    return parser.value()
@@ -0,0 +1,95 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def fingerprint(kind, **inputs):
+    """Content hash of normalized prompt inputs (key order does not matter)."""
+    raw = json.dumps({"kind": kind, **inputs}, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Content-addressed LRU cache for Gemini responses.
+    Lives in memory; when `path` is set every entry is also written to a
+    SQLite file so the cache survives restarts.
+    """
+
+    def __init__(self, maxsize=512, path=None):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        if path:
+            self._open(path)
+
+    def init_app(self, app):
+        self.maxsize = app.config.get('LLM_CACHE_SIZE', self.maxsize)
+        if app.config.get('LLM_CACHE_PATH'):
+            self._open(app.config['LLM_CACHE_PATH'])
+
+    def _open(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache (key TEXT PRIMARY KEY, value TEXT, used_at REAL)"
+            )
+            rows = self._conn.execute(
+                "SELECT key, value FROM llm_cache ORDER BY used_at DESC LIMIT ?", (self.maxsize,)
+            ).fetchall()
+            self._data.clear()
+            for key, value in reversed(rows):
+                self._data[key] = json.loads(value)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            evicted = []
+            while len(self._data) > self.maxsize:
+                evicted.append(self._data.popitem(last=False)[0])
+
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO llm_cache (key, value, used_at) VALUES (?, ?, ?)",
+                        (key, json.dumps(value), time.time())
+                    )
+                    self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", [(k,) for k in evicted])
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+            if self._conn is not None:
+                with self._conn:
+                    self._conn.execute("DELETE FROM llm_cache")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "persistent": self._conn is not None
+            }
+
+
+llm_cache = LLMResponseCache()
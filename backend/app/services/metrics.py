@@ -0,0 +1,286 @@
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Prometheus-style latency buckets, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+TOKEN_BUCKETS = (100, 200, 400, 600, 800, 1200, 2000, 4000, 8000)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += value
+        self.count += 1
+
+
+def _labels(labels):
+    return ','.join(f'{key}="{str(value).replace(chr(34), chr(39))}"' for key, value in labels)
+
+
+class MetricsRegistry:
+    """
+    In-process metrics: histograms and counters keyed by (name, labels).
+    Rendered in the Prometheus text format on /metrics.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = Counter()
+        self._help = {}
+        self._buckets = {}
+        self._gauge_callbacks = []
+
+    def describe(self, name, kind, text, buckets=None):
+        self._help[name] = (kind, text)
+        if buckets:
+            self._buckets[name] = buckets
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self._buckets.get(name, BUCKETS))
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        with self._lock:
+            self._counters[(name, tuple(sorted(labels.items())))] += amount
+
+    def gauge_callback(self, fn):
+        """fn() -> iterable of (name, labels_dict, value), evaluated at scrape time."""
+        if fn not in self._gauge_callbacks:
+            self._gauge_callbacks.append(fn)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self):
+        lines = []
+        described = set()
+
+        def header(name):
+            if name not in described and name in self._help:
+                kind, text = self._help[name]
+                lines.append(f'# HELP {name} {text}')
+                lines.append(f'# TYPE {name} {kind}')
+                described.add(name)
+
+        with self._lock:
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                header(name)
+                cumulative = 0
+                for bound, count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+                    cumulative += count
+                    le = _labels(labels + (('le', bound),))
+                    lines.append(f'{name}_bucket{{{le}}} {cumulative}')
+                lines.append(f'{name}_sum{{{_labels(labels)}}} {histogram.total:.6f}')
+                lines.append(f'{name}_count{{{_labels(labels)}}} {histogram.count}')
+
+            for (name, labels), value in sorted(self._counters.items()):
+                header(name)
+                lines.append(f'{name}{{{_labels(labels)}}} {value}')
+
+        for fn in self._gauge_callbacks:
+            for name, labels, value in fn():
+                header(name)
+                lines.append(f'{name}{{{_labels(sorted(labels.items()))}}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+metrics.describe('http_request_duration_seconds', 'histogram', 'Request latency by endpoint.')
+metrics.describe('http_requests_total', 'counter', 'Requests by endpoint and status.')
+metrics.describe('db_queries_per_request', 'histogram', 'SQL statements issued per request.', COUNT_BUCKETS)
+metrics.describe('db_query_seconds_total', 'counter', 'Time spent in SQL by endpoint.')
+metrics.describe('db_queries_total', 'counter', 'SQL statements by endpoint.')
+metrics.describe('outbound_request_duration_seconds', 'histogram', 'Upstream call latency by host.')
+metrics.describe('outbound_requests_total', 'counter', 'Upstream calls by host and outcome.')
+metrics.describe('cache_hits', 'gauge', 'Cache hits since start.')
+metrics.describe('cache_misses', 'gauge', 'Cache misses since start.')
+metrics.describe('cache_entries', 'gauge', 'Entries currently cached.')
+metrics.describe('auth_login_attempts_total', 'counter', 'Login attempts by outcome.')
+metrics.describe('ai_prompt_tokens', 'histogram', 'Estimated prompt size sent to Gemini.', TOKEN_BUCKETS)
+metrics.describe('ai_prompt_degraded_total', 'counter', 'Prompts shrunk to fit AI_PROMPT_TOKEN_BUDGET, by step.')
+metrics.describe('ai_time_to_first_suggestion_seconds', 'histogram', 'Time until the first streamed suggestion is sent.')
+metrics.describe('ai_stream_duration_seconds', 'histogram', 'Time until a suggestion stream is complete.')
+metrics.describe('outbound_circuit_state', 'gauge', 'Circuit breaker state (0 closed, 1 half-open, 2 open).')
+metrics.describe('reminder_lateness_seconds', 'histogram', 'Delay between a reminder falling due and being sent.')
+metrics.describe('reminders_sent_total', 'counter', 'Reminder deliveries by outcome.')
+metrics.describe('reminders_pending', 'gauge', 'Reminders queued within the loaded horizon.')
+
+
+# --- SQL HOOKS ---
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('query_started')
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+    if has_request_context() and 'metrics_started' in g:
+        g.sql_count += 1
+        g.sql_time += elapsed
+
+
+# --- OUTBOUND HOOK (called by services/outbound.py) ---
+def observe_outbound(host, seconds, outcome):
+    metrics.observe('outbound_request_duration_seconds', seconds, host=host)
+    metrics.inc('outbound_requests_total', host=host, outcome=outcome)
+
+
+# --- SAMPLING PROFILER ---
+def _stack_of(frame, limit=30):
+    """Innermost-last stack as a tuple of 'file:line function' (no source lookups)."""
+    stack = []
+    while frame is not None and len(stack) < limit:
+        code = frame.f_code
+        stack.append(f'{code.co_filename}:{frame.f_lineno} {code.co_name}')
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+class SlowRequestProfiler:
+    """
+    Opt-in sampler: while enabled, a background thread snapshots the stacks of
+    threads currently serving requests every `interval` seconds. Requests
+    slower than `threshold` keep their most frequent stacks in `recent`.
+    Samples are kept per request (begin() returns the key), so requests
+    that share a thread ident, as greenlets under serve.py do, never mix.
+    Stacks come from OS threads only; greenlet requests record no samples.
+    """
+
+    def __init__(self, interval=0.005, threshold=1.0, keep=20):
+        self.interval = interval
+        self.threshold = threshold
+        self.recent = deque(maxlen=keep)
+        self._active = {}  # request token -> (thread ident, Counter of stacks)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True, name='request-profiler')
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, samples in self._active.values():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        samples[_stack_of(frame)] += 1
+
+    def begin(self):
+        """Starts sampling the calling request; returns the token to pass to end()."""
+        token = object()
+        with self._lock:
+            self._active[token] = (threading.get_ident(), Counter())
+        return token
+
+    def end(self, token, endpoint, seconds, logger=None):
+        with self._lock:
+            _, samples = self._active.pop(token, (None, None))
+        if samples is None or seconds < self.threshold:
+            return
+        hot = [{"count": count, "stack": list(stack)} for stack, count in samples.most_common(5)]
+        self.recent.append({"endpoint": endpoint, "seconds": round(seconds, 3), "stacks": hot})
+        if logger is not None and hot:
+            logger.warning("Slow request %s (%.3fs), hottest stack:\n  %s",
+                           endpoint, seconds, '\n  '.join(hot[0]['stack'][-10:]))
+
+
+profiler = SlowRequestProfiler()
+
+
+# --- FLASK WIRING ---
+def _component_gauges():
+    """Cache, circuit breaker and reminder queue state, read at scrape time."""
+    from app.services.availability import availability_cache
+    from app.services.llm_cache import llm_cache
+    from app.services.outbound import outbound
+    from app.services.reminders import reminder_scheduler
+
+    for name, cache in (('availability', availability_cache), ('llm', llm_cache)):
+        stats = cache.stats()
+        yield 'cache_hits', {'cache': name}, stats['hits']
+        yield 'cache_misses', {'cache': name}, stats['misses']
+        yield 'cache_entries', {'cache': name}, stats['size']
+
+    states = {'closed': 0, 'half-open': 1, 'open': 2}
+    for host, breaker in list(outbound.breakers.items()):
+        yield 'outbound_circuit_state', {'host': host}, states[breaker.state]
+
+    yield 'reminders_pending', {}, len(reminder_scheduler.index)
+
+
+def init_app(app):
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+
+    metrics.gauge_callback(_component_gauges)
+
+    profiling = app.config.get('PROFILE_SLOW_REQUESTS', False)
+    if profiling:
+        profiler.interval = app.config.get('PROFILE_SAMPLE_INTERVAL', profiler.interval)
+        profiler.threshold = app.config.get('PROFILE_SLOW_THRESHOLD', profiler.threshold)
+        profiler.start()
+
+    @app.before_request
+    def start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        g.sql_count = 0
+        g.sql_time = 0.0
+        if profiling:
+            g.profile_token = profiler.begin()
+
+    @app.after_request
+    def remember_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    # Teardown runs even when the view raised (after_request does not), so 500s are counted
+    # and the profiler always lets go of the request
+    @app.teardown_request
+    def record_request_metrics(exc):
+        if 'metrics_started' not in g:
+            return
+        elapsed = time.perf_counter() - g.metrics_started
+        endpoint = request.endpoint or 'unmatched'
+        status = 500 if exc is not None else g.get('metrics_status', 500)
+
+        metrics.observe('http_request_duration_seconds', elapsed, endpoint=endpoint, method=request.method)
+        metrics.inc('http_requests_total', endpoint=endpoint, method=request.method, status=status)
+        metrics.observe('db_queries_per_request', g.sql_count, endpoint=endpoint)
+        metrics.inc('db_queries_total', g.sql_count, endpoint=endpoint)
+        metrics.inc('db_query_seconds_total', g.sql_time, endpoint=endpoint)
+
+        if 'profile_token' in g:
+            profiler.end(g.pop('profile_token'), endpoint, elapsed, app.logger)
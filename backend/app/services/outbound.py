@@ -0,0 +1,190 @@
+import functools
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from app.services.metrics import observe_outbound
+
+# Upstream answers worth another try (rate limited / temporarily down)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# requests is imported on first use, not at start-up (it is the slowest import
+# of the app); so is CircuitOpenError, which has to subclass its RequestException
+
+
+@functools.lru_cache(maxsize=None)
+def circuit_open_error():
+    """The CircuitOpenError class, defined (and requests imported) on first call."""
+    from requests.exceptions import RequestException
+
+    class CircuitOpenError(RequestException):
+        """Raised instead of calling an upstream whose circuit is open."""
+
+    CircuitOpenError.__qualname__ = 'CircuitOpenError'
+    return CircuitOpenError
+
+
+def __getattr__(name):
+    # `from app.services.outbound import CircuitOpenError` still works
+    if name == 'CircuitOpenError':
+        return circuit_open_error()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class CircuitBreaker:
+    """
+    Per-upstream breaker: opens after `threshold` consecutive failures and
+    lets a single trial call through once `reset_timeout` seconds have passed.
+    """
+
+    def __init__(self, threshold=5, reset_timeout=30):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                # Half-open: let this caller probe, keep the others out
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class OutboundClient:
+    """
+    Shared HTTP client for Google and Gemini calls.
+    One requests.Session keeps a keep-alive connection pool per host; every
+    call gets connect/read timeouts, bounded jittered retries and goes through
+    the circuit breaker of its upstream host. The session is built on first use.
+    """
+
+    def __init__(self):
+        self.connect_timeout = 3.05
+        self.read_timeout = 30
+        self.retries = 2
+        self.backoff = 0.2
+        self.breaker_threshold = 5
+        self.breaker_reset = 30
+        self.breakers = {}
+        self.pool_hosts = 10
+        self.pool_size = 10
+        self._session = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.connect_timeout = app.config.get('OUTBOUND_CONNECT_TIMEOUT', self.connect_timeout)
+        self.read_timeout = app.config.get('OUTBOUND_READ_TIMEOUT', self.read_timeout)
+        self.retries = app.config.get('OUTBOUND_RETRIES', self.retries)
+        self.backoff = app.config.get('OUTBOUND_BACKOFF', self.backoff)
+        self.breaker_threshold = app.config.get('OUTBOUND_BREAKER_THRESHOLD', self.breaker_threshold)
+        self.breaker_reset = app.config.get('OUTBOUND_BREAKER_RESET', self.breaker_reset)
+        self.pool_hosts = app.config.get('OUTBOUND_POOL_HOSTS', self.pool_hosts)
+        self.pool_size = app.config.get('OUTBOUND_POOL_SIZE', self.pool_size)
+        with self._lock:
+            self._session = None
+            # Breakers made under the previous settings start over with the new ones
+            self.breakers = {}
+
+    @property
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                self._session = self._build_session(self.pool_hosts, self.pool_size)
+            return self._session
+
+    def _build_session(self, pool_hosts, pool_size):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        # Retries are handled here (with jitter), not by urllib3
+        adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_size, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def breaker_for(self, host):
+        with self._lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+            return self.breakers[host]
+
+    def _sleep(self, attempt):
+        # Full jitter: random delay in [0, backoff * 2^attempt]
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def request(self, method, url, idempotent=True, timeout=None, **kwargs):
+        """
+        Sends a request through the pool.
+        Non-idempotent calls (e.g. creating an event) are only retried on a
+        connect timeout, so nothing is ever sent twice.
+        """
+        host = urlsplit(url).netloc
+        breaker = self.breaker_for(host)
+        if not breaker.allow():
+            observe_outbound(host, 0.0, 'circuit_open')
+            raise circuit_open_error()(f"Circuit open for {host}")
+
+        from requests.exceptions import ConnectionError, ConnectTimeout, Timeout
+
+        timeout = timeout or (self.connect_timeout, self.read_timeout)
+        attempt = 0
+        while True:
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, timeout=timeout, **kwargs)
+            except (ConnectionError, Timeout) as e:
+                observe_outbound(host, time.perf_counter() - started, type(e).__name__)
+                breaker.record_failure()
+                # A connect timeout means the request never left this host
+                retryable = idempotent or isinstance(e, ConnectTimeout)
+                if attempt >= self.retries or not retryable:
+                    raise
+            else:
+                observe_outbound(host, time.perf_counter() - started, str(response.status_code))
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+
+                if response.status_code not in RETRY_STATUSES or not idempotent or attempt >= self.retries:
+                    return response
+                # Give the connection back to the pool before the next attempt
+                response.close()
+
+            self._sleep(attempt)
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+
+outbound = OutboundClient()
@@ -0,0 +1,80 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HashingBusyError(Exception):
+    """Raised when too many password hashes are already queued."""
+
+
+class PasswordHasher:
+    """
+    Password hashing with a configurable werkzeug method
+    (PASSWORD_HASH_METHOD, e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000').
+    Hashes run on a small pool (PASSWORD_HASH_WORKERS) so a login burst cannot
+    tie up every request worker. No more than PASSWORD_HASH_MAX_PENDING
+    hashes may be queued or running; beyond that HashingBusyError is raised.
+    """
+
+    def __init__(self, method='scrypt:32768:8:1', workers=2, max_pending=32):
+        self.method = method
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor = None
+        self._prefix = None  # (method, prefix of a hash made with it)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', self.method)
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', self.workers)
+        self.max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING', self.max_pending)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+            return self._executor
+
+    def _run(self, fn, *args):
+        # Release the semaphore we took, even if init_app swaps in a new one meanwhile
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise HashingBusyError("Too many password checks in progress")
+        try:
+            return self._pool().submit(fn, *args).result()
+        finally:
+            slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def _method_prefix(self):
+        # Shorthands ('scrypt', 'pbkdf2:sha256') expand to full parameters in
+        # the hash, so compare with what the method actually writes (probed once)
+        method = self.method
+        cached = self._prefix
+        if cached is not None and cached[0] == method:
+            return cached[1]
+        # Hash outside the lock so a slow probe never blocks _pool(); concurrent
+        # first callers may each probe, which is harmless
+        prefix = generate_password_hash('probe', method).split('$', 1)[0]
+        with self._lock:
+            self._prefix = (method, prefix)
+        return prefix
+
+    def needs_rehash(self, password_hash):
+        """True when the stored hash was made with another method or cost."""
+        return password_hash.split('$', 1)[0] != self._method_prefix()
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,146 @@
+from collections import OrderedDict
+from datetime import timedelta
+
+from app.services.scheduler import WORK_END_HOUR, WORK_START_HOUR, busy_to_intervals, free_intervals, parse_timestamp
+
+# Rough size of a Gemini token for English/JSON text; good enough for a budget
+CHARS_PER_TOKEN = 4
+
+# Identical on every call so the model side can reuse it; everything that
+# varies goes after it.
+SUGGESTION_PREFIX = """Act as an expert Productivity Coach.
+Pick 3 optimal start times for the task below.
+RULES:
+1. Only use the FREE windows listed. They are already inside working hours with busy time removed; the task must fit inside one window.
+2. High priority: prefer morning windows (before 12:00) for deep work.
+3. Short tasks (under 30 min): prefer small windows so big ones stay free.
+4. If there is a deadline, finish before it.
+5. Give each pick a one-sentence "reason" with the productivity benefit.
+OUTPUT: valid JSON only, no markdown, no comments:
+{"suggestions": [{"start": "YYYY-MM-DDTHH:MM:SS", "reason": "..."}]}
+"""
+
+REASONS_PREFIX = """Act as an expert Productivity Coach.
+The task below is already scheduled into the numbered slots. Do not change them.
+For each slot, in order, write one short sentence explaining the productivity benefit.
+OUTPUT: valid JSON only, no markdown, no comments:
+{"reasons": ["...", "..."]}
+"""
+
+# Ways to shrink the windows list, tried in order until the prompt fits:
+# fewer windows per day (largest kept), then fewer days
+PER_DAY_STEPS = (None, 6, 4, 3, 2, 1)
+MAX_DESCRIPTION_CHARS = 200
+
+
+def estimate_tokens(text):
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+# --- HELPER: FREE WINDOWS ---
+def free_windows(busy_slots, now, days=3, min_minutes=0, work_start=WORK_START_HOUR, work_end=WORK_END_HOUR,
+                 hours=None):
+    """
+    Free time per day inside working hours: {date: [(start, end), ...]}.
+    Busy slots are merged first and windows shorter than `min_minutes`
+    (where the task cannot fit) are left out. `hours` is the user's own
+    working hours (see scheduler.free_intervals).
+    """
+    busy = busy_to_intervals(busy_slots)
+    shortest = timedelta(minutes=min_minutes)
+    windows = OrderedDict()
+    for start, end in free_intervals(busy, now, now + timedelta(days=days), work_start, work_end, hours):
+        if end - start >= shortest:
+            windows.setdefault(start.date(), []).append((start, end))
+    return windows
+
+
+def _window_lines(windows, per_day=None, days=None):
+    lines = []
+    for day, spans in list(windows.items())[:days]:
+        if per_day is not None and len(spans) > per_day:
+            spans = sorted(sorted(spans, key=lambda s: s[1] - s[0], reverse=True)[:per_day])
+        lines.append(f"{day.isoformat()}: " + " ".join(f"{s:%H:%M}-{e:%H:%M}" for s, e in spans))
+    return lines
+
+
+# --- PROMPT ---
+def suggestion_prompt(task, busy_slots, now, budget=None, days=3,
+                      work_start=WORK_START_HOUR, work_end=WORK_END_HOUR, hours=None):
+    """
+    Builds the suggestion prompt: SUGGESTION_PREFIX followed by the task and
+    its free windows per day. When `budget` (tokens) is set and the prompt
+    would exceed it, fewer windows are listed (the largest per day first,
+    then fewer days) and a note says so. Returns (text, stats).
+    """
+    duration = task.estimated_duration or 0
+    description = task.description or ''
+    deadline = f"{task.deadline:%Y-%m-%d %H:%M}" if task.deadline else "none"
+    windows = free_windows(busy_slots, now, days, duration, work_start, work_end, hours)
+    if hours is None:
+        heading = f"FREE WINDOWS (working hours {work_start:02d}:00-{work_end:02d}:00):"
+    else:
+        heading = "FREE WINDOWS (UTC, inside the user's working hours):"
+
+    def render(per_day, day_count, text):
+        lines = _window_lines(windows, per_day, day_count) or ["none"]
+        parts = [
+            SUGGESTION_PREFIX,
+            f"TODAY: {now:%Y-%m-%d %H:%M}",
+            f'TASK: "{text}" | priority {task.priority} | {duration or "unknown"} min | deadline {deadline}',
+            heading,
+            *lines,
+        ]
+        if per_day is not None or day_count is not None:
+            parts.append("(Only the largest windows are listed; the calendar is busier than shown.)")
+        return "\n".join(parts)
+
+    text = render(None, None, description)
+    degraded = None
+    if budget and estimate_tokens(text) > budget:
+        steps = [(per_day, None) for per_day in PER_DAY_STEPS[1:]] + \
+                [(1, day_count) for day_count in range(len(windows) - 1, 0, -1)]
+        for per_day, day_count in steps:
+            text = render(per_day, day_count, description)
+            degraded = 'windows'
+            if estimate_tokens(text) <= budget:
+                break
+        else:
+            # Even one window on one day is too much: the description has to give
+            text = render(1, 1, description[:MAX_DESCRIPTION_CHARS])
+            degraded = 'description'
+
+    return text, {
+        'tokens': estimate_tokens(text),
+        'windows': sum(len(spans) for spans in windows.values()),
+        'degraded': degraded,
+    }
+
+
+def reasons_prompt(task, slots, budget=None):
+    """
+    Builds the prompt that asks for one reason per already-picked slot:
+    REASONS_PREFIX, the task, then one compact line per slot. Over `budget`
+    (tokens) the description is shortened. Returns (text, stats).
+    """
+    duration = task.estimated_duration or 0
+    lines = []
+    for i, slot in enumerate(slots):
+        start, end = parse_timestamp(slot['start']), parse_timestamp(slot['end'])
+        lines.append(f"{i + 1}. {start:%Y-%m-%d %H:%M}-{end:%H:%M}")
+
+    def render(text):
+        return "\n".join([
+            REASONS_PREFIX,
+            f'TASK: "{text}" | priority {task.priority} | {duration or "unknown"} min',
+            "SLOTS:",
+            *lines,
+        ])
+
+    text = render(task.description or '')
+    degraded = None
+    if budget and estimate_tokens(text) > budget:
+        text = render((task.description or '')[:MAX_DESCRIPTION_CHARS])
+        degraded = 'description'
+
+    return text, {'tokens': estimate_tokens(text), 'slots': len(slots), 'degraded': degraded}
@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucketLimiter:
+    """
+    Token buckets by key (an IP, an email, ...): `per_minute` tokens are added
+    per minute up to `burst`, and every attempt takes one. Only the `maxsize`
+    most recently used keys are tracked. `clock` returns seconds
+    (time.monotonic unless a test injects its own).
+    """
+
+    def __init__(self, per_minute=30, burst=10, maxsize=100_000, clock=time.monotonic):
+        self.rate = per_minute / 60.0
+        self.clock = clock
+        self.burst = burst
+        self.maxsize = maxsize
+        self.rejected = 0
+        self._buckets = OrderedDict()  # key -> (tokens, last refill)
+        self._lock = threading.Lock()
+
+    def configure(self, per_minute, burst):
+        self.rate = per_minute / 60.0
+        self.burst = burst
+        self.clear()
+
+    def allow(self, key, take=True):
+        """
+        Returns (allowed, retry_after_seconds). take=False only checks that a
+        token is left, without using it (see consume).
+        """
+        now = self.clock()
+        with self._lock:
+            tokens = self._refill(key, now)
+            allowed = tokens >= 1
+            if allowed and take:
+                tokens -= 1
+            elif not allowed:
+                self.rejected += 1
+            self._store(key, tokens, now)
+        retry_after = 0 if allowed else ((1 - tokens) / self.rate if self.rate else 60.0)
+        return allowed, retry_after
+
+    def consume(self, key):
+        """Uses up a token after the fact (e.g. for a failed attempt); never goes below zero."""
+        now = self.clock()
+        with self._lock:
+            self._store(key, max(0.0, self._refill(key, now) - 1), now)
+
+    def _refill(self, key, now):
+        tokens, last = self._buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - last) * self.rate)
+
+    def _store(self, key, tokens, now):
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+            self.rejected = 0
+
+
+class LoginLimiter:
+    """
+    Buckets checked before any password hashing: every attempt from an IP
+    takes from that IP's bucket, and failed attempts on an account take from
+    the bucket for that account *from that IP*. Someone guessing a password
+    is slowed down without locking the owner out from their own address.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.by_ip = TokenBucketLimiter(per_minute=30, burst=20)
+        self.by_account = TokenBucketLimiter(per_minute=5, burst=10)
+
+    def init_app(self, app):
+        self.enabled = app.config.get('LOGIN_RATE_LIMIT', True)
+        self.by_ip.configure(app.config.get('LOGIN_IP_PER_MINUTE', 30), app.config.get('LOGIN_IP_BURST', 20))
+        self.by_account.configure(app.config.get('LOGIN_EMAIL_PER_MINUTE', 5),
+                                  app.config.get('LOGIN_EMAIL_BURST', 10))
+
+    @staticmethod
+    def _account(ip, email):
+        return (email or '').strip().lower(), ip
+
+    def check(self, ip, email):
+        """Returns None if the attempt may proceed, else seconds to wait."""
+        if not self.enabled:
+            return None
+        allowed, retry_after = self.by_ip.allow(ip)
+        if allowed:
+            allowed, retry_after = self.by_account.allow(self._account(ip, email), take=False)
+        return None if allowed else retry_after
+
+    def record_failure(self, ip, email):
+        if self.enabled:
+            self.by_account.consume(self._account(ip, email))
+
+
+login_limiter = LoginLimiter()
@@ -0,0 +1,216 @@
+import calendar
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from itertools import islice
+
+# RRULE subset we support: FREQ, INTERVAL and one of COUNT / UNTIL
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY')
+UNTIL_FORMATS = ('%Y%m%dT%H%M%S', '%Y%m%d')
+
+
+class RecurrenceError(ValueError):
+    """Raised for a rule we cannot parse or do not support."""
+
+
+# --- HELPER: PARSE / FORMAT RULES ---
+def parse_rule(value):
+    """
+    Normalizes a rule to {'freq', 'interval', 'count', 'until'}.
+    Accepts what the frontend sends ('Daily', 'Weekly', 'Monthly'), an RRULE
+    string ('FREQ=WEEKLY;INTERVAL=2;COUNT=10') or a dict with those keys.
+    """
+    if isinstance(value, dict):
+        parts = {str(k).upper(): v for k, v in value.items() if v is not None}
+    elif isinstance(value, str):
+        text = value.strip()
+        if text.upper().startswith('RRULE:'):
+            text = text[6:]
+        if '=' not in text:
+            parts = {'FREQ': text}
+        else:
+            try:
+                parts = dict(item.split('=', 1) for item in text.split(';') if item)
+            except ValueError:
+                raise RecurrenceError(f"Invalid rule: {value}")
+            parts = {k.strip().upper(): v.strip() for k, v in parts.items()}
+    else:
+        raise RecurrenceError("Rule must be a string or an object")
+
+    unknown = set(parts) - {'FREQ', 'INTERVAL', 'COUNT', 'UNTIL'}
+    if unknown:
+        raise RecurrenceError(f"Unsupported rule parts: {', '.join(sorted(unknown))}")
+
+    freq = str(parts.get('FREQ', '')).upper()
+    if freq not in FREQUENCIES:
+        raise RecurrenceError(f"FREQ must be one of {', '.join(FREQUENCIES)}")
+
+    try:
+        interval = int(parts.get('INTERVAL', 1))
+        count = int(parts['COUNT']) if 'COUNT' in parts else None
+    except (TypeError, ValueError):
+        raise RecurrenceError("INTERVAL and COUNT must be integers")
+    if interval < 1 or (count is not None and count < 1):
+        raise RecurrenceError("INTERVAL and COUNT must be positive")
+
+    until = parts.get('UNTIL')
+    if until is not None and not isinstance(until, datetime):
+        until = _parse_until(str(until))
+    if count is not None and until is not None:
+        raise RecurrenceError("Use either COUNT or UNTIL, not both")
+
+    return {'freq': freq, 'interval': interval, 'count': count, 'until': until}
+
+
+def _parse_until(text):
+    for fmt in UNTIL_FORMATS:
+        try:
+            return datetime.strptime(text.rstrip('Z'), fmt)
+        except ValueError:
+            pass
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise RecurrenceError(f"Invalid UNTIL: {text}")
+
+
+def format_rule(rule):
+    """Canonical RRULE string (what we store on the task)."""
+    parts = [f"FREQ={rule['freq']}"]
+    if rule['interval'] != 1:
+        parts.append(f"INTERVAL={rule['interval']}")
+    if rule['count'] is not None:
+        parts.append(f"COUNT={rule['count']}")
+    if rule['until'] is not None:
+        parts.append(f"UNTIL={rule['until'].strftime(UNTIL_FORMATS[0])}")
+    return ';'.join(parts)
+
+
+# --- EXPANSION ---
+def occurrences(rule, dtstart, start=None, end=None):
+    """
+    Yields occurrence datetimes in [start, end), lazily and in order.
+    Daily and weekly rules jump straight to the window, so a far-away window
+    costs the same as the first one. Monthly rules skip months that do not
+    have dtstart's day (the 31st), as RRULE does.
+    """
+    if isinstance(rule, str):
+        rule = parse_rule(rule)
+    count, until, interval = rule['count'], rule['until'], rule['interval']
+
+    if rule['freq'] == 'MONTHLY':
+        candidates = _monthly(dtstart, interval)
+        index = 0
+    else:
+        step = timedelta(days=interval * (7 if rule['freq'] == 'WEEKLY' else 1))
+        index = 0
+        if start is not None and start > dtstart:
+            index = -((dtstart - start) // step)  # ceil((start - dtstart) / step)
+        candidates = (dtstart + step * i for i in _count_from(index))
+
+    for value in candidates:
+        if count is not None and index >= count:
+            return
+        if until is not None and value > until:
+            return
+        if end is not None and value >= end:
+            return
+        index += 1
+        if start is None or value >= start:
+            yield value
+
+
+def _count_from(i):
+    while True:
+        yield i
+        i += 1
+
+
+def _monthly(dtstart, interval):
+    months = 0
+    while True:
+        year, month = divmod(dtstart.month - 1 + months, 12)
+        year += dtstart.year
+        if dtstart.day <= calendar.monthrange(year, month + 1)[1]:
+            yield dtstart.replace(year=year, month=month + 1)
+        months += interval
+
+
+class ExpansionCache:
+    """
+    LRU of expanded windows keyed by (task id, rule, dtstart, window).
+    The rule and anchor are part of the key, so an edited rule can never be
+    answered from an old entry; `invalidate` just frees the task's windows.
+    Windows with more than `max_items` occurrences are not kept.
+    """
+
+    def __init__(self, maxsize=1024, max_items=1000):
+        self.maxsize = maxsize
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._by_task = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.maxsize = app.config.get('RECURRENCE_CACHE_SIZE', self.maxsize)
+        self.max_items = app.config.get('RECURRENCE_CACHE_MAX_ITEMS', self.max_items)
+        self.clear()
+
+    def expand(self, task_id, rule, dtstart, start, end, limit=None):
+        """Up to `limit` occurrences of the window (an iterator), from the cache when we have it."""
+        key = (task_id, rule, dtstart, start, end, limit)
+        with self._lock:
+            cached = self._data.get(key)
+            if cached is not None:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return iter(cached)
+            self.misses += 1
+
+        generator = islice(occurrences(rule, dtstart, start, end), limit)
+        if self.maxsize <= 0:
+            return generator
+        head = tuple(islice(generator, self.max_items + 1))
+        if len(head) > self.max_items:
+            # Too big to keep: hand back what we have and keep streaming the rest
+            return _chain(head, generator)
+
+        with self._lock:
+            self._data[key] = head
+            self._by_task.setdefault(task_id, set()).add(key)
+            while len(self._data) > self.maxsize:
+                old, _ = self._data.popitem(last=False)
+                self._forget(old)
+        return iter(head)
+
+    def _forget(self, key):
+        keys = self._by_task.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_task[key[0]]
+
+    def invalidate(self, task_id):
+        with self._lock:
+            for key in self._by_task.pop(task_id, ()):
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._by_task.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+
+def _chain(head, rest):
+    yield from head
+    yield from rest
+
+
+expansion_cache = ExpansionCache()
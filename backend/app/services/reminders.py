@@ -0,0 +1,499 @@
+import heapq
+import logging
+import os
+import threading
+from collections import defaultdict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, bindparam, event, func, or_, update
+from sqlalchemy.orm import Session
+
+from app.extensions import db
+from app.models import Task
+from app.services.metrics import metrics
+from app.services.outbound import outbound
+from app.services.recurrence import occurrences
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: there every process delivers (see REMINDERS_ENABLED)
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Longest reminder lead we accept (a week)
+MAX_REMINDER_MINUTES = 7 * 24 * 60
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+Reminder = namedtuple('Reminder', 'task_id user_id description due_at occurs_at')
+
+
+def _ts(dt):
+    # Integer microseconds: exact round trip, unlike float seconds
+    return (dt - EPOCH) // MICROSECOND
+
+
+def _dt(ts):
+    return EPOCH + ts * MICROSECOND
+
+
+# --- HELPER: WHEN DOES A TASK REMIND ---
+def reminder_times(reminder_minutes, when, rule, rule_start, sent_through, start, end):
+    """Due times in (start, end] for one task, skipping what was already sent."""
+    if reminder_minutes is None:
+        return
+    lead = timedelta(minutes=reminder_minutes)
+    lower = max(start, sent_through) if sent_through else start
+    if rule and rule_start:
+        for occurs_at in occurrences(rule, rule_start, lower + lead, end + lead + MICROSECOND):
+            if occurs_at - lead > lower:
+                yield occurs_at - lead
+    elif when is not None and lower < when - lead <= end:
+        yield when - lead
+
+
+def reminder_fields(task):
+    """What reminder_times needs from a task; None once it is completed."""
+    if task.status == 'Completed':
+        return None
+    return (task.reminder_minutes, task.scheduled_start or task.deadline,
+            task.recurrence_rule, task.recurrence_start, task.reminder_sent_through)
+
+
+def task_reminder_times(task, start, end):
+    fields = reminder_fields(task)
+    return list(reminder_times(*fields, start, end)) if fields else []
+
+
+# --- DELIVERY ---
+class LogDelivery:
+    """Logs the reminder (the default; handy in development)."""
+
+    def deliver(self, reminder):
+        logger.info("Reminder for user %s: '%s' at %s", reminder.user_id, reminder.description,
+                    reminder.occurs_at.isoformat())
+
+
+class WebhookDelivery:
+    """POSTs each reminder as JSON to REMINDER_WEBHOOK_URL."""
+
+    def __init__(self, url, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def deliver(self, reminder):
+        response = outbound.post(self.url, idempotent=False, timeout=self.timeout, json={
+            'task_id': reminder.task_id,
+            'user_id': reminder.user_id,
+            'description': reminder.description,
+            'due_at': reminder.due_at.isoformat(),
+            'occurs_at': reminder.occurs_at.isoformat()
+        })
+        response.raise_for_status()
+
+
+class InAppDelivery:
+    """Keeps the latest reminders per user in memory until the client collects them."""
+
+    def __init__(self, per_user=50):
+        self._inbox = defaultdict(lambda: deque(maxlen=per_user))
+        self._lock = threading.Lock()
+
+    def deliver(self, reminder):
+        with self._lock:
+            self._inbox[reminder.user_id].append(reminder)
+
+    def collect(self, user_id):
+        with self._lock:
+            return list(self._inbox.pop(user_id, ()))
+
+
+DELIVERIES = {
+    'log': lambda app: LogDelivery(),
+    'webhook': lambda app: WebhookDelivery(app.config['REMINDER_WEBHOOK_URL'],
+                                           app.config.get('REMINDER_WEBHOOK_TIMEOUT', 5)),
+    'inapp': lambda app: InAppDelivery(app.config.get('REMINDER_INAPP_SIZE', 50)),
+}
+
+
+# --- INDEX ---
+class ReminderIndex:
+    """
+    Min-heap of (due time in microseconds, task id, generation). Replacing a task's
+    reminders bumps its generation instead of searching the heap; outdated
+    entries are skipped when they surface and dropped when they pile up.
+    Generations come from one counter for the whole index, so mark() tells
+    which tasks were replaced after a point in time.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._generation = {}  # task id -> current generation
+        self._live = {}        # task id -> queued entries of that generation
+        self._counter = 0
+        self._pinned = None    # the last mark(): generations after it survive compaction
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def mark(self):
+        """Take before reading tasks for add_many(since=...)."""
+        with self._lock:
+            self._pinned = self._counter
+            return self._counter
+
+    def add_many(self, entries, since=None):
+        """
+        Adds (task_id, due) pairs on top of what each task already has.
+        Tasks replaced after mark() returned `since` are skipped: the entries
+        were read before that edit and the replacement already has its times.
+        """
+        with self._lock:
+            if since is not None:
+                entries = [(task_id, due) for task_id, due in entries if self._generation.get(task_id, 0) <= since]
+                self._pinned = None
+            added = [(_ts(due), task_id, self._generation.setdefault(task_id, 0)) for task_id, due in entries]
+            for _, task_id, _ in added:
+                self._live[task_id] = self._live.get(task_id, 0) + 1
+            self._size += len(added)
+            if len(added) > len(self._heap):
+                self._heap.extend(added)
+                heapq.heapify(self._heap)
+            else:
+                for entry in added:
+                    heapq.heappush(self._heap, entry)
+
+    def replace(self, task_id, due_times):
+        """Drops the task's queued reminders and queues `due_times` instead."""
+        with self._lock:
+            self._counter += 1
+            generation = self._generation[task_id] = self._counter
+            self._size -= self._live.pop(task_id, 0)
+            for due in due_times:
+                heapq.heappush(self._heap, (_ts(due), task_id, generation))
+                self._live[task_id] = self._live.get(task_id, 0) + 1
+                self._size += 1
+            if len(self._heap) > 2 * self._size + 1024:
+                self._compact()
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if self._generation.get(entry[1]) == entry[2]]
+        heapq.heapify(self._heap)
+        # Nothing stale is left, so tasks without entries can forget their generation
+        # (unless a load in progress still has to skip them)
+        pinned = self._pinned
+        self._generation = {task_id: generation for task_id, generation in self._generation.items()
+                            if task_id in self._live or (pinned is not None and generation > pinned)}
+
+    def _drop_stale_top(self):
+        while self._heap and self._generation.get(self._heap[0][1]) != self._heap[0][2]:
+            heapq.heappop(self._heap)
+
+    def next_due(self):
+        with self._lock:
+            self._drop_stale_top()
+            return _dt(self._heap[0][0]) if self._heap else None
+
+    def pop_due(self, now, limit=1000):
+        """Removes and returns up to `limit` (due, task_id) pairs due at or before `now`."""
+        cutoff = _ts(now)
+        due = []
+        with self._lock:
+            while len(due) < limit:
+                self._drop_stale_top()
+                if not self._heap or self._heap[0][0] > cutoff:
+                    break
+                ts, task_id, _ = heapq.heappop(self._heap)
+                remaining = self._live[task_id] - 1
+                if remaining:
+                    self._live[task_id] = remaining
+                else:
+                    del self._live[task_id]
+                self._size -= 1
+                due.append((_dt(ts), task_id))
+        return due
+
+    def clear(self):
+        with self._lock:
+            self._heap = []
+            self._generation.clear()
+            self._live.clear()
+            self._counter = 0
+            self._pinned = None
+            self._size = 0
+
+
+# --- SCHEDULER ---
+class ReminderScheduler:
+    """
+    Fires task reminders from a single background thread.
+    Reminders due within REMINDER_HORIZON_MINUTES are loaded into a
+    ReminderIndex, one query per horizon slice; the thread sleeps until the
+    earliest one and is woken early when an edit queues an earlier reminder.
+    Delivery runs on a small pool so a slow webhook cannot hold up the clock.
+    Task edits update the index on commit.
+    Only one process delivers: the one holding an flock on REMINDER_LEADER_LOCK
+    (default instance/reminders.lock; the others keep trying, so one takes
+    over if the leader exits). Across hosts, set REMINDERS_ENABLED on one.
+    """
+
+    def __init__(self, horizon_minutes=360, grace_seconds=300, max_sleep=60, batch_size=1000, workers=4):
+        self.app = None
+        self.horizon = timedelta(minutes=horizon_minutes)
+        self.grace = timedelta(seconds=grace_seconds)
+        self.max_sleep = max_sleep
+        self.batch_size = batch_size
+        self.workers = workers
+        self.delivery = LogDelivery()
+        self.index = ReminderIndex()
+        self.loaded_until = None  # None until the first load: edits are ignored before that
+        self.leader_lock = None
+        self._leader_file = None
+        self._executor = None
+        self._thread = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.stop()
+        self.app = app
+        self.horizon = timedelta(minutes=app.config.get('REMINDER_HORIZON_MINUTES', 360))
+        self.grace = timedelta(seconds=app.config.get('REMINDER_GRACE_SECONDS', 300))
+        self.max_sleep = app.config.get('REMINDER_MAX_SLEEP', 60)
+        self.batch_size = app.config.get('REMINDER_BATCH_SIZE', 1000)
+        self.workers = app.config.get('REMINDER_DELIVERY_WORKERS', 4)
+        delivery = app.config.get('REMINDER_DELIVERY', 'log')
+        self.delivery = DELIVERIES[delivery](app) if isinstance(delivery, str) else delivery
+        self.leader_lock = app.config.get('REMINDER_LEADER_LOCK', os.path.join(app.instance_path, 'reminders.lock'))
+        self.index.clear()
+        self.loaded_until = None
+
+        if not event.contains(Session, 'after_flush', _collect_changes):
+            event.listen(Session, 'after_flush', _collect_changes)
+            event.listen(Session, 'after_commit', _apply_changes)
+            event.listen(Session, 'after_soft_rollback', _discard_changes)
+
+        # Off under tests unless asked for; tests drive load()/run_pending() directly.
+        # Started by the first request, so CLI commands (flask db upgrade) never run it
+        # and the schema is in place by the time it queries.
+        if app.config.get('REMINDERS_ENABLED', not app.testing):
+            app.before_request(self._start_once)
+
+    def _start_once(self):
+        if self._thread is None:
+            self.start()
+
+    def is_leader(self):
+        """Takes the leader lock if it is free; True while this process holds it (or no lock is configured)."""
+        if self._leader_file is not None or not self.leader_lock or fcntl is None:
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.leader_lock)), exist_ok=True)
+        handle = open(self.leader_lock, 'a')
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        self._leader_file = handle
+        logger.info("Reminder scheduler is the leader (pid %s)", os.getpid())
+        return True
+
+    # --- loading ---
+    def load(self, start, end):
+        """
+        Queues reminders due in (start, end] (one query) and moves the horizon to `end`.
+        The horizon moves first, so edits committed while the query runs already
+        queue up to `end`; their tasks are skipped here (see ReminderIndex.add_many).
+        """
+        since = self.index.mark()
+        previous, self.loaded_until = self.loaded_until, end
+        try:
+            entries = self._read_entries(start, end)
+        except Exception:
+            self.loaded_until = previous
+            raise
+        self.index.add_many(entries, since)
+        return len(entries)
+
+    def _read_entries(self, start, end):
+        # Widen the window by the longest lead actually in use, not the one we allow
+        lead = timedelta(minutes=db.session.query(func.max(Task.reminder_minutes)).scalar() or 0)
+        when = func.coalesce(Task.scheduled_start, Task.deadline)
+        query = db.session.query(
+            Task.id, Task.reminder_minutes, Task.scheduled_start, Task.deadline,
+            Task.recurrence_rule, Task.recurrence_start, Task.reminder_sent_through
+        ).filter(
+            Task.reminder_minutes.isnot(None),
+            or_(Task.status.is_(None), Task.status != 'Completed'),
+            or_(Task.recurrence_rule.isnot(None), and_(when > start, when <= end + lead))
+        ).execution_options(yield_per=self.batch_size)
+
+        return [
+            (row.id, due)
+            for row in query
+            for due in reminder_times(row.reminder_minutes, row.scheduled_start or row.deadline,
+                                      row.recurrence_rule, row.recurrence_start, row.reminder_sent_through,
+                                      start, end)
+        ]
+
+    def extend_horizon(self, now):
+        """Loads the next slice once less than half the horizon is left."""
+        if self.loaded_until is None:
+            # Catch up on what was missed while we were down, within the grace period
+            self.load(now - self.grace, now + self.horizon)
+        elif self.loaded_until - now < self.horizon / 2:
+            self.load(self.loaded_until, now + self.horizon)
+
+    def refresh(self, task_ids):
+        """Re-reads tasks changed outside the ORM (bulk statements) and requeues them."""
+        if self.loaded_until is None or not task_ids:
+            return
+        now = datetime.utcnow()
+        tasks = {task.id: task for task in Task.query.filter(Task.id.in_(task_ids))}
+        for task_id in task_ids:
+            task = tasks.get(task_id)
+            self.index.replace(task_id, task_reminder_times(task, now, self.loaded_until) if task else [])
+        self._wake.set()
+
+    # --- firing ---
+    def run_pending(self, now):
+        """Delivers every reminder due at or before `now`; returns how many were sent."""
+        sent = 0
+        while True:
+            due = self.index.pop_due(now, self.batch_size)
+            if not due:
+                return sent
+
+            rows = db.session.query(
+                Task.id, Task.user_id, Task.description, Task.status, Task.reminder_minutes
+            ).filter(Task.id.in_({task_id for _, task_id in due})).all()
+            tasks = {row.id: row for row in rows}
+
+            fired = {}
+            for due_at, task_id in due:
+                task = tasks.get(task_id)
+                if task is None or task.status == 'Completed' or task.reminder_minutes is None:
+                    continue  # deleted or finished since it was queued
+                reminder = Reminder(task_id, task.user_id, task.description, due_at,
+                                    due_at + timedelta(minutes=task.reminder_minutes))
+                metrics.observe('reminder_lateness_seconds', max(0.0, (now - due_at).total_seconds()))
+                self._deliver(reminder)
+                fired[task_id] = max(due_at, fired.get(task_id, due_at))
+                sent += 1
+
+            if fired:
+                # Core UPDATE: not a user edit, so no version bump or index update
+                db.session.execute(
+                    update(Task.__table__).where(Task.__table__.c.id == bindparam('task_id'))
+                    .values(reminder_sent_through=bindparam('sent_through')),
+                    [{'task_id': task_id, 'sent_through': due_at} for task_id, due_at in fired.items()]
+                )
+                db.session.commit()
+
+    def _deliver(self, reminder):
+        if self.workers <= 0:
+            self._send(reminder)
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='reminder-delivery')
+            executor = self._executor
+        executor.submit(self._send, reminder)
+
+    def _send(self, reminder):
+        try:
+            self.delivery.deliver(reminder)
+            metrics.inc('reminders_sent_total', outcome='sent')
+        except Exception as e:
+            metrics.inc('reminders_sent_total', outcome='failed')
+            logger.warning("Reminder delivery failed for task %s: %s", reminder.task_id, e)
+
+    # --- thread ---
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True, name='reminder-scheduler')
+            self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            self._wake.set()
+            thread.join(timeout=5)
+        with self._lock:
+            handle, self._leader_file = self._leader_file, None
+        if handle is not None:
+            handle.close()  # releases the flock for another process
+
+    def _run(self):
+        with self.app.app_context():
+            while not self._stop.is_set():
+                if not self.is_leader():
+                    # Another process delivers; check again in a while in case it exits
+                    self._wake.wait(self.max_sleep)
+                    self._wake.clear()
+                    continue
+                try:
+                    now = datetime.utcnow()
+                    self.extend_horizon(now)
+                    self.run_pending(now)
+                except Exception:
+                    logger.exception("Reminder scheduler error")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+                next_due = self.index.next_due()
+                wait = self.max_sleep
+                if next_due is not None:
+                    wait = min(wait, max(0.0, (next_due - datetime.utcnow()).total_seconds()))
+                self._wake.wait(wait)
+                self._wake.clear()
+
+    def wake(self):
+        self._wake.set()
+
+
+reminder_scheduler = ReminderScheduler()
+
+
+# --- KEEPING THE INDEX IN STEP WITH EDITS ---
+def _collect_changes(session, flush_context):
+    """after_flush: work out the new reminder times of every Task written through the ORM."""
+    scheduler = reminder_scheduler
+    if scheduler.loaded_until is None:
+        return
+    pending = session.info.setdefault('reminder_changes', {})
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Task) and (obj in session.new or session.is_modified(obj)):
+            pending[obj.id] = reminder_fields(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Task):
+            pending[obj.id] = None
+
+
+def _apply_changes(session):
+    pending = session.info.pop('reminder_changes', None)
+    if not pending:
+        return
+    # Due times up to the horizon as it is now: a load may have moved it since the flush
+    scheduler = reminder_scheduler
+    now, until = datetime.utcnow(), scheduler.loaded_until
+    if until is None:
+        return
+    for task_id, fields in pending.items():
+        scheduler.index.replace(task_id, list(reminder_times(*fields, now, until)) if fields else [])
+    scheduler.wake()
+
+
+def _discard_changes(session, previous_transaction):
+    session.info.pop('reminder_changes', None)
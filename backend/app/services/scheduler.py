@@ -0,0 +1,295 @@
+from datetime import datetime, timedelta, timezone
+
+# Default planning rules (mirrors what the Gemini prompt used to ask for)
+WORK_START_HOUR = 9
+WORK_END_HOUR = 17
+MORNING_END_HOUR = 12
+DEFAULT_DURATION = 60  # minutes, used when a task has no estimate
+SHORT_TASK_MINUTES = 30
+
+
+# --- HELPER: PARSE GOOGLE TIMESTAMPS ---
+def parse_timestamp(value):
+    """Turns an RFC3339 string (or datetime) into a naive UTC datetime."""
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def ceil_to_step(dt, step_minutes):
+    """Rounds a datetime up to the next multiple of `step_minutes`."""
+    floored = dt.replace(second=0, microsecond=0)
+    floored -= timedelta(minutes=floored.minute % step_minutes)
+    return floored if floored == dt else floored + timedelta(minutes=step_minutes)
+
+
+def merge_intervals(intervals):
+    """Sorts and merges overlapping/touching (start, end) intervals."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def busy_to_intervals(busy_slots):
+    """Converts Google freeBusy entries into merged datetime intervals."""
+    intervals = []
+    for slot in busy_slots:
+        try:
+            start = parse_timestamp(slot['start'])
+            end = parse_timestamp(slot['end'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if end > start:
+            intervals.append((start, end))
+    return merge_intervals(intervals)
+
+
+def daily_hours(window_start, window_end, work_start=WORK_START_HOUR, work_end=WORK_END_HOUR):
+    """work_start-work_end (UTC) on every day of the window, as sorted intervals."""
+    hours = []
+    day = window_start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < window_end:
+        hours.append((day.replace(hour=work_start), day.replace(hour=work_end)))
+        day += timedelta(days=1)
+    return hours
+
+
+def free_intervals(busy, window_start, window_end,
+                   work_start=WORK_START_HOUR, work_end=WORK_END_HOUR, hours=None):
+    """
+    Returns the sorted free intervals inside working hours.
+    `busy` must already be merged (see merge_intervals). `hours` (sorted
+    naive UTC intervals, e.g. a user's from timeline.working_intervals)
+    replaces the daily work_start-work_end window.
+    """
+    if hours is None:
+        hours = daily_hours(window_start, window_end, work_start, work_end)
+
+    free = []
+    i = 0
+    for opens, closes in hours:
+        cursor = max(opens, window_start)
+        day_end = min(closes, window_end)
+        if cursor >= day_end:
+            continue
+
+        # Skip busy blocks that ended before this working day starts
+        while i < len(busy) and busy[i][1] <= cursor:
+            i += 1
+
+        j = i
+        while cursor < day_end:
+            if j < len(busy) and busy[j][0] < day_end:
+                start, end = busy[j]
+                if start > cursor:
+                    free.append((cursor, start))
+                cursor = max(cursor, end)
+                j += 1
+            else:
+                free.append((cursor, day_end))
+                break
+
+    return free
+
+
+def local_time(dt, tz=None):
+    """Naive UTC -> naive wall-clock time in `tz` (unchanged without one)."""
+    if tz is None:
+        return dt
+    return dt.replace(tzinfo=timezone.utc).astimezone(tz).replace(tzinfo=None)
+
+
+def morning_end(start, tz=None):
+    """Naive UTC time of MORNING_END_HOUR on the (local) day of `start`."""
+    noon = local_time(start, tz).replace(hour=MORNING_END_HOUR, minute=0, second=0, microsecond=0)
+    if tz is None:
+        return noon
+    return noon.replace(tzinfo=tz).astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _score(start, end, gap, duration, priority, deadline, now, tz=None):
+    """Scores a candidate slot. Higher is better; returns (score, reason)."""
+    score = 0.0
+    reason = "Earliest open slot in your working hours"
+
+    # Sooner is better, but only slightly (about 1 point per day)
+    score -= (start - now).total_seconds() / 86400
+
+    if priority == 'High':
+        if end <= morning_end(start, tz):
+            score += 10
+            reason = "Morning slot for peak focus and deep work"
+    elif priority == 'Low' and local_time(start, tz).hour >= 13:
+        score += 2
+        reason = "Afternoon slot keeps your mornings free for bigger work"
+
+    if duration < SHORT_TASK_MINUTES:
+        # Best-fit: reward small gaps so large blocks stay free
+        score += 5 * duration / gap
+        if gap < 2 * duration:
+            reason = "Fits neatly into a small gap in your day"
+
+    if deadline is not None:
+        if end > deadline:
+            score -= 50
+            reason = "Only available time, but it runs past the deadline"
+        elif priority != 'High' or local_time(start, tz).hour >= MORNING_END_HOUR:
+            reason = f"Finishes before the deadline ({deadline.strftime('%b %d %H:%M')})"
+
+    return score, reason
+
+
+def find_slots(task, busy_slots, now=None, days=3, limit=3, step_minutes=30,
+               work_start=WORK_START_HOUR, work_end=WORK_END_HOUR, hours=None, tz=None):
+    """
+    Picks the best `limit` non-overlapping start times for a task.
+    Applies the same rules the LLM prompt described: avoid busy slots, stay
+    within working hours, prefer mornings for High priority, fit short tasks
+    into small gaps. `hours` and `tz` give the user's own working hours and
+    timezone (for "morning"); without them it is 09:00-17:00 UTC.
+    """
+    # Start on the step grid so suggestions land on round times
+    now = ceil_to_step(now or datetime.utcnow(), step_minutes)
+    duration = task.estimated_duration or DEFAULT_DURATION
+    length = timedelta(minutes=duration)
+    step = timedelta(minutes=step_minutes)
+
+    busy = busy_to_intervals(busy_slots)
+    free = free_intervals(busy, now, now + timedelta(days=days), work_start, work_end, hours)
+
+    candidates = []
+    for gap_start, gap_end in free:
+        gap_minutes = (gap_end - gap_start).total_seconds() / 60
+        if gap_minutes < duration:
+            continue
+
+        start = gap_start
+        while start + length <= gap_end:
+            end = start + length
+            score, reason = _score(start, end, gap_minutes, duration,
+                                   task.priority, task.deadline, now, tz)
+            candidates.append((score, start, end, reason))
+
+            # Snap the next candidate onto the step grid
+            offset = (start.minute % step_minutes) * 60 + start.second
+            start = start + step - timedelta(seconds=offset)
+
+    # Best score first; ties go to the earlier slot
+    candidates.sort(key=lambda c: (-c[0], c[1]))
+
+    chosen = []
+    for score, start, end, reason in candidates:
+        if any(start < c_end and c_start < end for _, c_start, c_end, _ in chosen):
+            continue
+        chosen.append((score, start, end, reason))
+        if len(chosen) == limit:
+            break
+
+    return [
+        {
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "score": round(score, 3),
+            "reason": reason
+        }
+        for score, start, end, reason in chosen
+    ]
+
+
+PRIORITY_RANK = {'High': 0, 'Medium': 1, 'Low': 2}
+
+
+def plan_order(task):
+    """Sort key for planning: priority first, then earliest deadline."""
+    return (
+        PRIORITY_RANK.get(task.priority, 1),
+        task.deadline is None,
+        task.deadline or datetime.max,
+        task.id
+    )
+
+
+def plan_tasks(tasks, busy_slots, now=None, days=3, step_minutes=15, max_tasks=500,
+               work_start=WORK_START_HOUR, work_end=WORK_END_HOUR, hours=None, tz=None):
+    """
+    Packs many tasks into the free time in a single greedy pass.
+    Tasks are taken by priority and deadline; each one gets the earliest
+    free slot that fits (a morning slot first for High priority), and that
+    time is removed from the free list so no two tasks overlap.
+    `hours`/`tz` work as in find_slots. Returns (plan, unscheduled).
+    """
+    now = ceil_to_step(now or datetime.utcnow(), step_minutes)
+
+    busy = busy_to_intervals(busy_slots)
+    free = free_intervals(busy, now, now + timedelta(days=days), work_start, work_end, hours)
+
+    plan = []
+    unscheduled = []
+    ordered = sorted(tasks, key=plan_order)
+
+    for task in ordered[max_tasks:]:
+        unscheduled.append({"task_id": task.id, "reason": "Over the planning limit"})
+
+    for task in ordered[:max_tasks]:
+        length = timedelta(minutes=task.estimated_duration or DEFAULT_DURATION)
+        placed = None
+
+        for i, (gap_start, gap_end) in enumerate(free):
+            # Snap onto the step grid so plans land on round times
+            start = ceil_to_step(gap_start, step_minutes)
+            if start + length > gap_end:
+                continue
+            if task.priority == 'High' and start + length > morning_end(start, tz):
+                # Remember the first fit, but keep looking for a morning one
+                if placed is None:
+                    placed = (i, start)
+                continue
+            placed = (i, start)
+            break
+
+        if placed is None:
+            unscheduled.append({"task_id": task.id, "reason": "No free slot long enough"})
+            continue
+
+        i, start = placed
+        end = start + length
+        gap_start, gap_end = free[i]
+
+        # Carve the slot out of the free interval
+        pieces = []
+        if start - gap_start >= timedelta(minutes=step_minutes):
+            pieces.append((gap_start, start))
+        if gap_end > end:
+            pieces.append((end, gap_end))
+        free[i:i + 1] = pieces
+
+        if task.deadline is not None and end > task.deadline:
+            reason = "Earliest free time, but it runs past the deadline"
+        elif task.priority == 'High' and end <= morning_end(start, tz):
+            reason = "Morning slot for peak focus and deep work"
+        elif task.deadline is not None:
+            reason = f"Finishes before the deadline ({task.deadline.strftime('%b %d %H:%M')})"
+        else:
+            reason = "Earliest free slot after higher-priority work"
+
+        plan.append({
+            "task_id": task.id,
+            "description": task.description,
+            "priority": task.priority,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "reason": reason
+        })
+
+    plan.sort(key=lambda item: item['start'])
+    return plan, unscheduled
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, event, func, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.extensions import db
+from app.models import Task, TaskTombstone, User
+
+
+def _bump_version(connection, user_id):
+    """Increments the user's task version in SQL (row-locked until commit) and returns it."""
+    connection.execute(
+        update(User.__table__)
+        .where(User.__table__.c.id == user_id)
+        .values(task_version=func.coalesce(User.__table__.c.task_version, 0) + 1)
+    )
+    return connection.execute(
+        select(User.__table__.c.task_version).where(User.__table__.c.id == user_id)
+    ).scalar()
+
+
+def record_task_changes(connection, changed, deleted):
+    """
+    Stamps changed tasks with a fresh per-user version and writes tombstones
+    for deleted ones. `changed` and `deleted` map user_id -> task ids.
+    Returns {user_id: new_version}.
+    """
+    versions = {}
+    for user_id in set(changed) | set(deleted):
+        version = _bump_version(connection, user_id)
+        versions[user_id] = version
+
+        if changed.get(user_id):
+            connection.execute(
+                update(Task.__table__)
+                .where(Task.__table__.c.id.in_(changed[user_id]))
+                .values(version=version)
+            )
+        if deleted.get(user_id):
+            connection.execute(
+                TaskTombstone.__table__.insert(),
+                [{"user_id": user_id, "task_id": task_id, "version": version, "deleted_at": datetime.utcnow()}
+                 for task_id in deleted[user_id]]
+            )
+            # Deleting is what grows the table, so that is when old tombstones go
+            days = current_app.config.get('TOMBSTONE_RETENTION_DAYS', 30)
+            prune_tombstones(connection, user_id, datetime.utcnow() - timedelta(days=days))
+    return versions
+
+
+def prune_tombstones(connection, user_id, cutoff):
+    """
+    Deletes the user's tombstones written before `cutoff` and moves their
+    tombstones_pruned_through up to the newest pruned version. Returns that
+    version, or None when nothing was old enough.
+    """
+    tombstones, users = TaskTombstone.__table__, User.__table__
+    newest = connection.execute(
+        select(func.max(tombstones.c.version))
+        .where(tombstones.c.user_id == user_id, tombstones.c.deleted_at < cutoff)
+    ).scalar()
+    if newest is None:
+        return None
+
+    connection.execute(delete(tombstones).where(tombstones.c.user_id == user_id, tombstones.c.version <= newest))
+    floor = connection.execute(select(users.c.tombstones_pruned_through).where(users.c.id == user_id)).scalar()
+    connection.execute(update(users).where(users.c.id == user_id)
+                       .values(tombstones_pruned_through=max(floor or 0, newest)))
+    return newest
+
+
+def _track_task_changes(session, flush_context):
+    """after_flush hook: any Task written through the ORM bumps its owner's version."""
+    changed, deleted, touched = {}, {}, []
+    for obj in session.new | session.dirty:
+        if isinstance(obj, Task) and (obj in session.new or session.is_modified(obj)):
+            changed.setdefault(int(obj.user_id), set()).add(obj.id)
+            touched.append(obj)
+    for obj in session.deleted:
+        if isinstance(obj, Task):
+            deleted.setdefault(int(obj.user_id), set()).add(obj.id)
+
+    if not changed and not deleted:
+        return
+
+    versions = record_task_changes(session.connection(), changed, deleted)
+    for obj in touched:
+        # Keep the in-memory object in step without marking it dirty again
+        set_committed_value(obj, 'version', versions[int(obj.user_id)])
+
+
+def init_change_tracking():
+    if not event.contains(Session, 'after_flush', _track_task_changes):
+        event.listen(Session, 'after_flush', _track_task_changes)
+
+
+def current_version(user_id):
+    return db.session.query(User.task_version).filter(User.id == user_id).scalar() or 0
+
+
+def pruned_through(user_id):
+    """Delta requests with `since` below this version cannot be answered from tombstones."""
+    return db.session.query(User.tombstones_pruned_through).filter(User.id == user_id).scalar() or 0
+
+
+def deleted_since(user_id, version):
+    """Task ids deleted after `version`."""
+    rows = db.session.query(TaskTombstone.task_id) \
+        .filter(TaskTombstone.user_id == user_id, TaskTombstone.version > version) \
+        .all()
+    return [row.task_id for row in rows]
@@ -0,0 +1,189 @@
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from app.services.scheduler import WORK_END_HOUR, WORK_START_HOUR, parse_timestamp
+
+# Google answers at most 50 calendars per freeBusy request
+MAX_CALENDARS = 50
+DEFAULT_CALENDARS = ('primary',)
+DEFAULT_HOURS = {'start': f'{WORK_START_HOUR:02d}:00', 'end': f'{WORK_END_HOUR:02d}:00', 'days': list(range(7))}
+
+
+class PreferencesError(ValueError):
+    """Invalid calendar, timezone or working hours preference."""
+
+
+# --- PREFERENCES ---
+def selected_calendars(preferences):
+    """Calendar ids to read availability from (User.preferences['calendars'], else primary)."""
+    return tuple((preferences or {}).get('calendars') or DEFAULT_CALENDARS)
+
+
+def user_timezone(preferences):
+    name = (preferences or {}).get('timezone') or 'UTC'
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo('UTC')
+
+
+def working_hours(preferences):
+    """(start time, end time, weekdays) from User.preferences['working_hours'] (Monday = 0)."""
+    hours = dict(DEFAULT_HOURS, **((preferences or {}).get('working_hours') or {}))
+    return time.fromisoformat(hours['start']), time.fromisoformat(hours['end']), frozenset(hours['days'])
+
+
+def parse_preferences(data, current=None):
+    """
+    Validates a preferences update ({calendars, timezone, working_hours}, all
+    optional) and returns the merged preferences dict. Raises PreferencesError.
+    """
+    preferences = dict(current or {})
+
+    if 'calendars' in data:
+        calendars = data['calendars']
+        if not isinstance(calendars, list) or not all(isinstance(c, str) and c.strip() for c in calendars):
+            raise PreferencesError("calendars must be a list of calendar ids")
+        calendars = list(dict.fromkeys(c.strip() for c in calendars))
+        if not calendars or len(calendars) > MAX_CALENDARS:
+            raise PreferencesError(f"Choose between 1 and {MAX_CALENDARS} calendars")
+        preferences['calendars'] = calendars
+
+    if 'timezone' in data:
+        try:
+            ZoneInfo(data['timezone'])
+        except (ZoneInfoNotFoundError, ValueError, TypeError):
+            raise PreferencesError(f"Unknown timezone: {data['timezone']}")
+        preferences['timezone'] = data['timezone']
+
+    if 'working_hours' in data:
+        hours = dict(DEFAULT_HOURS, **(data['working_hours'] or {}))
+        try:
+            start, end = time.fromisoformat(hours['start']), time.fromisoformat(hours['end'])
+            days = sorted({int(day) for day in hours['days']})
+        except (TypeError, ValueError):
+            raise PreferencesError("working_hours needs start/end as HH:MM and days as weekday numbers")
+        if start >= end or not all(0 <= day <= 6 for day in days):
+            raise PreferencesError("working_hours must end after they start, on weekdays 0 (Monday) to 6")
+        preferences['working_hours'] = {'start': f'{start:%H:%M}', 'end': f'{end:%H:%M}', 'days': days}
+
+    return preferences
+
+
+# --- HELPER: WORKING HOURS MASK ---
+def working_mask(window_start, window_end, tz, start, end, days):
+    """
+    Working hours inside [window_start, window_end) as sorted naive UTC
+    intervals. Each local day is converted on its own, so DST changes move
+    the mask with the wall clock.
+    """
+    mask = []
+    local_day = window_start.replace(tzinfo=timezone.utc).astimezone(tz).date() - timedelta(days=1)
+    last_day = window_end.replace(tzinfo=timezone.utc).astimezone(tz).date()
+    while local_day <= last_day:
+        if local_day.weekday() in days:
+            opens = datetime.combine(local_day, start, tz).astimezone(timezone.utc).replace(tzinfo=None)
+            closes = datetime.combine(local_day, end, tz).astimezone(timezone.utc).replace(tzinfo=None)
+            if closes > window_start and opens < window_end:
+                mask.append((max(opens, window_start), min(closes, window_end)))
+        local_day += timedelta(days=1)
+    return mask
+
+
+def working_intervals(preferences, window_start, window_end):
+    """A user's working hours in the window as naive UTC intervals (09:00-17:00 UTC daily by default)."""
+    return working_mask(window_start, window_end, user_timezone(preferences), *working_hours(preferences))
+
+
+# --- SWEEP LINE ---
+def sweep(busy, window_start=None, window_end=None, mask=None):
+    """
+    One pass over every interval boundary, sorted: O(n log n) for n intervals
+    from any number of calendars, overlapping or not.
+    Returns sorted, non-overlapping (start, end, status) segments covering
+    the window, where status is 'busy', 'free' (inside `mask`, or anywhere
+    when there is no mask) or 'off'. Adjacent segments never share a status.
+    Without a window, the segments span the first to the last boundary.
+    """
+    events = []
+    for start, end in busy:
+        if end > start:
+            events.append((start, 1, 0))
+            events.append((end, -1, 0))
+    for start, end in mask or ():
+        if end > start:
+            events.append((start, 0, 1))
+            events.append((end, 0, -1))
+    if not events:
+        return [(window_start, window_end, 'off' if mask is not None else 'free')] \
+            if window_start is not None and window_end > window_start else []
+    events.sort()
+
+    lower = events[0][0] if window_start is None else window_start
+    upper = events[-1][0] if window_end is None else window_end
+    segments = []
+    depth = hours = 0
+    cursor = lower
+    for at, busy_delta, hours_delta in events:
+        at = min(max(at, lower), upper)
+        if at > cursor:
+            status = 'busy' if depth else ('free' if hours or mask is None else 'off')
+            if segments and segments[-1][2] == status:
+                segments[-1] = (segments[-1][0], at, status)
+            else:
+                segments.append((cursor, at, status))
+            cursor = at
+        depth += busy_delta
+        hours += hours_delta
+
+    if upper > cursor:
+        status = 'free' if mask is None else 'off'
+        if segments and segments[-1][2] == status:
+            segments[-1] = (segments[-1][0], upper, status)
+        else:
+            segments.append((cursor, upper, status))
+    return segments
+
+
+def merge_busy(busy):
+    """Union of busy (start, end) intervals, sorted and non-overlapping (touching ones joined)."""
+    return [(start, end) for start, end, status in sweep(busy) if status == 'busy']
+
+
+def slots_to_intervals(busy_slots):
+    """freeBusy entries ({'start', 'end'} RFC3339) -> naive UTC intervals; bad entries are skipped."""
+    intervals = []
+    for slot in busy_slots:
+        try:
+            intervals.append((parse_timestamp(slot['start']), parse_timestamp(slot['end'])))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return intervals
+
+
+def intervals_to_slots(intervals):
+    return [{"start": start.isoformat() + 'Z', "end": end.isoformat() + 'Z'} for start, end in intervals]
+
+
+# --- TIMELINE ---
+def build_timeline(busy_slots, time_min, time_max, preferences=None):
+    """
+    Busy/free timeline for [time_min, time_max) in the user's timezone, with
+    free time limited to their working hours. Returns a dict with the
+    timezone, the merged busy and free slots, and the full segment list.
+    """
+    tz = user_timezone(preferences)
+    window_start, window_end = parse_timestamp(time_min), parse_timestamp(time_max)
+    mask = working_mask(window_start, window_end, tz, *working_hours(preferences))
+    segments = sweep(slots_to_intervals(busy_slots), window_start, window_end, mask)
+
+    def local(dt):
+        return dt.replace(tzinfo=timezone.utc).astimezone(tz).isoformat()
+
+    timeline = [{"start": local(start), "end": local(end), "status": status} for start, end, status in segments]
+    return {
+        "timezone": tz.key,
+        "busy": [{"start": s["start"], "end": s["end"]} for s in timeline if s["status"] == 'busy'],
+        "free": [{"start": s["start"], "end": s["end"]} for s in timeline if s["status"] == 'free'],
+        "timeline": timeline
+    }
@@ -0,0 +1,101 @@
+import logging
+import threading
+import time
+from urllib.parse import urlsplit
+
+from app.extensions import db
+from app.services.outbound import outbound
+
+logger = logging.getLogger(__name__)
+
+
+def upstream_origins(app):
+    """scheme://host of every upstream the app calls (WARMUP_URLS overrides), in order, without duplicates."""
+    from app.services.ai import GEMINI_URL
+    from app.services.availability import FREEBUSY_URL
+    from app.services.calendar_sync import CALENDAR_API_URL
+
+    urls = app.config.get('WARMUP_URLS')
+    if urls is None:
+        urls = [
+            app.config.get('GOOGLE_TOKEN_URL'),
+            app.config.get('GOOGLE_FREEBUSY_URL', FREEBUSY_URL),
+            app.config.get('GOOGLE_CALENDAR_API_URL', CALENDAR_API_URL),
+            app.config.get('GEMINI_API_URL', GEMINI_URL),
+        ]
+    origins = []
+    for url in filter(None, urls):
+        parts = urlsplit(url)
+        origin = f'{parts.scheme}://{parts.netloc}/'
+        if origin not in origins:
+            origins.append(origin)
+    return origins
+
+
+class PoolWarmer:
+    """
+    Opens database connections (WARMUP_DB_CONNECTIONS) and one keep-alive
+    connection per upstream host on a background thread, so the first
+    requests do not pay for the connects, TLS handshakes and the requests
+    import. Started once the server accepts traffic: by serve.py right
+    after binding, or by the first request otherwise. WARMUP_ENABLED=False
+    turns it off (the default under tests).
+    """
+
+    def __init__(self):
+        self.app = None
+        self.result = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.result = None
+        with self._lock:
+            self._thread = None
+        if app.config.get('WARMUP_ENABLED', not app.testing):
+            app.before_request(self.start)
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None or self.app is None:
+                return
+            self._thread = threading.Thread(target=self.warm_up, daemon=True, name='pool-warmup')
+            self._thread.start()
+
+    def wait(self, timeout=None):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.result
+
+    def warm_up(self):
+        started = time.perf_counter()
+        app = self.app
+        result = {'db_connections': 0, 'hosts': []}
+        with app.app_context():
+            connections = []
+            try:
+                # Held together so the pool opens new ones instead of reusing the first
+                for _ in range(app.config.get('WARMUP_DB_CONNECTIONS', 2)):
+                    connections.append(db.engine.connect())
+            except Exception as e:
+                logger.warning("Warm-up database error: %s", e)
+            finally:
+                for connection in connections:
+                    connection.close()
+            result['db_connections'] = len(connections)
+
+            # Straight on the session: a failed warm-up must not count against the circuit breakers
+            timeout = (outbound.connect_timeout, app.config.get('WARMUP_TIMEOUT', 5))
+            for origin in upstream_origins(app):
+                try:
+                    outbound.session.head(origin, timeout=timeout)
+                    result['hosts'].append(origin)
+                except Exception as e:
+                    logger.warning("Warm-up error for %s: %s", origin, e)
+        result['seconds'] = round(time.perf_counter() - started, 3)
+        self.result = result
+        return result
+
+
+pool_warmer = PoolWarmer()
@@ -0,0 +1,257 @@
+"""
+/api/ai/suggest under growing concurrency, with freeBusy answered by a local
+stub that sleeps --upstream-ms. Compares three servers:
+  - pool:     fixed pool of --workers threads (like sync/threaded workers)
+  - threaded: one thread per connection (Werkzeug dev server)
+  - gevent:   the greenlet server from serve.py
+reporting throughput, latency and the server's peak RSS / thread count / CPU.
+
+Run from backend/:  python -m benchmarks.bench_async [--levels 50,200,500] [--upstream-ms 200]
+"""
+import sys
+
+if __name__ == '__main__' and '--serve=gevent' in sys.argv:
+    from gevent import monkey
+    monkey.patch_all()  # same as serve.py; must precede the imports below
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from app import create_app
+from benchmarks.bench_tasks_list import make_app, make_config
+
+
+def make_freebusy_stub(delay):
+    class FreeBusyStub(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            time.sleep(delay)
+            body = json.dumps({"calendars": {"primary": {"busy": [
+                {"start": "2030-01-01T09:00:00Z", "end": "2030-01-01T10:00:00Z"}
+            ]}}}).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+    return FreeBusyStub
+
+
+class StubServer(ThreadingHTTPServer):
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+def server_config(db_path, freebusy_url):
+    overrides = {
+        'GOOGLE_FREEBUSY_URL': freebusy_url,
+        'CALENDAR_USE_MIRROR': False,
+        'AVAILABILITY_CACHE_TTL': 0,
+        'OUTBOUND_POOL_SIZE': 1000,
+        'BACKGROUND_WORKERS': 1000,
+        'SQLALCHEMY_ENGINE_OPTIONS': {'max_overflow': -1},
+    }
+    return type('AsyncBenchConfig', (make_config(db_path),), overrides)
+
+
+def make_pool_server(port, app, workers):
+    from werkzeug.serving import BaseWSGIServer
+
+    class PoolServer(BaseWSGIServer):
+        """Werkzeug server that hands connections to a fixed thread pool."""
+        request_queue_size = 1024
+
+        def __init__(self):
+            super().__init__('127.0.0.1', port, app)
+            self.pool = ThreadPoolExecutor(max_workers=workers)
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self.handle_in_pool, request, client_address)
+
+        def handle_in_pool(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    return PoolServer()
+
+
+def serve(mode, port, db_path, freebusy_url, workers):
+    """Child process: runs the app with one of the servers."""
+    app = create_app(server_config(db_path, freebusy_url))
+    app.logger.disabled = True
+    logging.getLogger('werkzeug').disabled = True
+    if mode == 'gevent':
+        from gevent.pool import Pool
+        from gevent.pywsgi import WSGIServer
+        WSGIServer(('127.0.0.1', port), app, spawn=Pool(2000), log=None).serve_forever()
+    elif mode == 'pool':
+        make_pool_server(port, app, workers).serve_forever()
+    else:
+        from werkzeug.serving import make_server
+        server = make_server('127.0.0.1', port, app, threaded=True)
+        server.socket.listen(1024)
+        server.serve_forever()
+
+
+def seed(db_path, freebusy_url, users):
+    from flask_jwt_extended import create_access_token
+    from app.extensions import db
+    from app.models import Task, User
+
+    app = make_app(db_path, server_config(db_path, freebusy_url))
+    tokens, task_ids = [], []
+    with app.app_context():
+        for i in range(users):
+            user = User(email=f'user{i}@example.com', google_access_token='token',
+                        google_token_expires_at=datetime.utcnow() + timedelta(days=1))
+            user.set_password('bench')
+            db.session.add(user)
+            db.session.flush()
+            task = Task(user_id=user.id, description='Bench task', priority='High', estimated_duration=45)
+            db.session.add(task)
+            db.session.flush()
+            tokens.append(create_access_token(identity=str(user.id), expires_delta=timedelta(hours=1)))
+            task_ids.append(task.id)
+        db.session.commit()
+    return list(zip(tokens, task_ids))
+
+
+def cpu_seconds(pid):
+    fields = open(f'/proc/{pid}/stat').read().rsplit(')', 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+def read_status(pid):
+    """(rss_mb, threads) from /proc."""
+    values = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            values[key] = value.split()
+    return int(values['VmRSS'][0]) / 1024, int(values['Threads'][0])
+
+
+def drive(url, pid, logins, concurrency, seconds):
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    peak = [0.0, 0]
+
+    def client(seed):
+        rng = random.Random(seed)
+        session = requests.Session()
+        mine = []
+        while time.perf_counter() < deadline:
+            token, task_id = rng.choice(logins)
+            t0 = time.perf_counter()
+            try:
+                code = session.post(f'{url}/api/ai/suggest', json={'task_id': task_id},
+                                    headers={'Authorization': f'Bearer {token}'}, timeout=30).status_code
+            except requests.RequestException:
+                code = 'error'
+            mine.append((time.perf_counter() - t0) * 1000)
+            with lock:
+                statuses[code] = statuses.get(code, 0) + 1
+        with lock:
+            latencies.extend(mine)
+
+    def sample():
+        while time.perf_counter() < deadline:
+            rss, threads = read_status(pid)
+            peak[0], peak[1] = max(peak[0], rss), max(peak[1], threads)
+            time.sleep(0.1)
+
+    cpu_start = cpu_seconds(pid)
+    workers = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    workers.append(threading.Thread(target=sample))
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+    cpu = (cpu_seconds(pid) - cpu_start) / seconds
+    latencies.sort()
+    ok = statuses.get(200, 0)
+    return {
+        "ok_per_s": ok / seconds,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(len(latencies) * 0.95)],
+        "peak_rss_mb": peak[0],
+        "peak_threads": peak[1],
+        "server_cpu": cpu,
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--levels', default='50,200,500', help='concurrent clients per round')
+    parser.add_argument('--upstream-ms', type=float, default=200)
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--users', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=8, help='threads of the fixed pool server')
+    parser.add_argument('--serve', help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    parser.add_argument('--freebusy', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.db, args.freebusy, args.workers)
+        return
+
+    stub = StubServer(('127.0.0.1', 0), make_freebusy_stub(args.upstream_ms / 1000))
+    threading.Thread(target=stub.serve_forever, daemon=True).start()
+    freebusy_url = f'http://127.0.0.1:{stub.server_address[1]}/freeBusy'
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    logins = seed(db_path, freebusy_url, args.users)
+
+    for offset, mode in enumerate(['pool', 'threaded', 'gevent']):
+        port = 18400 + offset
+        child = subprocess.Popen([sys.executable, '-m', 'benchmarks.bench_async', f'--serve={mode}',
+                                  f'--port={port}', f'--db={db_path}', f'--freebusy={freebusy_url}',
+                                  f'--workers={args.workers}'])
+        url = f'http://127.0.0.1:{port}'
+        try:
+            for _ in range(100):
+                try:
+                    requests.get(f'{url}/metrics', timeout=1)
+                    break
+                except requests.RequestException:
+                    time.sleep(0.1)
+            for level in [int(n) for n in args.levels.split(',')]:
+                r = drive(url, child.pid, logins, level, args.seconds)
+                print(f"{mode:9s} c={level:<5d} {r['ok_per_s']:7.0f} ok/s  p50 {r['p50_ms']:7.1f}ms  "
+                      f"p95 {r['p95_ms']:7.1f}ms  rss {r['peak_rss_mb']:6.1f}MB  "
+                      f"threads {r['peak_threads']:4d}  cpu {r['server_cpu']:4.0%}  {r['statuses']}")
+        finally:
+            child.terminate()
+            child.wait()
+
+
+if __name__ == '__main__':
+    main()
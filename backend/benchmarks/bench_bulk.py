@@ -0,0 +1,73 @@
+"""
+Throughput of N single-item task requests versus one /api/tasks/bulk call.
+
+Run from backend/:  python -m benchmarks.bench_bulk [--items 1000]
+"""
+import argparse
+import os
+import tempfile
+import time
+from collections import Counter
+
+from benchmarks.bench_tasks_list import make_app
+
+
+def timed(label, items, fn):
+    t0 = time.perf_counter()
+    statuses = fn()
+    elapsed = time.perf_counter() - t0
+    print(f"{label:24s} {elapsed * 1000:9.1f}ms  {items / elapsed:9.0f} items/s  statuses={dict(statuses)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=1000)
+    args = parser.parse_args()
+    n = args.items
+
+    app = make_app(os.path.join(tempfile.mkdtemp(), 'bench.db'))
+    client = app.test_client()
+    client.post('/api/auth/register', json={'email': 'bench@example.com', 'password': 'bench'})
+    token = client.post('/api/auth/login', json={'email': 'bench@example.com', 'password': 'bench'}) \
+        .get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    # Single-item path
+    created = []
+
+    def single_create():
+        statuses = Counter()
+        for i in range(n):
+            response = client.post('/api/tasks', json={'description': f'Task {i}'}, headers=headers)
+            statuses[response.status_code] += 1
+            created.append(response.get_json().get('id'))
+        return statuses
+
+    def single_update():
+        return Counter(client.put(f'/api/tasks/{task_id}', json={'status': 'Completed'}, headers=headers)
+                       .status_code for task_id in created)
+
+    def single_delete():
+        return Counter(client.delete(f'/api/tasks/{task_id}', headers=headers).status_code for task_id in created)
+
+    timed('single create', n, single_create)
+    timed('single update', n, single_update)
+    timed('single delete', n, single_delete)
+
+    # Bulk path
+    bulk_ids = []
+
+    def bulk(operations):
+        def run():
+            body = client.post('/api/tasks/bulk', json={'operations': operations()}, headers=headers).get_json()
+            bulk_ids.extend(r['id'] for r in body['results'] if r['op'] == 'create')
+            return Counter(r['status'] for r in body['results'])
+        return run
+
+    timed('bulk create', n, bulk(lambda: [{'op': 'create', 'data': {'description': f'Task {i}'}} for i in range(n)]))
+    timed('bulk update', n, bulk(lambda: [{'op': 'update', 'id': i, 'data': {'status': 'Completed'}} for i in bulk_ids]))
+    timed('bulk delete', n, bulk(lambda: [{'op': 'delete', 'id': i} for i in bulk_ids]))
+
+
+if __name__ == '__main__':
+    main()
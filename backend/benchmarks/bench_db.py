@@ -0,0 +1,120 @@
+"""
+Concurrent load on a SQLite file: the old setup (schema without the task
+indexes, rollback journal, no busy_timeout) against the migrated schema with
+WAL and busy_timeout. Worker threads mix filtered task listings and creates.
+
+Run from backend/:  python -m benchmarks.bench_db [--users 20] [--tasks 5000] [--threads 8]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+from flask_migrate import upgrade
+
+from app import create_app
+from app.extensions import db
+from app.models import Task, User
+from benchmarks.bench_tasks_list import make_config
+
+
+def build(label, revision, users, tasks, **settings):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    config = type('LoadConfig', (make_config(path),), settings)
+    app = create_app(config)
+    with app.app_context():
+        upgrade(revision=revision)
+
+        rng = random.Random(1)
+        base = datetime(2024, 1, 1)
+        emails = [f'user{u}@example.com' for u in range(users)]
+        for email in emails:
+            user = User(email=email)
+            user.set_password('bench')
+            db.session.add(user)
+        db.session.commit()
+        ids = [u.id for u in User.query.order_by(User.id)]
+
+        # Interleave users the way real inserts arrive
+        rows = [
+            {
+                'user_id': ids[i % users],
+                'description': f'Task {i}',
+                'priority': rng.choice(['High', 'Medium', 'Low']),
+                'status': 'Completed' if rng.random() < 0.9 else 'Pending',
+                'deadline': base + timedelta(hours=rng.randrange(0, 24 * 365)),
+                'created_at': base + timedelta(minutes=i),
+                'version': 0,
+            }
+            for i in range(users * tasks)
+        ]
+        db.session.execute(Task.__table__.insert(), rows)
+        db.session.commit()
+    return label, app, emails
+
+
+def run(label, app, emails, threads, seconds, write_ratio):
+    app.logger.disabled = True  # 'database is locked' tracebacks would flood the output
+    client = app.test_client()
+    tokens = [client.post('/api/auth/login', json={'email': e, 'password': 'bench'}).get_json()['access_token']
+              for e in emails]
+
+    latencies, statuses = [], Counter()
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local = app.test_client()
+        mine, codes = [], Counter()
+        while time.perf_counter() < deadline:
+            headers = {'Authorization': f'Bearer {rng.choice(tokens)}'}
+            t0 = time.perf_counter()
+            if rng.random() < write_ratio:
+                response = local.post('/api/tasks', json={'description': 'load'}, headers=headers)
+            else:
+                response = local.get('/api/tasks?status=Pending&limit=50', headers=headers)
+            mine.append((time.perf_counter() - t0) * 1000)
+            codes[response.status_code] += 1
+        with lock:
+            latencies.extend(mine)
+            statuses.update(codes)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0
+    ok = sum(count for code, count in statuses.items() if code < 400)
+    print(f"{label:38s} {ok / seconds:7.0f} ok req/s  "
+          f"p50 {statistics.median(latencies):7.1f}ms  p95 {p95:7.1f}ms  statuses={dict(statuses)}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--tasks', type=int, default=5000, help='tasks per user')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    args = parser.parse_args()
+
+    setups = [
+        build('before (no indexes, rollback journal)', '0002', args.users, args.tasks,
+              SQLITE_WAL=False, SQLITE_BUSY_TIMEOUT=0),
+        build('after (migrated, WAL, busy_timeout)', 'head', args.users, args.tasks),
+    ]
+    for label, app, emails in setups:
+        run(label, app, emails, args.threads, args.seconds, args.write_ratio)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+"""
+End-to-end load run: the real app (create_app, migrated SQLite or another
+database) against local Google/Gemini stubs (benchmarks/stubs.py), driven by
+concurrent workers with a weighted mix of CRUD, availability, suggest and
+schedule calls. Per-endpoint requests/s and p50/p95/p99 go to a JSON file;
+pass --compare with an earlier file to see what moved.
+
+Run from backend/:
+    python -m benchmarks.bench_e2e --duration 20 --threads 8 --output e2e.json
+    python -m benchmarks.bench_e2e --latency-ms gemini=800 --error-rate freebusy=0.05 --compare e2e.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+
+from app.extensions import db
+from app.models import Task, User
+from app.services.identity import identity_claims
+from app.services.passwords import password_hasher
+from benchmarks.bench_tasks_list import make_app, make_config
+from benchmarks.stubs import StubUpstreams, parse_per_upstream
+
+OPERATIONS = ('list', 'create', 'update', 'delete', 'availability', 'suggest', 'schedule')
+DEFAULT_MIX = 'list=30,create=10,update=10,delete=5,availability=15,suggest=15,schedule=15'
+DEFAULT_LATENCY = 'token=50,freebusy=60,events=80,gemini=400'
+
+
+# --- SETUP ---
+def build_app(args, stubs):
+    path = os.path.join(tempfile.mkdtemp(), 'e2e.db')
+    settings = dict(stubs.config(), AI_LLM_REASONS=not args.no_llm)
+    if args.database_url:
+        settings['SQLALCHEMY_DATABASE_URI'] = args.database_url
+    config = type('E2EConfig', (make_config(path),), settings)
+    return make_app(path, config)
+
+
+def seed(app, users, tasks_per_user):
+    """Users connected to the (stub) calendar with expired tokens, and their tasks. Returns [(user_id, headers, task_ids)]."""
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    with app.app_context():
+        password_hash = password_hasher.hash('bench')  # one hash shared by everyone: seeding is not the benchmark
+        db.session.execute(User.__table__.insert(), [{
+            'email': f'load{i}@example.com', 'password_hash': password_hash,
+            'google_access_token': 'stub-expired', 'google_refresh_token': 'stub-refresh',
+            'google_token_expires_at': now - timedelta(minutes=1), 'task_version': 0,
+        } for i in range(users)])
+        ids = [row.id for row in db.session.query(User.id).order_by(User.id)]
+        db.session.execute(Task.__table__.insert(), [{
+            'user_id': user_id, 'description': f'Task {n} of {user_id}',
+            'priority': rng.choice(['High', 'Medium', 'Low']), 'status': 'Pending',
+            'estimated_duration': rng.choice([15, 30, 60, 90]),
+            'deadline': now + timedelta(hours=rng.randrange(1, 24 * 14)),
+            'created_at': now - timedelta(minutes=n), 'version': 0,
+        } for user_id in ids for n in range(tasks_per_user)])
+        db.session.commit()
+
+        owned = defaultdict(list)
+        for task_id, user_id in db.session.query(Task.id, Task.user_id):
+            owned[user_id].append(task_id)
+        return [
+            (user_id, {'Authorization': 'Bearer ' + create_access_token(
+                identity=str(user_id), additional_claims=identity_claims(db.session.get(User, user_id)))},
+             owned[user_id])
+            for user_id in ids
+        ]
+
+
+# --- WORKLOAD ---
+class Session:
+    """One simulated user: their token, tasks, and the tasks this run created."""
+
+    def __init__(self, client, headers, task_ids, rng):
+        self.client = client
+        self.headers = headers
+        self.task_ids = task_ids
+        self.created = []
+        self.rng = rng
+
+    def some_task(self):
+        return self.rng.choice(self.task_ids)
+
+    def list(self):
+        return 'GET /api/tasks', self.client.get('/api/tasks?limit=50', headers=self.headers)
+
+    def create(self):
+        response = self.client.post('/api/tasks', headers=self.headers, json={
+            'description': 'Load test task', 'priority': self.rng.choice(['High', 'Medium', 'Low']),
+            'estimated_duration': 30,
+            'deadline': (datetime.utcnow() + timedelta(days=2)).replace(microsecond=0).isoformat()})
+        if response.status_code == 201:
+            self.created.append(response.get_json()['id'])
+        return 'POST /api/tasks', response
+
+    def update(self):
+        return 'PUT /api/tasks/<id>', self.client.put(f'/api/tasks/{self.some_task()}', headers=self.headers,
+                                                      json={'priority': self.rng.choice(['High', 'Low'])})
+
+    def delete(self):
+        if not self.created:
+            return self.create()
+        return 'DELETE /api/tasks/<id>', self.client.delete(f'/api/tasks/{self.created.pop()}', headers=self.headers)
+
+    def availability(self):
+        return 'GET /api/calendar/availability', self.client.get('/api/calendar/availability', headers=self.headers)
+
+    def suggest(self):
+        return 'POST /api/ai/suggest', self.client.post('/api/ai/suggest', headers=self.headers,
+                                                        json={'task_id': self.some_task()})
+
+    def schedule(self):
+        start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(hours=self.rng.randrange(1, 72))
+        return 'POST /api/calendar/schedule', self.client.post('/api/calendar/schedule', headers=self.headers, json={
+            'task_id': self.some_task(), 'start_time': start.isoformat(),
+            'end_time': (start + timedelta(minutes=30)).isoformat()})
+
+
+def parse_mix(text):
+    mix = {}
+    for item in text.split(','):
+        name, weight = item.split('=')
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown operation in --mix: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def run_load(app, sessions, mix, threads, duration, warmup):
+    ops, weights = list(mix), list(mix.values())
+    samples = defaultdict(list)  # endpoint -> latency ms
+    statuses = defaultdict(Counter)
+    lock = threading.Lock()
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    def worker(n):
+        rng = random.Random(n)
+        client = app.test_client()
+        mine = [Session(client, headers, task_ids, rng) for i, (_, headers, task_ids) in enumerate(sessions)
+                if i % threads == n] or [Session(client, sessions[n % len(sessions)][1],
+                                                 sessions[n % len(sessions)][2], rng)]
+        local_samples, local_statuses = defaultdict(list), defaultdict(Counter)
+        while True:
+            t0 = time.perf_counter()
+            if t0 >= stop_at:
+                break
+            session = rng.choice(mine)
+            endpoint, response = getattr(session, rng.choices(ops, weights)[0])()
+            elapsed = (time.perf_counter() - t0) * 1000
+            if t0 >= measure_from:
+                local_samples[endpoint].append(elapsed)
+                local_statuses[endpoint][response.status_code] += 1
+        with lock:
+            for endpoint, values in local_samples.items():
+                samples[endpoint].extend(values)
+                statuses[endpoint].update(local_statuses[endpoint])
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    cpu = time.process_time()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return samples, statuses, time.process_time() - cpu
+
+
+# --- REPORT ---
+def percentile(ordered, q):
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+def summarize(samples, statuses, duration):
+    endpoints = {}
+    for endpoint in sorted(samples):
+        ordered = sorted(samples[endpoint])
+        errors = sum(count for status, count in statuses[endpoint].items() if status >= 400)
+        endpoints[endpoint] = {
+            'count': len(ordered),
+            'rps': round(len(ordered) / duration, 2),
+            'errors': errors,
+            'p50_ms': round(percentile(ordered, 50), 2),
+            'p95_ms': round(percentile(ordered, 95), 2),
+            'p99_ms': round(percentile(ordered, 99), 2),
+            'max_ms': round(ordered[-1], 2),
+            'status': {str(status): count for status, count in sorted(statuses[endpoint].items())},
+        }
+    total = sum(e['count'] for e in endpoints.values())
+    everything = sorted(v for values in samples.values() for v in values)
+    return endpoints, {
+        'count': total,
+        'rps': round(total / duration, 2),
+        'errors': sum(e['errors'] for e in endpoints.values()),
+        'p50_ms': round(percentile(everything, 50), 2) if everything else None,
+        'p95_ms': round(percentile(everything, 95), 2) if everything else None,
+        'p99_ms': round(percentile(everything, 99), 2) if everything else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result, baseline=None):
+    print(f"{'endpoint':32s} {'n':>6s} {'req/s':>8s} {'err':>5s} {'p50':>8s} {'p95':>8s} {'p99':>8s}")
+    rows = list(result['endpoints'].items()) + [('TOTAL', result['total'])]
+    for endpoint, stats in rows:
+        line = (f"{endpoint:32s} {stats['count']:6d} {stats['rps']:8.1f} {stats['errors']:5d} "
+                f"{stats['p50_ms']:8.1f} {stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f}")
+        if baseline:
+            before = baseline['total'] if endpoint == 'TOTAL' else baseline['endpoints'].get(endpoint)
+            if before and before.get('rps') and before.get('p95_ms'):
+                line += (f"   req/s {100 * (stats['rps'] / before['rps'] - 1):+6.1f}%"
+                         f"  p95 {100 * (stats['p95_ms'] / before['p95_ms'] - 1):+6.1f}%")
+        print(line)
+    print(f"upstream calls: {result['upstreams']['calls']}  errors: {result['upstreams']['errors']}  "
+          f"cpu {result['cpu_seconds']:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--tasks', type=int, default=200, help='tasks per user')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=20, help='measured seconds')
+    parser.add_argument('--warmup', type=float, default=3, help='seconds run before measuring')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='operation=weight, comma separated')
+    parser.add_argument('--latency-ms', default=DEFAULT_LATENCY, help='per upstream, e.g. gemini=400,freebusy=60')
+    parser.add_argument('--error-rate', default='', help='per upstream, e.g. freebusy=0.05 (or one value for all)')
+    parser.add_argument('--no-llm', action='store_true', help='suggest without the Gemini reasons step')
+    parser.add_argument('--database-url', help='run against this database instead of a fresh SQLite file')
+    parser.add_argument('--output', default='e2e-results.json')
+    parser.add_argument('--compare', help='earlier results file to diff against')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    stubs = StubUpstreams(latency_ms=parse_per_upstream(args.latency_ms),
+                          error_rate=parse_per_upstream(args.error_rate)).start()
+    try:
+        app = build_app(args, stubs)
+        t0 = time.perf_counter()
+        sessions = seed(app, args.users, args.tasks)
+        print(f"seeded {args.users} users x {args.tasks} tasks in {time.perf_counter() - t0:.1f}s; "
+              f"running {args.threads} workers for {args.warmup:g}s warmup + {args.duration:g}s")
+        samples, statuses, cpu = run_load(app, sessions, mix, args.threads, args.duration, args.warmup)
+    finally:
+        stubs.stop()
+
+    endpoints, total = summarize(samples, statuses, args.duration)
+    result = {
+        'meta': {
+            'timestamp': datetime.utcnow().replace(microsecond=0).isoformat() + 'Z',
+            'commit': git_commit(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'args': vars(args),
+        },
+        'duration_s': args.duration,
+        'cpu_seconds': round(cpu, 2),
+        'total': total,
+        'endpoints': endpoints,
+        'upstreams': {'calls': dict(stubs.calls), 'errors': dict(stubs.errors)},
+    }
+    with open(args.output, 'w') as f:
+        json.dump(result, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    print(f"results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
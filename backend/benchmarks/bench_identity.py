@@ -0,0 +1,66 @@
+"""
+Overhead of resolving the caller on authenticated requests, with the user
+cache off (USER_CACHE_TTL=0: one users query per request) and on.
+
+Run from backend/:  python -m benchmarks.bench_identity [--requests 3000]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import User
+from benchmarks.bench_tasks_list import make_app, make_config
+
+ENDPOINTS = ['/api/auth/me', '/api/calendar/status', '/api/tasks?limit=1']
+
+
+def run(label, ttl, requests):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    config = type('IdentityConfig', (make_config(path),), {'USER_CACHE_TTL': ttl})
+    app = make_app(path, config)
+    with app.app_context():
+        user = User(email='bench@example.com', google_refresh_token='refresh')
+        user.set_password('bench')
+        db.session.add(user)
+        db.session.commit()
+        engine = db.engine
+
+    client = app.test_client()
+    token = client.post('/api/auth/login', json={'email': 'bench@example.com', 'password': 'bench'}) \
+        .get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    statements = [0]
+
+    def count(*args):
+        statements[0] += 1
+    event.listen(engine, 'before_cursor_execute', count)
+
+    for url in ENDPOINTS:
+        client.get(url, headers=headers)  # warm up
+        statements[0] = 0
+        samples = []
+        for _ in range(requests):
+            t0 = time.perf_counter()
+            client.get(url, headers=headers)
+            samples.append((time.perf_counter() - t0) * 1e6)
+        print(f"{label:10s} {url:24s} p50 {statistics.median(samples):7.0f}us  "
+              f"{statements[0] / requests:4.1f} queries/request")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--requests', type=int, default=3000)
+    args = parser.parse_args()
+
+    run('no cache', 0, args.requests)
+    run('cached', 30, args.requests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Login throughput for legitimate users while attacker threads hammer
+/api/auth/login with wrong passwords against other accounts (credential
+stuffing from a few IPs),
+with the login limiter off and on.
+
+Run from backend/:  python -m benchmarks.bench_login [--seconds 15] [--attackers 8] [--attack-rate 25]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from app.extensions import db
+from app.models import User
+from app.services.metrics import metrics
+from benchmarks.bench_tasks_list import make_app, make_config
+
+
+def run(label, limit, args):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    config = type('LoginConfig', (make_config(path),), {
+        'LOGIN_RATE_LIMIT': limit,
+        'LOGIN_IP_BURST': args.ip_burst,
+        'LOGIN_IP_PER_MINUTE': args.ip_per_minute,
+    })
+    app = make_app(path, config)
+    with app.app_context():
+        hashed = User(email='x')
+        hashed.set_password('correct horse')
+        for email in [f'user{i}@example.com' for i in range(args.users)] + \
+                [f'victim{i}@example.com' for i in range(args.victims)]:
+            db.session.add(User(email=email, password_hash=hashed.password_hash))
+        db.session.commit()
+    metrics.reset()
+
+    deadline = time.perf_counter() + args.seconds
+    legit, attack = Counter(), Counter()
+    latencies = []
+    lock = threading.Lock()
+
+    def attacker(n):
+        client = app.test_client()
+        i = 0
+        interval = 1.0 / args.attack_rate
+        next_at = time.perf_counter()
+        while time.perf_counter() < deadline:
+            i += 1
+            # Pace each attacker; the in-process client has no network cost to do it for us
+            next_at += interval
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+            response = client.post('/api/auth/login', json={'email': f'victim{i % args.victims}@example.com',
+                                                            'password': f'guess{i}'},
+                                   environ_base={'REMOTE_ADDR': f'10.0.0.{n % 4}'})
+            with lock:
+                attack[response.status_code] += 1
+
+    def user(n):
+        client = app.test_client()
+        while time.perf_counter() < deadline:
+            t0 = time.perf_counter()
+            response = client.post('/api/auth/login', json={'email': f'user{n}@example.com',
+                                                            'password': 'correct horse'},
+                                   environ_base={'REMOTE_ADDR': f'192.168.1.{n}'})
+            with lock:
+                legit[response.status_code] += 1
+                latencies.append((time.perf_counter() - t0) * 1000)
+            time.sleep(1.0)  # a person logs in now and then, not in a loop
+
+    threads = [threading.Thread(target=attacker, args=(i,)) for i in range(args.attackers)]
+    threads += [threading.Thread(target=user, args=(i,)) for i in range(args.users)]
+    started = time.process_time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    cpu = time.process_time() - started
+
+    print(f"{label:12s} legit ok {legit[200]:3d}/{sum(legit.values()):<3d} "
+          f"p50 {statistics.median(latencies):7.1f}ms  p95 {statistics.quantiles(latencies, n=20)[-1]:7.1f}ms  "
+          f"attack {dict(sorted(attack.items()))}  cpu {cpu:5.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=15)
+    parser.add_argument('--attackers', type=int, default=8)
+    parser.add_argument('--attack-rate', type=float, default=25, help='requests/s per attacker')
+    parser.add_argument('--users', type=int, default=5)
+    parser.add_argument('--victims', type=int, default=20)
+    # A short run never drains the default burst; start from a drained steady state
+    parser.add_argument('--ip-burst', type=int, default=3)
+    parser.add_argument('--ip-per-minute', type=int, default=30)
+    args = parser.parse_args()
+
+    run('no limiter', False, args)
+    run('limiter', True, args)
+
+
+if __name__ == '__main__':
+    main()
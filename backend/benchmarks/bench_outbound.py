@@ -0,0 +1,63 @@
+"""
+Per-call latency of a bare requests.post (new connection every call) versus
+the pooled keep-alive client in app.services.outbound, against a local stub.
+
+Run from backend/:  python -m benchmarks.bench_outbound [--calls 500]
+"""
+import argparse
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from app.services.outbound import OutboundClient
+
+
+class Stub(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like Google's front ends
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        body = b'{"calendars": {"primary": {"busy": []}}}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def run(label, send, calls):
+    samples = []
+    for _ in range(calls):
+        t0 = time.perf_counter()
+        send()
+        samples.append((time.perf_counter() - t0) * 1e6)
+    samples.sort()
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"{label:22s} n={calls:5d}  p50={statistics.median(samples):8.1f}us  p99={p99:8.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--calls', type=int, default=500)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/freeBusy'
+    body = {"items": [{"id": "primary"}]}
+
+    client = OutboundClient()
+    run('requests.post (no pool)', lambda: requests.post(url, json=body), args.calls)
+    run('outbound.post (pooled)', lambda: client.post(url, json=body), args.calls)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Solver latency of app.services.scheduler.plan_tasks for growing backlogs.
+
+Run from backend/:  python -m benchmarks.bench_plan [--days 7]
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.services.scheduler import plan_tasks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--busy', type=int, default=40)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    now = datetime(2024, 3, 4, 8, 0)
+    busy = []
+    for _ in range(args.busy):
+        start = now + timedelta(minutes=rng.randrange(0, args.days * 24 * 60, 15))
+        busy.append({"start": start.isoformat() + 'Z',
+                     "end": (start + timedelta(minutes=rng.choice([30, 60]))).isoformat() + 'Z'})
+
+    for size in (10, 30, 100, 300, 1000):
+        tasks = [
+            SimpleNamespace(id=i, description=f'Task {i}', priority=rng.choice(['High', 'Medium', 'Low']),
+                            estimated_duration=rng.choice([15, 30, 45, 60, 120]),
+                            deadline=now + timedelta(hours=rng.randrange(4, 24 * args.days)) if rng.random() < 0.5 else None)
+            for i in range(size)
+        ]
+        samples = []
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            plan, unscheduled = plan_tasks(tasks, busy, now=now, days=args.days)
+            samples.append((time.perf_counter() - t0) * 1000)
+        print(f"tasks={size:5d}  planned={len(plan):5d}  unscheduled={len(unscheduled):5d}  "
+              f"p50={statistics.median(samples):7.2f}ms  max={max(samples):7.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
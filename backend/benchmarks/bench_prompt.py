@@ -0,0 +1,116 @@
+"""
+Suggestion prompt size and Gemini latency before (raw busy list in the
+prompt) and after compaction (free windows per day, token budget), over
+synthetic calendars of increasing density. The Gemini stub charges a base
+latency plus a per-token cost, like the real API.
+
+Run from backend/:  python -m benchmarks.bench_prompt [--budget 600] [--ms-per-token 0.5]
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.services.outbound import outbound
+from app.services.prompts import estimate_tokens, suggestion_prompt
+from benchmarks.stubs import StubUpstreams
+
+NOW = datetime(2026, 3, 2, 8, 0)
+DENSITIES = (0, 10, 40, 150, 400)  # busy entries over the 3 day window
+
+
+def legacy_prompt(task, busy_slots, now):
+    # What generate_suggestions sent before: the busy list's repr inlined
+    return f"""
+    Act as an expert Productivity Coach.
+    
+    CURRENT CONTEXT:
+    - Today: {now.strftime('%Y-%m-%d')}
+    - Working Hours: 09:00 to 17:00
+    - Busy Slots: {busy_slots}
+    
+    TASK DETAILS:
+    - Description: "{task.description}"
+    - Priority: {task.priority} (High priority = Schedule in morning/deep focus hours)
+    - Duration: {task.estimated_duration} mins
+    - Deadline: {task.deadline if task.deadline else "None"}
+
+    GOAL:
+    Find 3 optimal start times for this task over the next 3 days.
+    
+    LOGIC:
+    1. STRICTLY avoid the Busy Slots.
+    2. If Priority is 'High', prefer morning slots (09:00-12:00) for "Deep Work".
+    3. If Duration is short (<30m), try to fit it in small gaps.
+    4. Provide a "Reason" that explains the productivity benefit (e.g., "Morning slot for peak focus", "Fits in gap before lunch").
+
+    OUTPUT FORMAT:
+    Return valid JSON only. No markdown. No comments.
+    Structure:
+    {{
+        "suggestions": [
+            {{ "start": "YYYY-MM-DDTHH:MM:SS", "reason": "Why this time works" }},
+            {{ "start": "YYYY-MM-DDTHH:MM:SS", "reason": "Why this time works" }}
+        ]
+    }}
+    """
+
+
+def synthetic_calendar(count, rng):
+    # Google returns freeBusy for the whole day, overlapping entries included
+    busy = []
+    for _ in range(count):
+        start = NOW + timedelta(minutes=rng.randrange(0, 3 * 24 * 60, 15))
+        end = start + timedelta(minutes=rng.choice([15, 30, 45, 60, 90]))
+        busy.append({"start": start.isoformat() + 'Z', "end": end.isoformat() + 'Z'})
+    return busy
+
+
+def gemini_latency(url, text, repeat):
+    payload = {"contents": [{"parts": [{"text": text}]}]}
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        outbound.post(url, json=payload)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget', type=int, default=600, help='AI_PROMPT_TOKEN_BUDGET')
+    parser.add_argument('--base-ms', type=float, default=150, help='stub latency per call')
+    parser.add_argument('--ms-per-token', type=float, default=0.5, help='stub latency per prompt token')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    stubs = StubUpstreams(latency_ms={'token': 0, 'freebusy': 0, 'events': 0, 'gemini': args.base_ms},
+                          jitter=0, gemini_ms_per_token=args.ms_per_token).start()
+    url = stubs.config()['GEMINI_API_URL']
+    rng = random.Random(3)
+    task = SimpleNamespace(description='Prepare quarterly review slides', priority='High',
+                           estimated_duration=45, deadline=NOW + timedelta(days=2, hours=9))
+
+    print(f"{'busy':>5s} | {'before tok':>10s} {'ms':>7s} | {'after tok':>9s} {'ms':>7s} {'windows':>7s} "
+          f"{'degraded':>11s} | {'build us':>8s}")
+    try:
+        for density in DENSITIES:
+            busy = synthetic_calendar(density, rng)
+            before = legacy_prompt(task, busy, NOW)
+
+            t0 = time.perf_counter()
+            for _ in range(200):
+                after, stats = suggestion_prompt(task, busy, NOW, budget=args.budget)
+            build_us = (time.perf_counter() - t0) / 200 * 1e6
+
+            print(f"{density:5d} | {estimate_tokens(before):10d} {gemini_latency(url, before, args.repeat):7.0f} | "
+                  f"{stats['tokens']:9d} {gemini_latency(url, after, args.repeat):7.0f} {stats['windows']:7d} "
+                  f"{stats['degraded'] or '-':>11s} | {build_us:8.0f}")
+    finally:
+        stubs.stop()
+
+
+if __name__ == '__main__':
+    main()
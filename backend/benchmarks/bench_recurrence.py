@@ -0,0 +1,96 @@
+"""
+Cost of expanding recurring tasks: a year of a daily task through the
+generator vs materializing every occurrence, a far-future window, and the
+/occurrences endpoint cold vs cached.
+
+Run from backend/:  python -m benchmarks.bench_recurrence [--repeat 200]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models import Task, User
+from app.services.recurrence import expansion_cache, occurrences
+from benchmarks.bench_tasks_list import make_app, make_config
+
+START = datetime(2026, 1, 1, 9)
+YEAR_END = datetime(2027, 1, 1)
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def peak_kib(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def materialized(days):
+    # What storing one row/object per occurrence would cost
+    return [START + timedelta(days=i) for i in range(days)]
+
+
+def consume(iterator):
+    for _ in iterator:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    print("expansion (median ms, peak KiB)")
+    for label, fn in [
+        ('1y daily, generator', lambda: consume(occurrences('FREQ=DAILY', START, START, YEAR_END))),
+        ('10y daily, generator', lambda: consume(occurrences('FREQ=DAILY', START, START, datetime(2036, 1, 1)))),
+        ('10y daily, list', lambda: materialized(3652)),
+        ('week in 2100, generator', lambda: consume(occurrences('FREQ=DAILY', START, datetime(2100, 1, 1),
+                                                                datetime(2100, 1, 8)))),
+        ('10y monthly, generator', lambda: consume(occurrences('FREQ=MONTHLY', START, START, datetime(2036, 1, 1)))),
+    ]:
+        print(f"  {label:26s} {timed(fn, args.repeat):7.3f}ms  {peak_kib(fn):8.1f}KiB")
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = make_app(path, make_config(path))
+    with app.app_context():
+        user = User(email='bench@example.com')
+        user.set_password('bench')
+        db.session.add(user)
+        db.session.flush()
+        task = Task(user_id=user.id, description='Standup', recurrence_rule='FREQ=DAILY', recurrence_start=START)
+        db.session.add(task)
+        db.session.commit()
+        task_id = task.id
+
+    client = app.test_client()
+    token = client.post('/api/auth/login', json={'email': 'bench@example.com', 'password': 'bench'}) \
+        .get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    url = f'/api/tasks/{task_id}/occurrences?start=2026-01-01T00:00:00&end=2027-01-01T00:00:00'
+
+    def cold():
+        expansion_cache.clear()
+        client.get(url, headers=headers)
+
+    print("GET /occurrences, 1y daily (median ms)")
+    print(f"  {'cold':26s} {timed(cold, args.repeat):7.3f}ms")
+    print(f"  {'cached':26s} {timed(lambda: client.get(url, headers=headers), args.repeat):7.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Stress test for the reminder scheduler:
+  1. the index with 1M pending reminders: build, edits, memory, draining in order
+  2. loading a horizon slice from SQLite (one query)
+  3. lateness of the real scheduler thread firing reminders due over a few seconds
+
+Run from backend/:  python -m benchmarks.bench_reminders [--pending 1000000] [--db-tasks 100000]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models import Task, User
+from app.services.reminders import ReminderIndex, reminder_scheduler
+from benchmarks.bench_tasks_list import make_app, make_config
+
+
+def bench_index(pending):
+    base = datetime(2026, 1, 1)
+    rng = random.Random(1)
+    entries = [(i, base + timedelta(seconds=rng.randrange(6 * 3600))) for i in range(pending)]
+
+    index = ReminderIndex()
+    t0 = time.perf_counter()
+    index.add_many(entries)
+    build = time.perf_counter() - t0
+    del entries
+
+    # Memory of the index alone, measured on a second copy
+    tracemalloc.start()
+    copy = ReminderIndex()
+    copy.add_many((i, base) for i in range(pending))
+    memory = tracemalloc.get_traced_memory()[0] / 2**20
+    tracemalloc.stop()
+    del copy
+
+    edits = 100_000
+    t0 = time.perf_counter()
+    for _ in range(edits):
+        index.replace(rng.randrange(pending), [base + timedelta(seconds=rng.randrange(6 * 3600))])
+    edit_us = (time.perf_counter() - t0) / edits * 1e6
+
+    t0 = time.perf_counter()
+    drained, last = 0, None
+    while True:
+        batch = index.pop_due(base + timedelta(hours=7), limit=1000)
+        if not batch:
+            break
+        assert last is None or batch[0][0] >= last
+        last = batch[-1][0]
+        drained += len(batch)
+    drain = time.perf_counter() - t0
+
+    print(f"index, {pending:,} pending")
+    print(f"  build {build:6.2f}s   memory {memory:7.1f}MiB   edit {edit_us:5.1f}us/op   "
+          f"drain {drain:5.2f}s ({drained / drain:,.0f}/s, {drained:,} fired)")
+
+
+def bench_load(db_tasks):
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    config = type('ReminderConfig', (make_config(path),), {'REMINDERS_ENABLED': False})
+    app = make_app(path, config)
+    now = datetime.utcnow()
+    rng = random.Random(2)
+    with app.app_context():
+        user = User(email='bench@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        # Spread over two days so a 6h horizon loads about an eighth of them
+        db.session.execute(Task.__table__.insert(), [{
+            'user_id': user.id, 'description': f'task {i}', 'status': 'Pending', 'priority': 'Medium',
+            'deadline': now + timedelta(seconds=rng.randrange(2 * 86400)), 'reminder_minutes': 15,
+        } for i in range(db_tasks)])
+        db.session.commit()
+
+        reminder_scheduler.index.clear()
+        t0 = time.perf_counter()
+        loaded = reminder_scheduler.load(now, now + timedelta(hours=6))
+        elapsed = time.perf_counter() - t0
+    print(f"horizon load, {db_tasks:,} tasks with reminders")
+    print(f"  6h slice: {loaded:,} reminders in {elapsed * 1000:.0f}ms")
+
+
+def bench_lateness(count, spread):
+    class Recorder:
+        def __init__(self):
+            self.lateness = []
+            self.lock = threading.Lock()
+
+        def deliver(self, reminder):
+            with self.lock:
+                self.lateness.append((datetime.utcnow() - reminder.due_at).total_seconds() * 1000)
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    recorder = Recorder()
+    config = type('ReminderConfig', (make_config(path),), {
+        'REMINDERS_ENABLED': False, 'REMINDER_DELIVERY': recorder,
+    })
+    app = make_app(path, config)
+    start = datetime.utcnow() + timedelta(seconds=1)
+    with app.app_context():
+        user = User(email='bench@example.com', password_hash='x')
+        db.session.add(user)
+        db.session.flush()
+        db.session.execute(Task.__table__.insert(), [{
+            'user_id': user.id, 'description': f'task {i}', 'status': 'Pending', 'priority': 'Medium',
+            'deadline': start + timedelta(seconds=spread * i / count, minutes=5), 'reminder_minutes': 5,
+        } for i in range(count)])
+        db.session.commit()
+
+    reminder_scheduler.start()
+    deadline = time.monotonic() + spread + 10
+    while len(recorder.lateness) < count and time.monotonic() < deadline:
+        time.sleep(0.1)
+    reminder_scheduler.stop()
+
+    samples = sorted(recorder.lateness)
+    q = statistics.quantiles(samples, n=100)
+    print(f"scheduler thread, {count:,} reminders due over {spread}s")
+    print(f"  fired {len(samples):,}   lateness p50 {q[49]:6.1f}ms   p99 {q[98]:6.1f}ms   max {samples[-1]:6.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pending', type=int, default=1_000_000)
+    parser.add_argument('--db-tasks', type=int, default=100_000)
+    parser.add_argument('--fire', type=int, default=20_000)
+    parser.add_argument('--spread', type=int, default=5)
+    args = parser.parse_args()
+
+    bench_index(args.pending)
+    bench_load(args.db_tasks)
+    bench_lateness(args.fire, args.spread)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Serializing task lists (10k and 100k rows), stage by stage:
+  legacy   ORM objects -> to_dict with isoformat() per datetime -> Flask's stdlib json
+  rows     column tuples -> dicts -> stdlib provider / orjson provider
+  columns  column tuples -> {fields, rows} -> orjson provider
+plus GET /api/tasks end to end with each provider and format.
+
+Run from backend/:  python -m benchmarks.bench_serialize [--sizes 10000,100000]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from flask.json.provider import DefaultJSONProvider
+
+from app.extensions import db
+from app.models import Task
+from app.routes.tasks import serialize_rows
+from app.services import json_provider
+from benchmarks.bench_tasks_list import make_app, seed
+
+
+def legacy_to_dict(task):
+    # Task.to_dict before the provider encoded datetimes
+    return {
+        'id': task.id,
+        'description': task.description,
+        'priority': task.priority,
+        'deadline': task.deadline.isoformat() if task.deadline else None,
+        'estimated_duration': task.estimated_duration,
+        'status': task.status,
+        'scheduled_start': task.scheduled_start.isoformat() if task.scheduled_start else None,
+        'scheduled_end': task.scheduled_end.isoformat() if task.scheduled_end else None,
+        'recurrence': task.recurrence_rule,
+        'reminder_minutes': task.reminder_minutes
+    }
+
+
+def timed(fn, repeat):
+    samples, result = [], None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples), result
+
+
+def bench_stages(app, size, repeat):
+    fields = list(Task.API_FIELDS)
+    providers = {'flask': DefaultJSONProvider(app), 'stdlib': json_provider.ISOJSONProvider(app),
+                 'orjson': json_provider.OrjsonProvider(app)}
+    cases = [
+        ('legacy  flask', lambda: Task.query.order_by(Task.id).limit(size).all(),
+         lambda objs: [legacy_to_dict(t) for t in objs], 'flask'),
+        ('rows    stdlib', lambda: db.session.query(*[getattr(Task, f) for f in fields]).order_by(Task.id)
+         .limit(size).all(), lambda rows: serialize_rows(rows, fields), 'stdlib'),
+        ('rows    orjson', lambda: db.session.query(*[getattr(Task, f) for f in fields]).order_by(Task.id)
+         .limit(size).all(), lambda rows: serialize_rows(rows, fields), 'orjson'),
+        ('columns orjson', lambda: db.session.query(*[getattr(Task, f) for f in fields]).order_by(Task.id)
+         .limit(size).all(), lambda rows: serialize_rows(rows, fields, columnar=True), 'orjson'),
+    ]
+    print(f"{size:,} tasks{'':9s}{'fetch':>9s} {'build':>9s} {'encode':>9s} {'total':>9s} {'bytes':>11s}")
+    for label, fetch, build, provider in cases:
+        fetch_ms, rows = timed(fetch, repeat)
+        db.session.expunge_all()
+        build_ms, payload = timed(lambda: build(rows), repeat)
+        encode_ms, response = timed(lambda: providers[provider].response(payload), repeat)
+        total = fetch_ms + build_ms + encode_ms
+        print(f"  {label:18s}{fetch_ms:8.1f}ms {build_ms:7.1f}ms {encode_ms:7.1f}ms {total:7.1f}ms "
+              f"{len(response.get_data()):11,d}")
+
+
+def bench_endpoint(app, repeat):
+    client = app.test_client()
+    token = client.post('/api/auth/login', json={'email': 'bench@example.com', 'password': 'bench'}) \
+        .get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+    print("GET /api/tasks (full list)")
+    for name in ('stdlib', 'orjson'):
+        app.config['JSON_PROVIDER'] = name
+        json_provider.init_app(app)
+        for fmt in ('objects', 'columns'):
+            ms, response = timed(lambda: client.get(f'/api/tasks?format={fmt}', headers=headers), repeat)
+            print(f"  {name:7s} {fmt:8s} p50={ms:8.1f}ms  bytes={len(response.data):,}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='10000,100000')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(',')]
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = make_app(path)
+    with app.app_context():
+        seed(max(sizes))
+        for size in sizes:
+            bench_stages(app, size, args.repeat)
+    bench_endpoint(app, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Cold start: a fresh server process per run, timed from spawn to
+  import     importing the app package (child's own clock)
+  create     create_app
+  ready      the port accepting connections
+  first      the first GET /api/tasks answered (DB)
+  upstream   the first GET /api/calendar/availability answered (DB + freeBusy stub)
+for three modes:
+  eager        Flask-Migrate/alembic loaded at start-up (the default)
+  fast         FAST_STARTUP (schema via `flask init-db`), requests and the outbound session loaded on first use
+  fast+warmup  fast, plus pools warmed in the background once the port is open
+
+Run from backend/:  python -m benchmarks.bench_startup [--runs 5] [--budget-ms 1500]
+--budget-ms fails (exit 1) when the fast+warmup time-to-first-request median is over budget.
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask_jwt_extended import create_access_token
+
+from app.extensions import db
+from app.models import User
+from benchmarks.bench_tasks_list import make_app, make_config
+from benchmarks.stubs import StubUpstreams
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = {
+    'eager': {'BENCH_EAGER': '1', 'BENCH_FAST': '0', 'BENCH_WARMUP': '0'},
+    'fast': {'BENCH_EAGER': '0', 'BENCH_FAST': '1', 'BENCH_WARMUP': '0'},
+    'fast+warmup': {'BENCH_EAGER': '0', 'BENCH_FAST': '1', 'BENCH_WARMUP': '1'},
+}
+
+CHILD = """
+import json, os, sys, time
+t0 = time.perf_counter()
+if os.environ['BENCH_EAGER'] == '1':
+    import flask_migrate
+from app.config import Config
+from app import create_app
+t1 = time.perf_counter()
+
+class StartupConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.environ['BENCH_DB']
+    JWT_SECRET_KEY = os.environ['BENCH_SECRET']
+    FAST_STARTUP = os.environ['BENCH_FAST'] == '1'
+    WARMUP_ENABLED = os.environ['BENCH_WARMUP'] == '1'
+    WARMUP_URLS = [os.environ['BENCH_STUB']]
+    CALENDAR_USE_MIRROR = False
+    REMINDERS_ENABLED = False
+    GOOGLE_FREEBUSY_URL = os.environ['BENCH_STUB'] + '/freeBusy'
+
+app = create_app(StartupConfig)
+t2 = time.perf_counter()
+
+import logging
+from werkzeug.serving import make_server
+from app.services.warmup import pool_warmer
+logging.getLogger('werkzeug').setLevel(logging.ERROR)
+server = make_server('127.0.0.1', int(os.environ['BENCH_PORT']), app, threaded=True)
+if StartupConfig.WARMUP_ENABLED:
+    pool_warmer.start()
+print(json.dumps({'import': (t1 - t0) * 1000, 'create': (t2 - t1) * 1000, 'modules': len(sys.modules)}), flush=True)
+server.serve_forever()
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def get(port, path, token):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    connection.request('GET', path, headers={'Authorization': f'Bearer {token}'})
+    response = connection.getresponse()
+    response.read()
+    connection.close()
+    return response.status
+
+
+def cold_start(env, token):
+    port = free_port()
+    started = time.perf_counter()
+    child = subprocess.Popen([sys.executable, '-c', CHILD], cwd=BACKEND, env=dict(env, BENCH_PORT=str(port)),
+                             stdout=subprocess.PIPE, text=True)
+    try:
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.05).close()
+                break
+            except OSError:
+                if child.poll() is not None:
+                    raise RuntimeError('server exited during start-up')
+                time.sleep(0.002)
+        ready = time.perf_counter()
+        assert get(port, '/api/tasks', token) == 200
+        first = time.perf_counter()
+        assert get(port, '/api/calendar/availability', token) == 200
+        upstream = time.perf_counter() - first
+        inner = json.loads(child.stdout.readline())
+    finally:
+        child.terminate()
+        child.wait()
+    return dict(inner, ready=(ready - started) * 1000, first=(first - started) * 1000, upstream=upstream * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=None)
+    args = parser.parse_args()
+
+    stubs = StubUpstreams().start()
+    path = os.path.join(tempfile.mkdtemp(), 'startup.db')
+    config = make_config(path)
+    app = make_app(path, config)
+    with app.app_context():
+        user = User(email='bench@example.com', password_hash='x', google_access_token='stub',
+                    google_refresh_token='stub', google_token_expires_at=datetime.utcnow() + timedelta(days=1))
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=str(user.id), additional_claims={'uid': user.id})
+
+    env = dict(os.environ, BENCH_DB=f'sqlite:///{path}', BENCH_SECRET=config.JWT_SECRET_KEY, BENCH_STUB=stubs.url)
+    results = {}
+    print(f"{'mode':12s} {'import':>8s} {'create':>8s} {'ready':>8s} {'first':>8s} {'upstream':>9s} {'modules':>8s}")
+    try:
+        for mode, flags in MODES.items():
+            runs = [cold_start(dict(env, **flags), token) for _ in range(args.runs)]
+            median = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+            results[mode] = median
+            print(f"{mode:12s} {median['import']:6.0f}ms {median['create']:6.0f}ms {median['ready']:6.0f}ms "
+                  f"{median['first']:6.0f}ms {median['upstream']:7.0f}ms {median['modules']:8.0f}")
+    finally:
+        stubs.stop()
+
+    if args.budget_ms is not None and results['fast+warmup']['first'] > args.budget_ms:
+        print(f"time to first request {results['fast+warmup']['first']:.0f}ms is over the {args.budget_ms:.0f}ms budget")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
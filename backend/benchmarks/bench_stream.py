@@ -0,0 +1,108 @@
+"""
+Time to first suggestion: generate_suggestions (waits for the whole Gemini
+answer) vs. stream_suggestions (relays each suggestion as it completes),
+against a local stub that "generates" the answer in chunks.
+
+Run from backend/:  python -m benchmarks.bench_stream [--chunk-ms 20] [--chunk-chars 8]
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from flask import Flask
+
+from app.services.ai import generate_suggestions, stream_suggestions
+from app.services.llm_cache import llm_cache
+
+ANSWER = json.dumps({"suggestions": [
+    {"start": f"2030-01-0{day}T{hour}:00:00",
+     "reason": "Morning slot for deep, uninterrupted focus before meetings pile up."}
+    for day, hour in ((1, '09'), (1, '14'), (2, '10'))
+]}, indent=2)
+
+
+def make_stub_handler(chunk_delay, chunk_chars):
+    class GeminiStub(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            chunks = [ANSWER[i:i + chunk_chars] for i in range(0, len(ANSWER), chunk_chars)]
+
+            if 'streamGenerateContent' not in self.path:
+                # Blocking endpoint: same generation time, one response at the end
+                time.sleep(chunk_delay * len(chunks))
+                body = json.dumps({"candidates": [{"content": {"parts": [{"text": ANSWER}]}}]}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.end_headers()
+            for chunk in chunks:
+                time.sleep(chunk_delay)
+                frame = {"candidates": [{"content": {"parts": [{"text": chunk}]}}]}
+                self.wfile.write(f"data: {json.dumps(frame)}\r\n\r\n".encode())
+                self.wfile.flush()
+
+        def log_message(self, *args):
+            pass
+    return GeminiStub
+
+
+def summarize(label, first, total):
+    print(f"{label:10s} first suggestion p50 {statistics.median(first):7.1f}ms  "
+          f"all suggestions p50 {statistics.median(total):7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--chunk-ms', type=float, default=20)
+    parser.add_argument('--chunk-chars', type=int, default=8)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_stub_handler(args.chunk_ms / 1000, args.chunk_chars))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}/models/gemini'
+
+    app = Flask(__name__)
+    app.config.update(GEMINI_API_KEY='bench', GEMINI_API_URL=f'{base}:generateContent',
+                      GEMINI_STREAM_URL=f'{base}:streamGenerateContent')
+    busy = [{"start": "2030-01-01T12:00:00Z", "end": "2030-01-01T13:00:00Z"}]
+
+    with app.app_context():
+        blocking_first, blocking_total, stream_first, stream_total = [], [], [], []
+        for i in range(args.iterations):
+            task = SimpleNamespace(description=f'Benchmark task {i}', priority='High',
+                                   estimated_duration=45, deadline=None)
+            llm_cache.clear()
+
+            t0 = time.perf_counter()
+            json.loads(generate_suggestions(task, busy))
+            elapsed = (time.perf_counter() - t0) * 1000
+            blocking_first.append(elapsed)
+            blocking_total.append(elapsed)
+
+            llm_cache.clear()
+            t0 = time.perf_counter()
+            first = None
+            for _ in stream_suggestions(task, busy):
+                if first is None:
+                    first = (time.perf_counter() - t0) * 1000
+            stream_first.append(first)
+            stream_total.append((time.perf_counter() - t0) * 1000)
+
+    summarize('blocking', blocking_first, blocking_total)
+    summarize('streaming', stream_first, stream_total)
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
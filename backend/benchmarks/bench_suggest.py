@@ -0,0 +1,106 @@
+"""
+Latency of the two /api/ai/suggest paths:
+  - local:  app.services.scheduler.find_slots (no network)
+  - llm:    app.services.ai.generate_suggestions against a local Gemini stub
+
+Run from backend/:  python -m benchmarks.bench_suggest [--llm-delay-ms 0]
+"""
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from flask import Flask
+
+from app.services.ai import generate_suggestions
+from app.services.scheduler import find_slots
+
+STUB_REPLY = {
+    "candidates": [{"content": {"parts": [{"text": json.dumps({
+        "suggestions": [{"start": "2024-03-04T09:00:00", "reason": "Morning focus"}]
+    })}]}}]
+}
+
+
+def make_stub_handler(delay):
+    class GeminiStub(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            time.sleep(delay)
+            body = json.dumps(STUB_REPLY).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+    return GeminiStub
+
+
+def synthetic_busy(now, count, rng):
+    busy = []
+    for _ in range(count):
+        start = now + timedelta(minutes=rng.randrange(0, 3 * 24 * 60, 15))
+        end = start + timedelta(minutes=rng.choice([15, 30, 60, 90]))
+        busy.append({"start": start.isoformat() + 'Z', "end": end.isoformat() + 'Z'})
+    return busy
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return statistics.median(samples), p99
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--llm-iterations', type=int, default=100)
+    parser.add_argument('--busy', type=int, default=20, help='busy slots per calendar')
+    parser.add_argument('--llm-delay-ms', type=float, default=0.0,
+                        help='artificial model latency added by the stub')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    now = datetime(2024, 3, 4, 8, 0)
+    task = SimpleNamespace(description='Benchmark task', priority='High',
+                           estimated_duration=45, deadline=None)
+    calendars = [synthetic_busy(now, args.busy, rng) for _ in range(50)]
+
+    local = []
+    for i in range(args.iterations):
+        busy = calendars[i % len(calendars)]
+        t0 = time.perf_counter()
+        find_slots(task, busy, now=now)
+        local.append((time.perf_counter() - t0) * 1e6)
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_stub_handler(args.llm_delay_ms / 1000))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    app = Flask(__name__)
+    app.config['GEMINI_API_KEY'] = 'bench'
+    app.config['GEMINI_API_URL'] = f'http://127.0.0.1:{server.server_address[1]}/generate'
+
+    llm = []
+    with app.app_context():
+        for i in range(args.llm_iterations):
+            busy = calendars[i % len(calendars)]
+            t0 = time.perf_counter()
+            generate_suggestions(task, busy)
+            llm.append((time.perf_counter() - t0) * 1e6)
+    server.shutdown()
+
+    for name, samples in (('local scheduler', local), ('llm (stub)', llm)):
+        p50, p99 = percentiles(samples)
+        print(f"{name:16s} n={len(samples):5d}  p50={p50:10.1f}us  p99={p99:10.1f}us")
+
+
+if __name__ == '__main__':
+    main()
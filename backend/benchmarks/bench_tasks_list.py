@@ -0,0 +1,105 @@
+"""
+GET /api/tasks for a single user with a large history (default 100k tasks):
+full list vs. one keyset page vs. a sparse-field page.
+
+Run from backend/:  python -m benchmarks.bench_tasks_list [--tasks 100000]
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask_migrate import upgrade
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.models import Task, User
+
+
+def make_config(path):
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+        JWT_SECRET_KEY = 'bench-secret-key-with-enough-bytes-for-hs256'
+    return BenchConfig
+
+
+def make_app(path, config=None):
+    """App on a fresh SQLite file with the schema migrated to head."""
+    app = create_app(config or make_config(path))
+    with app.app_context():
+        upgrade()
+    return app
+
+
+def seed(count):
+    user = User(email='bench@example.com')
+    user.set_password('bench')
+    db.session.add(user)
+    db.session.commit()
+
+    rng = random.Random(1)
+    base = datetime(2023, 1, 1)
+    rows = [
+        {
+            'user_id': user.id,
+            'description': f'Task {i}',
+            'priority': rng.choice(['High', 'Medium', 'Low']),
+            'status': 'Completed' if rng.random() < 0.9 else 'Pending',
+            'estimated_duration': rng.choice([15, 30, 60]),
+            'deadline': base + timedelta(hours=rng.randrange(0, 24 * 700)) if rng.random() < 0.7 else None,
+            'created_at': base + timedelta(minutes=i)
+        }
+        for i in range(count)
+    ]
+    db.session.execute(Task.__table__.insert(), rows)
+    db.session.commit()
+
+
+def measure(client, headers, url, repeat):
+    samples = []
+    size = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        response = client.get(url, headers=headers)
+        samples.append((time.perf_counter() - t0) * 1000)
+        size = len(response.data)
+    return statistics.median(samples), max(samples), size
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--tasks', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    app = make_app(path)
+    with app.app_context():
+        t0 = time.perf_counter()
+        seed(args.tasks)
+        print(f"seeded {args.tasks} tasks in {time.perf_counter() - t0:.1f}s")
+
+    client = app.test_client()
+    token = client.post('/api/auth/login', json={'email': 'bench@example.com', 'password': 'bench'}) \
+        .get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    first = client.get('/api/tasks?limit=50&status=Completed', headers=headers).get_json()
+    cases = [
+        ('full list', '/api/tasks'),
+        ('page of 50', '/api/tasks?limit=50'),
+        ('page 2 (cursor)', f"/api/tasks?limit=50&status=Completed&cursor={first['next_cursor']}"),
+        ('pending by deadline', '/api/tasks?limit=50&status=Pending&sort=deadline'),
+        ('sparse page', '/api/tasks?limit=50&fields=id,status'),
+    ]
+    for label, url in cases:
+        p50, worst, size = measure(client, headers, url, args.repeat)
+        print(f"{label:22s} p50={p50:9.2f}ms  max={worst:9.2f}ms  bytes={size}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Multi-calendar availability:
+  1. merging busy intervals from many calendars: pairwise overlap check
+     (quadratic) vs the sweep line, and the full timeline with working hours
+  2. freeBusy over the stub: one request per calendar vs one for all
+
+Run from backend/:  python -m benchmarks.bench_timeline [--sizes 1000,10000,100000] [--freebusy-ms 80]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+
+from app.services.availability import availability_cache, fetch_busy_slots
+from app.services.outbound import outbound
+from app.services.timeline import build_timeline, intervals_to_slots, merge_busy
+from benchmarks.stubs import StubUpstreams
+
+BASE = datetime(2026, 3, 2)
+CALENDARS = 10
+PREFERENCES = {'timezone': 'Europe/Berlin', 'working_hours': {'start': '09:00', 'end': '17:30', 'days': [0, 1, 2, 3, 4]}}
+QUADRATIC_LIMIT = 10_000
+
+
+def synthetic_busy(count, days, rng):
+    """`count` intervals spread over CALENDARS calendars, overlapping within and across them."""
+    intervals = []
+    for _ in range(count):
+        start = BASE + timedelta(minutes=5 * rng.randrange(days * 24 * 12))
+        intervals.append((start, start + timedelta(minutes=rng.choice([15, 30, 45, 60, 120]))))
+    return intervals
+
+
+def pairwise_merge(intervals):
+    # The naive way: fold each interval into any result block it overlaps
+    blocks = []
+    for start, end in intervals:
+        overlapping = [b for b in blocks if b[0] <= end and start <= b[1]]
+        for block in overlapping:
+            blocks.remove(block)
+            start, end = min(start, block[0]), max(end, block[1])
+        blocks.append((start, end))
+    return sorted(blocks)
+
+
+def timed(fn, repeat=3):
+    best, result = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - t0) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_engine(sizes):
+    rng = random.Random(5)
+    print(f"{'intervals':>10s} {'pairwise':>11s} {'sweep':>9s} {'timeline':>10s} {'merged':>8s} {'segments':>9s}")
+    for size in sizes:
+        days = max(7, size // (CALENDARS * 8))  # about 8 meetings per calendar per day
+        intervals = synthetic_busy(size, days, rng)
+        sweep_ms, merged = timed(lambda: merge_busy(intervals))
+        if size <= QUADRATIC_LIMIT:
+            pairwise_ms, naive = timed(lambda: pairwise_merge(intervals), repeat=1)
+            assert naive == merged
+            pairwise = f"{pairwise_ms:9.1f}ms"
+        else:
+            pairwise = f"{'(skipped)':>11s}"
+        slots = intervals_to_slots(intervals)
+        window = ((BASE.isoformat() + 'Z'), (BASE + timedelta(days=days)).isoformat() + 'Z')
+        timeline_ms, result = timed(lambda: build_timeline(slots, *window, PREFERENCES))
+        print(f"{size:10,d} {pairwise} {sweep_ms:7.1f}ms {timeline_ms:8.1f}ms {len(merged):8,d} "
+              f"{len(result['timeline']):9,d}")
+
+
+def bench_requests(freebusy_ms, counts):
+    stubs = StubUpstreams(latency_ms={'token': 0, 'freebusy': freebusy_ms, 'events': 0, 'gemini': 0},
+                          jitter=0, busy_per_calendar=20).start()
+    app = Flask(__name__)
+    app.config.update(stubs.config())
+    outbound.init_app(app)
+    window = (BASE.isoformat() + 'Z', (BASE + timedelta(days=3)).isoformat() + 'Z')
+    print(f"freeBusy at {freebusy_ms:.0f}ms per call")
+    try:
+        with app.app_context():
+            fetch_busy_slots(0, 't', *window)  # open the connection
+            for count in counts:
+                calendars = ['primary'] + [f'team{i}@group.calendar.google.com' for i in range(count - 1)]
+                availability_cache.clear()
+                separate_ms, _ = timed(lambda: [fetch_busy_slots(1, 't', *window, calendars=(c,))
+                                                for c in calendars], repeat=1)
+                availability_cache.clear()
+                together_ms, (_, busy) = timed(lambda: fetch_busy_slots(1, 't', *window, calendars=calendars),
+                                               repeat=1)
+                print(f"  {count:3d} calendars: one request each {separate_ms:7.0f}ms   "
+                      f"one for all {together_ms:5.0f}ms ({len(busy)} merged busy slots)")
+    finally:
+        stubs.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--freebusy-ms', type=float, default=80)
+    args = parser.parse_args()
+
+    bench_engine([int(s) for s in args.sizes.split(',')])
+    bench_requests(args.freebusy_ms, (1, 5, 20))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""
+Local stand-ins for the upstreams the app calls, on one HTTP server:
+
+    POST /token                                   OAuth token endpoint (refresh / code exchange)
+    POST /freeBusy                                Calendar freeBusy
+    GET  /calendar/v3/calendars/primary/events    events list (sync)
+    POST /calendar/v3/calendars/primary/events    events insert
+    POST /gemini/generate                         Gemini generateContent
+
+Each upstream ('token', 'freebusy', 'events', 'gemini') gets its own latency
+(ms, with +-jitter) and error rate (answers 503). Gemini can also take longer
+for longer prompts (gemini_ms_per_token, ~4 characters per token).
+`config()` returns the app settings that point the app at the stubs.
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+UPSTREAMS = ('token', 'freebusy', 'events', 'gemini')
+EVENTS_PATH = '/calendar/v3/calendars/primary/events'
+
+
+def parse_per_upstream(text, default=0.0):
+    """'gemini=400,freebusy=40' (or a bare '40' for all) -> {upstream: float}."""
+    values = dict.fromkeys(UPSTREAMS, default)
+    for item in filter(None, (text or '').split(',')):
+        if '=' in item:
+            name, value = item.split('=', 1)
+            if name not in values:
+                raise ValueError(f"Unknown upstream: {name}")
+            values[name] = float(value)
+        else:
+            values = dict.fromkeys(UPSTREAMS, float(item))
+    return values
+
+
+class StubUpstreams:
+    """Threaded HTTP server answering like Google/Gemini, with injected latency and errors."""
+
+    def __init__(self, latency_ms=None, error_rate=None, jitter=0.2, busy_per_calendar=8,
+                 events_per_calendar=20, gemini_ms_per_token=0.0, seed=1):
+        self.latency_ms = dict.fromkeys(UPSTREAMS, 0.0) if latency_ms is None else latency_ms
+        self.error_rate = dict.fromkeys(UPSTREAMS, 0.0) if error_rate is None else error_rate
+        self.gemini_ms_per_token = gemini_ms_per_token
+        self.jitter = jitter
+        self.busy_per_calendar = busy_per_calendar
+        self.events_per_calendar = events_per_calendar
+        self.calls = Counter()
+        self.errors = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+
+    # --- lifecycle ---
+    def start(self):
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True, name='upstream-stubs').start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self._server.server_address[1]}'
+
+    def config(self):
+        return {
+            'GOOGLE_TOKEN_URL': f'{self.url}/token',
+            'GOOGLE_FREEBUSY_URL': f'{self.url}/freeBusy',
+            'GOOGLE_CALENDAR_API_URL': f'{self.url}/calendar/v3',
+            'GEMINI_API_URL': f'{self.url}/gemini/generate',
+            'GEMINI_API_KEY': 'stub',
+        }
+
+    # --- behaviour ---
+    def _delay_and_fail(self, upstream):
+        """Sleeps the configured latency; True when this call should fail."""
+        with self._lock:
+            self.calls[upstream] += 1
+            jitter = 1 + self._rng.uniform(-self.jitter, self.jitter)
+            fail = self._rng.random() < self.error_rate[upstream]
+            if fail:
+                self.errors[upstream] += 1
+        time.sleep(max(0.0, self.latency_ms[upstream] * jitter / 1000))
+        return fail
+
+    def _busy(self, time_min):
+        with self._lock:
+            offsets = sorted(self._rng.randrange(0, 3 * 24 * 4) for _ in range(self.busy_per_calendar))
+        start = datetime.fromisoformat(time_min.rstrip('Z')).replace(minute=0, second=0, microsecond=0)
+        return [{
+            'start': (start + timedelta(minutes=15 * o)).isoformat() + 'Z',
+            'end': (start + timedelta(minutes=15 * o + 45)).isoformat() + 'Z'
+        } for o in offsets]
+
+    def _event(self, body=None):
+        if body is None:
+            with self._lock:
+                hours = self._rng.randrange(0, 72)
+            start = datetime.utcnow().replace(minute=0, second=0, microsecond=0) + timedelta(hours=hours)
+            body = {'summary': 'Stub meeting',
+                    'start': {'dateTime': start.isoformat() + 'Z'},
+                    'end': {'dateTime': (start + timedelta(minutes=30)).isoformat() + 'Z'}}
+        event_id = body.get('id') or uuid.uuid4().hex
+        return dict(body, id=event_id, status='confirmed', htmlLink=f'{self.url}/event/{event_id}')
+
+    def _handler(self):
+        stubs = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive, like the real APIs
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self):
+                return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path != EVENTS_PATH:
+                    return self._reply(404, {'error': 'not found'})
+                if stubs._delay_and_fail('events'):
+                    return self._reply(503, {'error': 'stub failure'})
+                query = parse_qs(url.query)
+                # First sync lists the calendar; later syncs (with a syncToken) see no changes
+                count = 0 if 'syncToken' in query else stubs.events_per_calendar
+                self._reply(200, {'items': [stubs._event() for _ in range(count)],
+                                  'nextSyncToken': uuid.uuid4().hex})
+
+            def do_POST(self):
+                path = urlsplit(self.path).path
+                raw = self._body()
+                upstream = {'/token': 'token', '/freeBusy': 'freebusy', EVENTS_PATH: 'events',
+                            '/gemini/generate': 'gemini'}.get(path)
+                if upstream is None:
+                    return self._reply(404, {'error': 'not found'})
+                if stubs._delay_and_fail(upstream):
+                    return self._reply(503, {'error': 'stub failure'})
+
+                if upstream == 'token':
+                    self._reply(200, {'access_token': f'stub-{uuid.uuid4().hex}', 'expires_in': 3600,
+                                      'token_type': 'Bearer'})
+                elif upstream == 'freebusy':
+                    body = json.loads(raw or b'{}')
+                    self._reply(200, {'calendars': {item['id']: {'busy': stubs._busy(body['timeMin'])}
+                                                    for item in body.get('items', [{'id': 'primary'}])}})
+                elif upstream == 'events':
+                    self._reply(200, stubs._event(json.loads(raw or b'{}')))
+                else:
+                    if stubs.gemini_ms_per_token:
+                        prompt = json.loads(raw or b'{}')['contents'][0]['parts'][0]['text']
+                        time.sleep(len(prompt) / 4 * stubs.gemini_ms_per_token / 1000)
+                    text = json.dumps({
+                        'reasons': ['Quiet slot for focused work'] * 5,
+                        'suggestions': [{'start': datetime.utcnow().replace(microsecond=0).isoformat(),
+                                         'reason': 'Stub suggestion'}]
+                    })
+                    self._reply(200, {'candidates': [{'content': {'parts': [{'text': text}]}}]})
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,73 @@
+"""Token expiry, task versions/tombstones and the calendar event mirror
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:05:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('google_token_expires_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('google_sync_token', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('calendar_synced_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('task_version', sa.Integer(), nullable=True))
+
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=True))
+
+    op.create_table(
+        'task_tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('task_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_task_tombstones_user_version', 'task_tombstones', ['user_id', 'version'], unique=False)
+
+    op.create_table(
+        'calendar_events',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('google_id', sa.String(length=255), nullable=False),
+        sa.Column('summary', sa.Text(), nullable=True),
+        sa.Column('start', sa.DateTime(), nullable=False),
+        sa.Column('end', sa.DateTime(), nullable=False),
+        sa.Column('all_day', sa.Boolean(), nullable=True),
+        sa.Column('transparency', sa.String(length=20), nullable=True),
+        sa.Column('html_link', sa.Text(), nullable=True),
+        sa.Column('updated', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'google_id', name='uq_calendar_events_user_google_id')
+    )
+    op.create_index('ix_calendar_events_user_start', 'calendar_events', ['user_id', 'start'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_calendar_events_user_start', table_name='calendar_events')
+    op.drop_table('calendar_events')
+    op.drop_index('ix_task_tombstones_user_version', table_name='task_tombstones')
+    op.drop_table('task_tombstones')
+
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_column('version')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('task_version')
+        batch_op.drop_column('calendar_synced_at')
+        batch_op.drop_column('google_sync_token')
+        batch_op.drop_column('google_token_expires_at')
@@ -0,0 +1,31 @@
+"""Indexes for task listing: user_id, status/deadline, created_at, version
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:10:00
+
+Every task query filters on user_id; before this revision each one was a full
+scan of the tasks table.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_tasks_user_id', 'tasks', ['user_id'], unique=False)
+    op.create_index('ix_tasks_user_status_deadline', 'tasks', ['user_id', 'status', 'deadline'], unique=False)
+    op.create_index('ix_tasks_user_created', 'tasks', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_tasks_user_version', 'tasks', ['user_id', 'version'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tasks_user_version', table_name='tasks')
+    op.drop_index('ix_tasks_user_created', table_name='tasks')
+    op.drop_index('ix_tasks_user_status_deadline', table_name='tasks')
+    op.drop_index('ix_tasks_user_id', table_name='tasks')
@@ -0,0 +1,28 @@
+"""Task recurrence rule and anchor
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:20:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('recurrence_rule', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('recurrence_start', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_column('recurrence_start')
+        batch_op.drop_column('recurrence_rule')
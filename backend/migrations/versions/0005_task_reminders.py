@@ -0,0 +1,28 @@
+"""Task reminder lead time and last sent reminder
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 15:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reminder_minutes', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('reminder_sent_through', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('tasks', schema=None) as batch_op:
+        batch_op.drop_column('reminder_sent_through')
+        batch_op.drop_column('reminder_minutes')
@@ -0,0 +1,26 @@
+"""Tombstone retention floor per user
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 18:40:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('tombstones_pruned_through', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('tombstones_pruned_through')
@@ -0,0 +1,32 @@
+"""
+Production entry point: a gevent WSGI server, one greenlet per connection.
+
+Blocking I/O (requests calls to Google/Gemini, PyMySQL) is patched to yield,
+so a slow upstream call parks its greenlet instead of occupying a worker
+thread. SERVER_MAX_CONNECTIONS caps concurrent requests, which keeps memory
+bounded under load. Connection pools are warmed in the background once the
+server is listening (app/services/warmup.py).
+
+    python serve.py            (SERVER_HOST / SERVER_PORT, default 0.0.0.0:5000)
+"""
+from gevent import monkey
+monkey.patch_all()  # must run before anything imports socket/ssl/threading
+
+from gevent.pool import Pool
+from gevent.pywsgi import WSGIServer
+
+from app import create_app
+from app.services.warmup import pool_warmer
+
+app = create_app()
+
+if __name__ == '__main__':
+    host = app.config.get('SERVER_HOST', '0.0.0.0')
+    port = app.config.get('SERVER_PORT', 5000)
+    pool = Pool(app.config.get('SERVER_MAX_CONNECTIONS', 1000))
+    server = WSGIServer((host, port), app, spawn=pool, log=None)
+    server.start()
+    # Accepting connections now; open DB/upstream connections in the background
+    pool_warmer.start()
+    print(f"Serving on http://{host}:{port} (gevent, max {pool.size} connections)")
+    server.serve_forever()
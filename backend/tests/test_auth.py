@@ -0,0 +1,101 @@
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app.extensions import db
+from app.models import User
+from app.services.passwords import HashingBusyError, PasswordHasher
+from app.services.ratelimit import TokenBucketLimiter
+
+
+def test_login_upgrades_old_hashes(app, client):
+    with app.app_context():
+        user = User(email='old@example.com', password_hash=generate_password_hash('secret', 'pbkdf2:sha256:1000'))
+        db.session.add(user)
+        db.session.commit()
+
+    response = client.post('/api/auth/login', json={'email': 'old@example.com', 'password': 'secret'})
+    assert response.status_code == 200
+
+    with app.app_context():
+        stored = User.query.filter_by(email='old@example.com').first().password_hash
+    assert stored.startswith('scrypt:32768:8:1$')
+    assert client.post('/api/auth/login', json={'email': 'old@example.com', 'password': 'secret'}).status_code == 200
+
+
+def test_repeated_failures_are_throttled_before_hashing(app, client, auth_headers, monkeypatch):
+    from app.services.ratelimit import login_limiter
+    login_limiter.by_account.configure(per_minute=1, burst=3)
+
+    attempts = [client.post('/api/auth/login', json={'email': 'user@example.com', 'password': 'wrong'})
+                for _ in range(3)]
+    assert [r.status_code for r in attempts] == [401, 401, 401]
+
+    # Throttled attempts never reach the hasher
+    monkeypatch.setattr(User, 'check_password', lambda *args: pytest.fail('hashed a throttled attempt'))
+    response = client.post('/api/auth/login', json={'email': 'USER@example.com', 'password': 'wrong'})
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) > 0
+
+
+def test_failures_from_one_address_do_not_lock_out_the_owner(app, client, auth_headers):
+    from app.services.ratelimit import login_limiter
+    login_limiter.by_account.configure(per_minute=1, burst=2)
+
+    attacker = {'REMOTE_ADDR': '203.0.113.7'}
+    codes = [client.post('/api/auth/login', json={'email': 'user@example.com', 'password': 'wrong'},
+                         environ_base=attacker).status_code for _ in range(3)]
+    assert codes == [401, 401, 429]
+
+    # Successful logins never use up the account bucket
+    for _ in range(3):
+        response = client.post('/api/auth/login', json={'email': 'user@example.com', 'password': 'secret'},
+                               environ_base={'REMOTE_ADDR': '198.51.100.2'})
+        assert response.status_code == 200
+
+
+def test_trusted_proxies_take_the_client_address_from_forwarded_for():
+    from app import create_app
+    from tests.conftest import TestConfig
+
+    class ProxiedConfig(TestConfig):
+        TRUSTED_PROXIES = 1
+
+    app = create_app(ProxiedConfig)
+
+    @app.route('/whoami')
+    def whoami():
+        from flask import request
+        return request.remote_addr
+
+    response = app.test_client().get('/whoami', headers={'X-Forwarded-For': '203.0.113.7'},
+                                     environ_base={'REMOTE_ADDR': '10.0.0.1'})
+    assert response.get_data(as_text=True) == '203.0.113.7'
+
+
+def test_token_bucket_refills():
+    now = [100.0]
+    limiter = TokenBucketLimiter(per_minute=60, burst=1, clock=lambda: now[0])
+    assert limiter.allow('ip')[0]
+    allowed, retry_after = limiter.allow('ip')
+    assert not allowed and retry_after == pytest.approx(1.0)
+    assert limiter.allow('other-ip')[0]
+
+    now[0] += 0.5
+    assert not limiter.allow('ip')[0]
+    now[0] += 1.0
+    assert limiter.allow('ip')[0]
+    assert not limiter.allow('ip')[0]
+
+
+def test_hashing_is_bounded():
+    hasher = PasswordHasher(method='pbkdf2:sha256:1000', max_pending=0)
+    with pytest.raises(HashingBusyError):
+        hasher.hash('secret')
+    assert PasswordHasher(method='pbkdf2:sha256:1000').needs_rehash(generate_password_hash('x', 'scrypt'))
+
+
+def test_shorthand_methods_do_not_force_a_rehash():
+    hasher = PasswordHasher(method='pbkdf2:sha256')
+    assert not hasher.needs_rehash(generate_password_hash('x', 'pbkdf2:sha256'))
+    assert hasher.needs_rehash(generate_password_hash('x', 'pbkdf2:sha256:1000'))
+    assert not PasswordHasher(method='scrypt').needs_rehash(generate_password_hash('x', 'scrypt:32768:8:1'))
@@ -0,0 +1,125 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from flask import Flask
+
+from app.services.availability import AvailabilityCache, availability_cache, fetch_busy_slots
+
+BUSY = [{"start": "2024-03-04T10:00:00Z", "end": "2024-03-04T11:00:00Z"}]
+CALENDARS = {
+    "primary": {"busy": BUSY},
+    "work": {"busy": [{"start": "2024-03-04T10:30:00Z", "end": "2024-03-04T12:00:00Z"},
+                      {"start": "2024-03-04T08:00:00Z", "end": "2024-03-04T09:00:00Z"}]},
+}
+
+
+class FakeFreeBusy(BaseHTTPRequestHandler):
+    """Local stand-in for Google's freeBusy endpoint."""
+    calls = 0
+
+    def do_POST(self):
+        FakeFreeBusy.calls += 1
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        if self.headers.get('Authorization') == 'Bearer expired':
+            self.send_response(401)
+            self.end_headers()
+            return
+        calendars = {item['id']: CALENDARS.get(item['id'], {"errors": [{"reason": "notFound"}]})
+                     for item in request['items']}
+        body = json.dumps({"calendars": calendars}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def app():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeFreeBusy)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    FakeFreeBusy.calls = 0
+    availability_cache.clear()
+
+    app = Flask(__name__)
+    app.config['GOOGLE_FREEBUSY_URL'] = f'http://127.0.0.1:{server.server_address[1]}/freeBusy'
+    with app.app_context():
+        yield app
+    server.shutdown()
+
+
+def test_repeated_lookups_hit_the_cache(app):
+    window = ('2024-03-04T00:00:00Z', '2024-03-07T00:00:00Z')
+    assert fetch_busy_slots(1, 'token', *window) == (200, BUSY)
+    assert fetch_busy_slots(1, 'token', *window) == (200, BUSY)
+    assert FakeFreeBusy.calls == 1
+    assert availability_cache.stats()['hits'] == 1
+
+    # Another user does not share the entry
+    fetch_busy_slots(2, 'token', *window)
+    assert FakeFreeBusy.calls == 2
+
+
+def test_invalidation_and_errors_are_not_cached(app):
+    window = ('2024-03-04T00:00:00Z', '2024-03-07T00:00:00Z')
+    assert fetch_busy_slots(1, 'expired', *window) == (401, None)
+    assert fetch_busy_slots(1, 'token', *window) == (200, BUSY)
+    assert FakeFreeBusy.calls == 2
+
+    availability_cache.invalidate_user(1)
+    fetch_busy_slots(1, 'token', *window)
+    assert FakeFreeBusy.calls == 3
+
+
+def test_invalidation_during_a_fetch_drops_its_result(app, monkeypatch):
+    from app.services.outbound import outbound
+
+    window = ('2024-03-04T00:00:00Z', '2024-03-07T00:00:00Z')
+    post = outbound.post
+
+    def post_then_invalidate(*args, **kwargs):
+        response = post(*args, **kwargs)
+        # An event gets scheduled while the freeBusy answer is on its way
+        availability_cache.invalidate_user(1)
+        return response
+
+    monkeypatch.setattr(outbound, 'post', post_then_invalidate)
+    assert fetch_busy_slots(1, 'token', *window) == (200, BUSY)
+    monkeypatch.undo()
+
+    assert availability_cache.stats()['size'] == 0
+    fetch_busy_slots(1, 'token', *window)
+    assert FakeFreeBusy.calls == 2
+
+
+def test_calendars_are_fetched_together_and_merged(app):
+    window = ('2024-03-04T00:00:00Z', '2024-03-07T00:00:00Z')
+    status, busy = fetch_busy_slots(1, 'token', *window, calendars=('primary', 'work', 'missing'))
+    assert status == 200
+    assert busy == [{"start": "2024-03-04T08:00:00Z", "end": "2024-03-04T09:00:00Z"},
+                    {"start": "2024-03-04T10:00:00Z", "end": "2024-03-04T12:00:00Z"}]
+    assert FakeFreeBusy.calls == 1
+
+    # The primary-only entry is a different cache key
+    fetch_busy_slots(1, 'token', *window)
+    assert FakeFreeBusy.calls == 2
+
+
+def test_lru_eviction_and_ttl():
+    cache = AvailabilityCache(maxsize=2, ttl=60)
+    cache.set((1, 'a', 'b'), [])
+    cache.set((2, 'a', 'b'), [])
+    cache.get((1, 'a', 'b'))
+    cache.set((3, 'a', 'b'), [])
+    assert cache.get((2, 'a', 'b')) is None
+    assert cache.get((1, 'a', 'b')) == []
+    assert cache.stats()['evictions'] == 1
+
+    expired = AvailabilityCache(ttl=0)
+    expired.set((1, 'a', 'b'), [])
+    assert expired.get((1, 'a', 'b')) is None
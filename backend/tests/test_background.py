@@ -0,0 +1,48 @@
+import threading
+
+from flask import current_app
+from sqlalchemy import event
+
+from app.extensions import db
+from app.services.background import background
+
+
+def test_calls_run_in_their_own_app_context(app):
+    with app.app_context():
+        outer = db.session()
+
+        def probe():
+            return current_app._get_current_object(), db.session()
+
+        inner_app, inner_session = background.submit(probe).result()
+
+    assert inner_app is app
+    assert inner_session is not outer
+
+
+def test_suggest_starts_the_calendar_lookup_before_loading_the_task(app, client, auth_headers, monkeypatch):
+    task = client.post('/api/tasks', json={'description': 'Write report', 'priority': 'High',
+                                           'estimated_duration': 60}, headers=auth_headers).get_json()
+
+    order = []
+    submit = background.submit
+    monkeypatch.setattr(background, 'submit', lambda fn, *args: order.append('lookup') or submit(fn, *args))
+
+    def on_query(conn, cursor, statement, *args):
+        if 'FROM tasks' in statement and threading.current_thread() is main:
+            order.append('task query')
+
+    main = threading.current_thread()
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', on_query)
+    try:
+        for path in ('/api/ai/suggest', '/api/ai/suggest/stream'):
+            response = client.post(path, json={'task_id': task['id']}, headers=auth_headers)
+            assert response.status_code == 200
+            response.get_data()
+    finally:
+        event.remove(engine, 'before_cursor_execute', on_query)
+
+    assert order[:2] == ['lookup', 'task query'] and order[2:4] == ['lookup', 'task query']
+    assert client.post('/api/ai/suggest', json={'task_id': 9999}, headers=auth_headers).status_code == 404
@@ -0,0 +1,194 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.extensions import db
+from app.models import CalendarEvent, Task, User
+from app.services.google_batch import parse_batch_response
+from app.services.outbound import outbound
+
+
+def created(body, event_id):
+    return dict(body, id=event_id, htmlLink=f'https://calendar.example/{event_id}', status='confirmed')
+
+
+class FakeGoogle(BaseHTTPRequestHandler):
+    """
+    Batch endpoint plus the single insert and get endpoints. Events titled
+    'fail' get a 403; inserting an id that already exists gets a 409.
+    """
+    calls = []
+    events = {}
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers['Content-Length']))
+        FakeGoogle.calls.append(self.path)
+
+        if self.path.startswith('/batch'):
+            message = BytesParser().parsebytes(f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode() + raw)
+            parts = []
+            for part in message.get_payload():
+                content_id = part['Content-ID'].strip('<>')
+                body = json.loads(part.get_payload(decode=True).replace(b'\r\n', b'\n').split(b'\n\n', 1)[1])
+                status, payload = (403, {"error": "forbidden"}) if body['summary'] == 'fail' \
+                    else (200, created(body, f'evt-{content_id}'))
+                parts.append(f"--resp\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                             f"HTTP/1.1 {status} X\r\nContent-Type: application/json\r\n\r\n{json.dumps(payload)}\r\n")
+            self.reply(200, (''.join(parts) + '--resp--\r\n').encode(), 'multipart/mixed; boundary=resp')
+            return
+
+        body = json.loads(raw)
+        if body['summary'] == 'fail':
+            self.reply(403, b'{"error": "forbidden"}', 'application/json')
+        elif body.get('id') in FakeGoogle.events:
+            self.reply(409, b'{"error": "duplicate"}', 'application/json')
+        else:
+            event = FakeGoogle.events[body.get('id')] = created(body, body.get('id') or f"evt-{body['summary']}")
+            self.reply(200, json.dumps(event).encode(), 'application/json')
+
+    def do_GET(self):
+        FakeGoogle.calls.append(self.path)
+        event = FakeGoogle.events.get(self.path.rsplit('/', 1)[1])
+        self.reply(200 if event else 404, json.dumps(event or {"error": "not found"}).encode(), 'application/json')
+
+    def reply(self, status, raw, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def connected(app, client, auth_headers):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGoogle)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    FakeGoogle.calls = []
+    FakeGoogle.events = {}
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    app.config['GOOGLE_CALENDAR_API_URL'] = f'{base}/calendar/v3'
+    app.config['GOOGLE_CALENDAR_BATCH_URL'] = f'{base}/batch/calendar/v3'
+    app.config['GOOGLE_FREEBUSY_URL'] = f'{base}/calendar/v3/freeBusy'
+
+    with app.app_context():
+        user = User.query.filter_by(email='user@example.com').first()
+        user.google_access_token = 'token'
+        user.google_token_expires_at = datetime.utcnow() + timedelta(hours=1)
+        db.session.commit()
+
+    ids = [client.post('/api/tasks', json={'description': name}, headers=auth_headers).get_json()['id']
+           for name in ('write', 'fail', 'read')]
+    yield auth_headers, ids
+    server.shutdown()
+    outbound.breakers.pop(f'127.0.0.1:{server.server_address[1]}', None)
+
+
+def items_for(ids):
+    return [{"task_id": task_id, "start_time": f"2030-01-01T{9 + i:02d}:00:00", "end_time": f"2030-01-01T{9 + i:02d}:30:00"}
+            for i, task_id in enumerate(ids)]
+
+
+@pytest.mark.parametrize('mode', ['multipart', 'concurrent'])
+def test_batch_schedule_reports_partial_failures(app, client, connected, mode):
+    headers, ids = connected
+    app.config['CALENDAR_BATCH_MODE'] = mode
+
+    response = client.post('/api/calendar/schedule/batch', json={"items": items_for(ids + [9999])}, headers=headers)
+    assert response.status_code == 207
+    data = response.get_json()
+    assert (data['scheduled'], data['failed']) == (2, 2)
+    assert [r['status'] for r in data['results']] == [200, 403, 200, 404]
+
+    if mode == 'multipart':
+        assert FakeGoogle.calls == ['/batch/calendar/v3']
+    else:
+        assert FakeGoogle.calls == ['/calendar/v3/calendars/primary/events'] * 3
+
+    with app.app_context():
+        tasks = {t.description: t for t in Task.query.all()}
+        assert tasks['write'].status == 'Scheduled'
+        assert tasks['write'].scheduled_start == datetime(2030, 1, 1, 9, 0)
+        assert tasks['write'].google_event_id == data['results'][0]['google_event_id']
+        assert tasks['fail'].google_event_id is None
+        assert CalendarEvent.query.count() == 2
+
+
+def test_batch_schedule_validates_input(client, connected):
+    headers, ids = connected
+    assert client.post('/api/calendar/schedule/batch', json={"items": []}, headers=headers).status_code == 400
+
+    response = client.post('/api/calendar/schedule/batch', json={"items": [{"task_id": ids[0]}]}, headers=headers)
+    assert response.status_code == 400
+    assert response.get_json()['results'][0]['status'] == 400
+    assert FakeGoogle.calls == []
+
+
+def test_batch_schedule_checks_each_item(app, client, connected):
+    headers, ids = connected
+    write, read = items_for([ids[0], ids[2]])
+    items = [
+        dict(write, task_id=str(ids[0])),                 # "5" is the same as 5
+        dict(write),                                      # same task again
+        dict(read, task_id=[ids[2]]),                     # not an id at all
+        dict(read, start_time=20300101),                  # not a timestamp string
+    ]
+    response = client.post('/api/calendar/schedule/batch', json={"items": items}, headers=headers)
+    assert response.status_code == 207
+    results = response.get_json()['results']
+    assert [r['status'] for r in results] == [200, 400, 400, 400]
+    assert results[1]['error'] == 'Duplicate task_id in batch'
+
+    with app.app_context():
+        assert db.session.get(Task, ids[0]).status == 'Scheduled'
+        assert db.session.get(Task, ids[2]).status != 'Scheduled'
+
+
+def test_malformed_batch_parts_become_item_errors():
+    reply = (b'--b\r\nContent-Type: application/http\r\nContent-ID: <response-item-x>\r\n\r\n'
+             b'HTTP/1.1 200 OK\r\n\r\n{}\r\n'
+             b'--b\r\nContent-Type: application/http\r\nContent-ID: <response-item-1>\r\n\r\n'
+             b'garbage\r\n\r\n{}\r\n--b--\r\n')
+    assert parse_batch_response('multipart/mixed; boundary=b', reply) == {1: (502, 'Malformed batch response part')}
+
+
+def test_schedule_retry_finds_the_event_instead_of_duplicating_it(app, client, connected):
+    headers, ids = connected
+    item = items_for(ids[:1])[0]
+
+    first = client.post('/api/calendar/schedule', json=item, headers=headers)
+    assert first.status_code == 200
+    # Same slot again, as after a lost reply: Google answers 409 and the event is fetched
+    second = client.post('/api/calendar/schedule', json=item, headers=headers)
+    assert second.status_code == 200
+    assert second.get_json()['google_event_id'] == first.get_json()['google_event_id']
+    assert len(FakeGoogle.events) == 1
+    assert FakeGoogle.calls[-1].endswith('/events/' + first.get_json()['google_event_id'])
+
+    with app.app_context():
+        assert CalendarEvent.query.count() == 1
+
+
+def test_open_circuit_returns_503_json(app, client, connected):
+    headers, ids = connected
+    breaker = outbound.breaker_for(app.config['GOOGLE_CALENDAR_API_URL'].split('/')[2])
+    breaker.opened_at = time.monotonic()
+
+    responses = [
+        client.get('/api/calendar/availability', headers=headers),
+        client.post('/api/calendar/schedule', json=items_for(ids[:1])[0], headers=headers),
+        client.post('/api/calendar/schedule/batch', json={"items": items_for(ids)}, headers=headers),
+    ]
+    assert [r.status_code for r in responses] == [503, 503, 503]
+    assert all('error' in r.get_json() for r in responses)
+    assert FakeGoogle.calls == []
+
+    with app.app_context():
+        assert Task.query.filter_by(status='Scheduled').count() == 0
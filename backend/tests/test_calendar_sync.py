@@ -0,0 +1,146 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from app.extensions import db
+from app.models import User
+
+
+def event(event_id, start, end, **extra):
+    return dict({"id": event_id, "summary": event_id, "status": "confirmed",
+                 "start": {"dateTime": start}, "end": {"dateTime": end}}, **extra)
+
+
+class FakeCalendar(BaseHTTPRequestHandler):
+    """Serves paged event lists and honours syncToken like the Calendar API."""
+    requests = []
+
+    def do_GET(self):
+        query = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+        FakeCalendar.requests.append(query)
+
+        if query.get('syncToken') == 'sync-1':
+            body = {"items": [
+                event('standup', '2030-01-01T09:30:00Z', '2030-01-01T10:00:00Z'),
+                {"id": "lunch", "status": "cancelled"},
+            ], "nextSyncToken": "sync-2"}
+        elif query.get('syncToken'):
+            self.send_response(410)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        elif query.get('pageToken') == 'page-2':
+            body = {"items": [
+                event('lunch', '2030-01-01T12:00:00Z', '2030-01-01T13:00:00Z'),
+                event('focus', '2030-01-01T14:00:00Z', '2030-01-01T15:00:00Z', transparency='transparent'),
+            ], "nextSyncToken": "sync-1"}
+        else:
+            body = {"items": [event('standup', '2030-01-01T09:00:00Z', '2030-01-01T09:15:00Z')],
+                    "nextPageToken": "page-2"}
+
+        raw = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def connected(app, auth_headers):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeCalendar)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    FakeCalendar.requests = []
+    app.config['GOOGLE_CALENDAR_API_URL'] = f'http://127.0.0.1:{server.server_address[1]}'
+
+    with app.app_context():
+        user = User.query.filter_by(email='user@example.com').first()
+        user.google_access_token = 'token'
+        user.google_refresh_token = 'refresh'
+        user.google_token_expires_at = datetime.utcnow() + timedelta(hours=1)
+        db.session.commit()
+    yield auth_headers
+    server.shutdown()
+
+
+def force_resync(app):
+    with app.app_context():
+        User.query.filter_by(email='user@example.com').first().calendar_synced_at = None
+        db.session.commit()
+
+
+def test_full_then_incremental_sync(app, client, connected):
+    window = '?start=2030-01-01T00:00:00&end=2030-01-02T00:00:00'
+    events = client.get(f'/api/calendar/events{window}', headers=connected).get_json()
+    assert [e['id'] for e in events] == ['standup', 'lunch', 'focus']
+    assert 'timeMin' in FakeCalendar.requests[0]
+    assert FakeCalendar.requests[1]['pageToken'] == 'page-2'
+
+    # Fresh mirror: no call to Google at all
+    client.get(f'/api/calendar/events{window}', headers=connected)
+    assert len(FakeCalendar.requests) == 2
+
+    force_resync(app)
+    events = client.get(f'/api/calendar/events{window}', headers=connected).get_json()
+    assert FakeCalendar.requests[-1]['syncToken'] == 'sync-1'
+    assert [(e['id'], e['start']) for e in events] == [('standup', '2030-01-01T09:30:00'), ('focus', '2030-01-01T14:00:00')]
+
+    # Expired sync token (410): start over with a full sync
+    force_resync(app)
+    events = client.get(f'/api/calendar/events{window}', headers=connected).get_json()
+    assert 'timeMin' in FakeCalendar.requests[-2]
+    assert [e['id'] for e in events] == ['standup', 'lunch', 'focus']
+
+
+def test_busy_slots_come_from_the_mirror(app, client, connected):
+    from app.services.calendar_sync import lookup_busy_slots
+
+    with app.test_request_context():
+        user = User.query.filter_by(email='user@example.com').first()
+        status, busy = lookup_busy_slots(user, 'token', '2030-01-01T00:00:00Z', '2030-01-02T00:00:00Z')
+
+    assert status == 200
+    # The transparent "focus" block does not count as busy
+    assert busy == [
+        {"start": "2030-01-01T09:00:00Z", "end": "2030-01-01T09:15:00Z"},
+        {"start": "2030-01-01T12:00:00Z", "end": "2030-01-01T13:00:00Z"},
+    ]
+
+
+def test_concurrent_sync_is_skipped_and_leaves_nothing_behind(app, monkeypatch):
+    from types import SimpleNamespace
+    from app.services import calendar_sync
+
+    started, release = threading.Event(), threading.Event()
+
+    def slow_sync(user, token):
+        started.set()
+        release.wait(5)
+        return 200
+
+    monkeypatch.setattr(calendar_sync, 'sync_events', slow_sync)
+    user = SimpleNamespace(id=7, calendar_synced_at=None)
+    results = []
+
+    def first():
+        with app.app_context():
+            results.append(calendar_sync.ensure_synced(user, 'token'))
+
+    thread = threading.Thread(target=first)
+    thread.start()
+    started.wait(5)
+    with app.app_context():
+        # Never synced and already syncing: nothing to serve yet
+        assert calendar_sync.ensure_synced(user, 'token') == 409
+    release.set()
+    thread.join()
+
+    assert results == [200]
+    assert calendar_sync._syncing == set()
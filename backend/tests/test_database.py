@@ -0,0 +1,53 @@
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import downgrade, upgrade
+from sqlalchemy import inspect, text
+
+from app import create_app
+from app.extensions import db
+from app.services.database import engine_options, sqlite_pragmas
+from tests.conftest import TestConfig
+
+
+def file_app(tmp_path):
+    class FileConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'app.db'}"
+    return create_app(FileConfig)
+
+
+def test_migrations_match_the_models(tmp_path):
+    app = file_app(tmp_path)
+    with app.app_context():
+        upgrade()
+        with db.engine.connect() as connection:
+            diff = compare_metadata(MigrationContext.configure(connection), db.metadata)
+        assert diff == []
+
+        downgrade(revision='0002')
+        assert 'ix_tasks_user_id' not in {i['name'] for i in inspect(db.engine).get_indexes('tasks')}
+        db.engine.dispose()
+
+
+def test_startup_does_not_create_tables(tmp_path):
+    app = file_app(tmp_path)
+    with app.app_context():
+        assert inspect(db.engine).get_table_names() == []
+
+
+def test_sqlite_connections_use_wal(tmp_path):
+    app = file_app(tmp_path)
+    with app.app_context(), db.engine.connect() as connection:
+        assert connection.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert connection.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+
+
+def test_server_database_pool_options():
+    config = {'SQLALCHEMY_DATABASE_URI': 'mysql+pymysql://root:pw@localhost/planner',
+              'DB_POOL_SIZE': 5, 'SQLALCHEMY_ENGINE_OPTIONS': {'pool_recycle': 60}}
+    options = engine_options(config)
+    assert options['pool_size'] == 5
+    assert options['pool_pre_ping'] is True
+    assert options['pool_recycle'] == 60
+
+    assert engine_options({'SQLALCHEMY_DATABASE_URI': 'sqlite://'}) == {}
+    assert 'journal_mode' not in sqlite_pragmas({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
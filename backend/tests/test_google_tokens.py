@@ -0,0 +1,133 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask
+
+from app.services.google_tokens import TokenManager, expiry_from
+
+
+class FakeTokenEndpoint(BaseHTTPRequestHandler):
+    """Slow local stand-in for Google's OAuth token endpoint."""
+    calls = 0
+
+    def do_POST(self):
+        FakeTokenEndpoint.calls += 1
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(0.1)
+        body = json.dumps({"access_token": f"fresh-{FakeTokenEndpoint.calls}", "expires_in": 3599}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class InMemoryTokenManager(TokenManager):
+    """Skips the users table so the test only exercises the lifecycle logic."""
+
+    def store(self, user, tokens):
+        user.google_access_token = tokens['access_token']
+        user.google_token_expires_at = expiry_from(tokens)
+        self._remember(user.id, user.google_access_token, user.google_token_expires_at)
+
+
+@pytest.fixture
+def token_app():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeTokenEndpoint)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    FakeTokenEndpoint.calls = 0
+
+    app = Flask(__name__)
+    app.config.update(GOOGLE_CLIENT_ID='id', GOOGLE_CLIENT_SECRET='secret',
+                      GOOGLE_TOKEN_URL=f'http://127.0.0.1:{server.server_address[1]}/token')
+    yield app
+    server.shutdown()
+
+
+def make_user(expires_at):
+    return SimpleNamespace(id=1, google_access_token='old', google_refresh_token='refresh',
+                           google_token_expires_at=expires_at)
+
+
+def test_valid_token_is_used_without_refresh(token_app):
+    manager = InMemoryTokenManager(margin=300)
+    user = make_user(datetime.utcnow() + timedelta(hours=1))
+    with token_app.app_context():
+        assert manager.get_access_token(user) == 'old'
+    assert FakeTokenEndpoint.calls == 0
+
+
+def test_refreshes_ahead_of_expiry_once_for_concurrent_callers(token_app):
+    manager = InMemoryTokenManager(margin=300)
+    user = make_user(datetime.utcnow() + timedelta(seconds=60))  # inside the margin
+    results = []
+
+    def call():
+        with token_app.app_context():
+            results.append(manager.get_access_token(user))
+
+    threads = [threading.Thread(target=call) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert FakeTokenEndpoint.calls == 1
+    assert results == ['fresh-1'] * 8
+    assert user.google_token_expires_at > datetime.utcnow() + timedelta(minutes=55)
+
+
+def test_renew_after_a_401_refreshes_once_for_concurrent_callers(token_app):
+    manager = InMemoryTokenManager(margin=300, stripes=4)
+    user = make_user(datetime.utcnow() + timedelta(hours=1))
+    results = []
+
+    def call():
+        with token_app.app_context():
+            results.append(manager.renew(user, 'old'))
+
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert FakeTokenEndpoint.calls == 1
+    assert results == ['fresh-1'] * 6
+    # Locks are striped: a fixed number however many users come through
+    assert len(manager._locks) == 4 and manager._user_lock(5) is manager._user_lock(1)
+
+
+def test_availability_retries_once_after_a_401(app, client, auth_headers, monkeypatch):
+    from app.extensions import db
+    from app.models import User
+    from app.routes import calendar
+    from app.services.google_tokens import token_manager
+
+    with app.app_context():
+        user = User.query.filter_by(email='user@example.com').first()
+        user.google_access_token, user.google_refresh_token = 'revoked', 'refresh'
+        user.google_token_expires_at = datetime.utcnow() + timedelta(hours=1)
+        db.session.commit()
+
+    seen = []
+
+    def lookup(user, token, time_min, time_max):
+        seen.append(token)
+        return (200, []) if token == 'renewed' else (401, None)
+
+    monkeypatch.setattr(calendar, 'lookup_busy_slots', lookup)
+    monkeypatch.setattr(token_manager, 'refresh', lambda user: 'renewed')
+    token_manager.forget(1)
+
+    response = client.get('/api/calendar/availability', headers=auth_headers)
+    assert response.status_code == 200
+    assert seen == ['revoked', 'renewed']
@@ -0,0 +1,53 @@
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app.extensions import db
+from app.models import User
+from app.services.identity import user_cache
+
+
+def count_queries(app, fn):
+    statements = []
+    with app.app_context():
+        engine = db.engine
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, 'before_cursor_execute', listener)
+    try:
+        response = fn()
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+    return response, len(statements)
+
+
+def test_owner_can_update_and_delete(client, auth_headers):
+    task = client.post('/api/tasks', json={'description': 'Draft'}, headers=auth_headers).get_json()
+
+    response = client.put(f"/api/tasks/{task['id']}", json={'status': 'Completed'}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'Completed'
+    assert client.delete(f"/api/tasks/{task['id']}", headers=auth_headers).status_code == 200
+
+
+def test_user_is_cached_and_invalidated_on_update(app, client, auth_headers):
+    client.get('/api/auth/me', headers=auth_headers)
+    response, queries = count_queries(app, lambda: client.get('/api/auth/me', headers=auth_headers))
+    assert response.get_json()['email'] == 'user@example.com'
+    assert queries == 0
+
+    with app.app_context():
+        User.query.filter_by(email='user@example.com').first().email = 'renamed@example.com'
+        db.session.commit()
+    assert client.get('/api/auth/me', headers=auth_headers).get_json()['email'] == 'renamed@example.com'
+
+
+def test_tokens_without_uid_claim_and_deleted_users(app, client, auth_headers):
+    with app.app_context():
+        user = User.query.filter_by(email='user@example.com').first()
+        legacy = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+    assert client.get('/api/auth/me', headers=legacy).status_code == 200
+
+    with app.app_context():
+        db.session.delete(User.query.filter_by(email='user@example.com').first())
+        db.session.commit()
+    assert user_cache.stats()['size'] == 0
+    assert client.get('/api/auth/me', headers=auth_headers).status_code == 401
@@ -0,0 +1,84 @@
+import threading
+import time
+
+import pytest
+
+from app.services.jobs import JobRunner, MemoryJobStore, QueueFullError, SqliteJobStore
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def runner(request):
+    store = MemoryJobStore() if request.param == 'memory' else SqliteJobStore(':memory:')
+    return JobRunner(workers=2, queue_size=4, store=store)
+
+
+def test_submit_returns_id_and_result_is_stored(runner):
+    job_id = runner.submit('suggest:1', 7, lambda x: {"value": x * 2}, 21)
+    runner.join()
+
+    job = runner.get(job_id)
+    assert job['status'] == 'finished'
+    assert job['result'] == {"value": 42}
+    assert job['owner'] == '7'
+
+
+def test_duplicate_submissions_are_coalesced(runner):
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        release.wait(5)
+        return {}
+
+    first = runner.submit('suggest:1', 7, slow)
+    second = runner.submit('suggest:1', 7, slow)
+    release.set()
+    runner.join()
+
+    assert first == second
+    assert len(calls) == 1
+    # Once finished, the same key starts fresh work
+    assert runner.submit('suggest:1', 7, slow) != first
+    runner.join()
+
+
+def test_failures_and_full_queue(runner):
+    def boom():
+        raise RuntimeError("upstream down")
+
+    job_id = runner.submit('suggest:2', 7, boom)
+    runner.join()
+    assert runner.get(job_id)['status'] == 'failed'
+    assert 'upstream down' in runner.get(job_id)['error']
+
+    release = threading.Event()
+    with pytest.raises(QueueFullError):
+        for i in range(10):
+            runner.submit(f'suggest:{i + 10}', 7, release.wait, 5)
+    release.set()
+    runner.join()
+
+
+def wait_for_job(client, headers, job_id):
+    deadline = time.monotonic() + 10
+    while True:
+        job = client.get(f'/api/ai/jobs/{job_id}', headers=headers).get_json()
+        if job['status'] in ('finished', 'failed') or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+
+def test_jobs_run_after_the_runner_is_reinitialised(app, client, auth_headers):
+    from app.services.jobs import job_runner
+
+    task = client.post('/api/tasks', json={'description': 'Write report', 'estimated_duration': 30},
+                       headers=auth_headers).get_json()
+    for attempt in range(2):
+        if attempt:
+            # What a second create_app in the same process does; the first workers are running
+            job_runner.init_app(app)
+        submitted = client.post('/api/ai/suggest/async', json={'task_id': task['id']}, headers=auth_headers)
+        assert submitted.status_code == 202
+        job = wait_for_job(client, auth_headers, submitted.get_json()['job_id'])
+        assert job['status'] == 'finished', job
@@ -0,0 +1,31 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask import Flask
+
+from app.services import json_provider
+
+
+def test_providers_encode_the_same_way():
+    payload = {'b': datetime(2026, 3, 2, 9, 30, 0, 250), 'a': date(2026, 3, 2), 'n': Decimal('1.5'),
+               1: 'int key', 'nested': [None, True, 'é']}
+    bodies = []
+    for name in ('stdlib', 'orjson'):
+        app = Flask(__name__)
+        app.config['JSON_PROVIDER'] = name
+        json_provider.init_app(app)
+        with app.app_context():
+            response = app.json.response(payload)
+            bodies.append(app.json.loads(response.get_data()))
+            assert app.json.loads(app.json.dumps({'x': 1})) == {'x': 1}
+
+    assert bodies[0] == bodies[1]
+    assert bodies[1]['b'] == '2026-03-02T09:30:00.000250'
+    assert bodies[1]['a'] == '2026-03-02'
+
+
+def test_app_uses_orjson(app, client, auth_headers):
+    assert isinstance(app.json, json_provider.OrjsonProvider)
+    task = client.post('/api/tasks', json={'description': 'Ship', 'deadline': '2026-03-02T09:30:00'},
+                       headers=auth_headers).get_json()
+    assert task['deadline'] == '2026-03-02T09:30:00'
@@ -0,0 +1,85 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.llm_cache import LLMResponseCache, fingerprint, llm_cache
+
+
+class FakeGemini(BaseHTTPRequestHandler):
+    """Replies with the next text in `replies` wrapped like generateContent."""
+    replies = []
+    calls = 0
+
+    def do_POST(self):
+        FakeGemini.calls += 1
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        text = FakeGemini.replies.pop(0)
+        body = json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def gemini(app):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGemini)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    FakeGemini.calls = 0
+    llm_cache.clear()
+    app.config['GEMINI_API_KEY'] = 'test'
+    app.config['GEMINI_API_URL'] = f'http://127.0.0.1:{server.server_address[1]}/generate'
+    app.config['AI_LLM_REASONS'] = True
+    yield
+    server.shutdown()
+
+
+def test_suggest_reuses_cached_reasons_and_skips_bad_answers(client, auth_headers, gemini):
+    task = client.post('/api/tasks', json={'description': 'Report', 'estimated_duration': 60},
+                       headers=auth_headers).get_json()
+    good = '```json {"reasons": ["Focus", "Focus", "Focus"]} ```'
+    FakeGemini.replies = ['not json at all', good]
+
+    def suggest():
+        response = client.post('/api/ai/suggest', json={'task_id': task['id']}, headers=auth_headers)
+        return [slot['reason'] for slot in response.get_json()['suggestions']['suggestions']]
+
+    # Unusable answer: the scheduler's own reasons, and nothing cached
+    assert 'Focus' not in suggest()
+    assert set(suggest()) == {'Focus'}
+    assert set(suggest()) == {'Focus'}
+
+    assert FakeGemini.calls == 2
+    assert llm_cache.stats()['hits'] == 1
+
+
+def test_cache_stats_need_the_metrics_token(app, client, auth_headers):
+    app.config['METRICS_TOKEN'] = 'scrape-me'
+    assert client.get('/api/ai/cache/stats', headers=auth_headers).status_code == 401
+    response = client.get('/api/ai/cache/stats', headers={'Authorization': 'Bearer scrape-me'})
+    assert response.status_code == 200
+    assert 'hits' in response.get_json()['llm_cache']
+
+
+def test_fingerprint_ignores_key_order():
+    assert fingerprint('x', a=1, b=2) == fingerprint('x', b=2, a=1)
+    assert fingerprint('x', a=1) != fingerprint('y', a=1)
+
+
+def test_persistence_and_eviction(tmp_path):
+    path = str(tmp_path / 'llm.sqlite')
+    cache = LLMResponseCache(maxsize=2, path=path)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.set('c', 3)
+
+    reopened = LLMResponseCache(maxsize=2, path=path)
+    assert reopened.get('a') is None
+    assert reopened.get('b') == 2
+    assert reopened.get('c') == 3
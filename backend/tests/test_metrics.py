@@ -0,0 +1,67 @@
+import logging
+import time
+
+import pytest
+
+from app.services.metrics import SlowRequestProfiler, metrics, profiler
+from tests.conftest import TestConfig
+
+
+def test_metrics_endpoint_reports_latency_and_sql_counts(client, auth_headers):
+    metrics.reset()
+    client.post('/api/tasks', json={'description': 'Measure me'}, headers=auth_headers)
+    client.get('/api/tasks', headers=auth_headers)
+
+    body = client.get('/metrics').get_data(as_text=True)
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_request_duration_seconds_count{endpoint="tasks.get_tasks",method="GET"} 1' in body
+    assert 'http_requests_total{endpoint="tasks.create_task",method="POST",status="201"} 1' in body
+    assert 'db_queries_total{endpoint="tasks.get_tasks"}' in body
+    assert 'cache_hits{cache="availability"}' in body
+
+
+def test_metrics_token(app, client):
+    app.config['METRICS_TOKEN'] = 'scrape-me'
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer scrape-me'}).status_code == 200
+
+
+def test_slow_requests_keep_their_hot_stacks(caplog):
+    profiler = SlowRequestProfiler(interval=0.001, threshold=0.05)
+    profiler.start()
+
+    def slow_handler():
+        time.sleep(0.1)
+
+    token = profiler.begin()
+    slow_handler()
+    with caplog.at_level(logging.WARNING):
+        profiler.end(token, 'tasks.get_tasks', 0.1, logging.getLogger('test'))
+
+    # Under the threshold: sampled, but nothing kept
+    profiler.end(profiler.begin(), 'tasks.get_task', 0.01)
+
+    assert [p['endpoint'] for p in profiler.recent] == ['tasks.get_tasks']
+    hottest = profiler.recent[0]['stacks'][0]
+    assert hottest['count'] > 1 and hottest['stack'][-1].endswith('slow_handler')
+    assert 'Slow request tasks.get_tasks' in caplog.text
+
+
+def test_failing_requests_are_counted_and_release_the_profiler():
+    from app import create_app
+
+    class ProfiledConfig(TestConfig):
+        PROFILE_SLOW_REQUESTS = True
+
+    app = create_app(ProfiledConfig)
+
+    @app.route('/boom')
+    def boom():
+        raise RuntimeError('boom')
+
+    metrics.reset()
+    with pytest.raises(RuntimeError):
+        app.test_client().get('/boom')
+
+    assert 'http_requests_total{endpoint="boom",method="GET",status="500"} 1' in metrics.render()
+    assert profiler._active == {}
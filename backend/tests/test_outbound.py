@@ -0,0 +1,84 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from requests import RequestException
+
+from app.services.outbound import CircuitOpenError, OutboundClient
+
+
+class FlakyUpstream(BaseHTTPRequestHandler):
+    """Answers with the next status from `statuses` (then 200)."""
+    protocol_version = 'HTTP/1.1'
+    statuses = []
+    calls = 0
+
+    def do_POST(self):
+        FlakyUpstream.calls += 1
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        status = FlakyUpstream.statuses.pop(0) if FlakyUpstream.statuses else 200
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def upstream():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyUpstream)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    FlakyUpstream.calls = 0
+    yield f'http://127.0.0.1:{server.server_address[1]}/'
+    server.shutdown()
+
+
+def make_client(**overrides):
+    client = OutboundClient()
+    client.backoff = 0
+    for key, value in overrides.items():
+        setattr(client, key, value)
+    return client
+
+
+def test_retries_transient_errors(upstream):
+    FlakyUpstream.statuses = [503, 502]
+    response = make_client(retries=2).post(upstream, json={})
+    assert response.status_code == 200
+    assert FlakyUpstream.calls == 3
+
+
+def test_non_idempotent_calls_are_not_resent(upstream):
+    FlakyUpstream.statuses = [503]
+    response = make_client(retries=2).post(upstream, json={}, idempotent=False)
+    assert response.status_code == 503
+    assert FlakyUpstream.calls == 1
+
+
+def test_breaker_opens_after_repeated_failures(upstream):
+    FlakyUpstream.statuses = [500] * 10
+    client = make_client(retries=0, breaker_threshold=3)
+    for _ in range(3):
+        client.post(upstream, json={})
+    # Existing `except RequestException` handlers catch an open breaker too
+    with pytest.raises(RequestException):
+        client.post(upstream, json={})
+    with pytest.raises(CircuitOpenError):
+        client.post(upstream, json={})
+    assert FlakyUpstream.calls == 3
+
+
+def test_init_app_reconfigures_existing_breakers(app, upstream):
+    FlakyUpstream.statuses = [500] * 10
+    client = make_client(retries=0, breaker_threshold=1)
+    client.post(upstream, json={})
+    with pytest.raises(CircuitOpenError):
+        client.post(upstream, json={})
+
+    app.config.update(OUTBOUND_BREAKER_THRESHOLD=3, OUTBOUND_RETRIES=0)
+    client.init_app(app)
+    for _ in range(3):
+        assert client.post(upstream, json={}).status_code == 500
+    assert client.breaker_for(upstream.split('/')[2]).threshold == 3
+    assert FlakyUpstream.calls == 4
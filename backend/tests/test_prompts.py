@@ -0,0 +1,60 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.services.prompts import (REASONS_PREFIX, SUGGESTION_PREFIX, estimate_tokens, free_windows, reasons_prompt,
+                                 suggestion_prompt)
+
+NOW = datetime(2026, 3, 2, 8, 0)  # a Monday, before working hours
+
+
+def task(**fields):
+    return SimpleNamespace(**dict({'description': 'Write report', 'priority': 'High',
+                                   'estimated_duration': 60, 'deadline': None}, **fields))
+
+
+def busy(start, end):
+    return {'start': start + 'Z', 'end': end + 'Z'}
+
+
+def test_busy_slots_become_merged_clipped_free_windows():
+    slots = [
+        busy('2026-03-02T07:00:00', '2026-03-02T10:00:00'),   # starts before working hours
+        busy('2026-03-02T09:30:00', '2026-03-02T11:00:00'),   # overlaps the first
+        busy('2026-03-02T11:30:00', '2026-03-02T12:00:00'),   # leaves a 30 min gap: too short for 60 min
+        busy('2026-03-02T16:00:00', '2026-03-02T20:00:00'),
+    ]
+    windows = free_windows(slots, NOW, days=1, min_minutes=60)
+    assert [(s.strftime('%H:%M'), e.strftime('%H:%M')) for s, e in windows[NOW.date()]] == [('12:00', '16:00')]
+
+    text, stats = suggestion_prompt(task(), slots, NOW, days=1)
+    assert text.startswith(SUGGESTION_PREFIX)
+    assert '2026-03-02: 12:00-16:00' in text and 'T07:00' not in text
+    assert stats == {'tokens': estimate_tokens(text), 'windows': 1, 'degraded': None}
+
+
+def test_dense_calendars_degrade_to_fit_the_budget():
+    # A 15 minute meeting every 45 minutes, all day, for a week
+    slots = [busy(f'2026-03-0{2 + d}T{h:02d}:{m:02d}:00', f'2026-03-0{2 + d}T{h:02d}:{m + 15:02d}:00')
+             for d in range(7) for h in range(9, 17) for m in (0, 30)]
+    full, stats = suggestion_prompt(task(estimated_duration=15), slots, NOW, days=7)
+    assert stats['degraded'] is None
+
+    budget = estimate_tokens(full) - 100
+    text, stats = suggestion_prompt(task(estimated_duration=15), slots, NOW, days=7, budget=budget)
+    assert stats['tokens'] <= budget and stats['degraded'] == 'windows'
+    assert 'Only the largest windows are listed' in text
+
+    text, stats = suggestion_prompt(task(description='x' * 5000), slots, NOW, days=7, budget=200)
+    assert stats['degraded'] == 'description' and 'x' * 201 not in text
+
+
+def test_reasons_prompt_lists_the_picked_slots():
+    slots = [{'start': '2026-03-02T09:00:00', 'end': '2026-03-02T10:00:00'},
+             {'start': '2026-03-03T14:30:00', 'end': '2026-03-03T15:30:00'}]
+    text, stats = reasons_prompt(task(), slots)
+    assert text.startswith(REASONS_PREFIX)
+    assert '1. 2026-03-02 09:00-10:00' in text and '2. 2026-03-03 14:30-15:30' in text
+    assert stats == {'tokens': estimate_tokens(text), 'slots': 2, 'degraded': None}
+
+    text, stats = reasons_prompt(task(description='x' * 5000), slots, budget=200)
+    assert stats['degraded'] == 'description' and 'x' * 201 not in text
@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pytest
+
+from app.services.recurrence import RecurrenceError, expansion_cache, format_rule, occurrences, parse_rule
+
+
+def test_parse_accepts_frontend_values_and_rrules():
+    assert format_rule(parse_rule('Weekly')) == 'FREQ=WEEKLY'
+    rule = parse_rule('RRULE:FREQ=DAILY;INTERVAL=2;UNTIL=20260105T090000Z')
+    assert rule == {'freq': 'DAILY', 'interval': 2, 'count': None, 'until': datetime(2026, 1, 5, 9)}
+    assert format_rule(parse_rule({'freq': 'monthly', 'count': 3})) == 'FREQ=MONTHLY;COUNT=3'
+    for bad in ('Yearly', 'FREQ=DAILY;BYDAY=MO', 'FREQ=DAILY;COUNT=2;UNTIL=20260101', 'FREQ=DAILY;INTERVAL=0'):
+        with pytest.raises(RecurrenceError):
+            parse_rule(bad)
+
+
+def test_occurrences_respect_count_until_and_window():
+    start = datetime(2026, 1, 1, 9)
+    assert list(occurrences('FREQ=DAILY;COUNT=3', start)) == [
+        datetime(2026, 1, 1, 9), datetime(2026, 1, 2, 9), datetime(2026, 1, 3, 9)]
+    # COUNT counts from dtstart, not from the window
+    assert list(occurrences('FREQ=DAILY;COUNT=3', start, start=datetime(2026, 1, 2))) == [
+        datetime(2026, 1, 2, 9), datetime(2026, 1, 3, 9)]
+    assert list(occurrences('FREQ=WEEKLY;UNTIL=20260115T090000', start)) == [
+        datetime(2026, 1, 1, 9), datetime(2026, 1, 8, 9), datetime(2026, 1, 15, 9)]
+    # Months without a 31st are skipped, as in RRULE
+    assert [d.month for d in occurrences('FREQ=MONTHLY;COUNT=4', datetime(2026, 1, 31))] == [1, 3, 5, 7]
+
+
+def test_far_window_jumps_instead_of_iterating():
+    start = datetime(2000, 1, 1, 8)
+    window = occurrences('FREQ=DAILY', start, datetime(2100, 1, 1), datetime(2100, 1, 3))
+    assert list(window) == [datetime(2100, 1, 1, 8), datetime(2100, 1, 2, 8)]
+
+
+def test_recurrence_endpoint_and_cache_invalidation(client, auth_headers):
+    task = client.post('/api/tasks', json={'description': 'Standup', 'deadline': '2026-01-01T09:00:00',
+                                           'recurrence': 'Daily'}, headers=auth_headers).get_json()
+    assert task['recurrence_rule'] == 'FREQ=DAILY'
+    # The list sends the rule too, and fields= can select it
+    listed = client.get('/api/tasks?fields=id,recurrence_rule', headers=auth_headers).get_json()
+    assert listed == [{'id': task['id'], 'recurrence_rule': 'FREQ=DAILY'}]
+
+    url = f"/api/tasks/{task['id']}/occurrences?start=2026-01-01T00:00:00&end=2027-01-01T00:00:00"
+    year = client.get(url, headers=auth_headers).get_json()
+    assert len(year['occurrences']) == 365 and not year['truncated']
+    client.get(url, headers=auth_headers)
+    assert expansion_cache.stats()['hits'] == 1
+
+    response = client.post(f"/api/tasks/{task['id']}/recurrence",
+                           json={'recurrence': 'FREQ=WEEKLY;COUNT=2'}, headers=auth_headers)
+    assert response.status_code == 200
+    assert expansion_cache.stats()['size'] == 0
+    assert client.get(url, headers=auth_headers).get_json()['occurrences'] == [
+        '2026-01-01T09:00:00', '2026-01-08T09:00:00']
+
+    assert client.post(f"/api/tasks/{task['id']}/recurrence", json={'recurrence': 'Hourly'},
+                       headers=auth_headers).status_code == 400
+    cleared = client.post(f"/api/tasks/{task['id']}/recurrence", json={'recurrence': None}, headers=auth_headers)
+    assert cleared.get_json()['task']['recurrence_rule'] is None
+
+
+def test_bulk_delete_drops_cached_expansions(client, auth_headers):
+    task = client.post('/api/tasks', json={'description': 'Standup', 'deadline': '2026-01-01T09:00:00',
+                                           'recurrence': 'Daily'}, headers=auth_headers).get_json()
+    url = f"/api/tasks/{task['id']}/occurrences?start=2026-01-01T00:00:00&end=2026-02-01T00:00:00"
+    client.get(url, headers=auth_headers)
+    assert expansion_cache.stats()['size'] == 1
+
+    client.post('/api/tasks/bulk', json={'operations': [{'op': 'delete', 'id': task['id']}]}, headers=auth_headers)
+    assert expansion_cache.stats()['size'] == 0
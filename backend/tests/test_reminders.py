@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+
+from app.extensions import db
+from app.models import Task
+from app.services.reminders import ReminderIndex, reminder_scheduler
+
+
+class Recorder:
+    def __init__(self):
+        self.sent = []
+
+    def deliver(self, reminder):
+        self.sent.append(reminder)
+
+
+def test_index_replaces_without_rebuilding():
+    base = datetime(2026, 1, 1, 9)
+    index = ReminderIndex()
+    index.add_many([(1, base + timedelta(minutes=5)), (2, base + timedelta(minutes=1)),
+                    (1, base + timedelta(minutes=3))])
+    index.replace(2, [base + timedelta(minutes=10)])
+    index.replace(1, [])
+
+    assert len(index) == 1
+    assert index.next_due() == base + timedelta(minutes=10)
+    assert index.pop_due(base + timedelta(minutes=9)) == []
+    assert index.pop_due(base + timedelta(hours=1)) == [(base + timedelta(minutes=10), 2)]
+    assert len(index) == 0
+
+
+def test_reminders_follow_edits_and_fire_once(app, client, auth_headers):
+    recorder = Recorder()
+    reminder_scheduler.delivery = recorder
+    reminder_scheduler.workers = 0
+
+    now = datetime.utcnow().replace(microsecond=0)
+    deadline = now + timedelta(hours=2)
+    task = client.post('/api/tasks', json={'description': 'Dentist', 'deadline': deadline.isoformat(),
+                                           'reminder_minutes': 30}, headers=auth_headers).get_json()
+    assert task['reminder_minutes'] == 30
+    listed = client.get('/api/tasks?fields=id,reminder_minutes', headers=auth_headers).get_json()
+    assert listed == [{'id': task['id'], 'reminder_minutes': 30}]
+
+    with app.app_context():
+        assert reminder_scheduler.load(now, now + timedelta(hours=6)) == 1
+
+    # Edits after the load update the index in place
+    daily = client.post('/api/tasks', json={'description': 'Standup', 'deadline': deadline.isoformat()},
+                        headers=auth_headers).get_json()
+    client.post(f"/api/tasks/{daily['id']}/recurrence", json={'recurrence': 'Daily', 'reminder_minutes': 10},
+                headers=auth_headers)
+    client.put(f"/api/tasks/{task['id']}", json={'reminder_minutes': 60}, headers=auth_headers)
+    assert reminder_scheduler.index.next_due() == deadline - timedelta(minutes=60)
+    assert len(reminder_scheduler.index) == 2
+
+    with app.app_context():
+        assert reminder_scheduler.run_pending(now + timedelta(hours=3)) == 2
+        assert db.session.get(Task, task['id']).reminder_sent_through == deadline - timedelta(minutes=60)
+        # A restart reloading the same window does not send them again
+        reminder_scheduler.index.clear()
+        assert reminder_scheduler.load(now, now + timedelta(hours=6)) == 0
+
+    assert sorted(r.description for r in recorder.sent) == ['Dentist', 'Standup']
+    assert client.put(f"/api/tasks/{task['id']}", json={'reminder_minutes': -5},
+                      headers=auth_headers).status_code == 400
+
+
+def test_completed_tasks_are_dropped(app, client, auth_headers):
+    recorder = Recorder()
+    reminder_scheduler.delivery = recorder
+    reminder_scheduler.workers = 0
+
+    now = datetime.utcnow()
+    task = client.post('/api/tasks', json={'description': 'Call bank', 'reminder_minutes': 0,
+                                           'deadline': (now + timedelta(hours=1)).isoformat()},
+                       headers=auth_headers).get_json()
+    with app.app_context():
+        reminder_scheduler.load(now, now + timedelta(hours=6))
+
+    client.post('/api/tasks/bulk', json={'operations': [
+        {'op': 'update', 'id': task['id'], 'data': {'status': 'Completed'}}]}, headers=auth_headers)
+    assert len(reminder_scheduler.index) == 0
+    with app.app_context():
+        assert reminder_scheduler.run_pending(now + timedelta(hours=2)) == 0
+
+
+def test_an_edit_during_a_load_wins_over_the_rows_it_read(app, client, auth_headers, monkeypatch):
+    now = datetime.utcnow().replace(microsecond=0)
+    deadline = now + timedelta(hours=2)
+    task = client.post('/api/tasks', json={'description': 'Dentist', 'deadline': deadline.isoformat(),
+                                           'reminder_minutes': 30}, headers=auth_headers).get_json()
+
+    read = reminder_scheduler._read_entries
+
+    def read_then_edit(start, end):
+        entries = read(start, end)
+        # Committed after the rows were read, before they reach the index
+        client.put(f"/api/tasks/{task['id']}", json={'reminder_minutes': 60}, headers=auth_headers)
+        return entries
+
+    monkeypatch.setattr(reminder_scheduler, '_read_entries', read_then_edit)
+    with app.app_context():
+        reminder_scheduler.load(now, now + timedelta(hours=6))
+
+    assert len(reminder_scheduler.index) == 1
+    assert reminder_scheduler.index.next_due() == deadline - timedelta(minutes=60)
+
+
+def test_only_one_scheduler_holds_the_leader_lock(tmp_path):
+    from app.services.reminders import ReminderScheduler
+
+    first, second = ReminderScheduler(), ReminderScheduler()
+    first.leader_lock = second.leader_lock = str(tmp_path / 'reminders.lock')
+    assert first.is_leader()
+    assert not second.is_leader()
+
+    first.stop()
+    assert second.is_leader()
+    second.stop()
@@ -0,0 +1,100 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from app.services.scheduler import find_slots, free_intervals, merge_intervals, plan_tasks
+
+NOW = datetime(2024, 3, 4, 8, 0)  # Monday, before working hours
+
+
+def make_task(priority='Medium', duration=60, deadline=None):
+    return SimpleNamespace(description='Write report', priority=priority,
+                           estimated_duration=duration, deadline=deadline)
+
+
+def test_merge_intervals_joins_overlaps():
+    a = datetime(2024, 3, 4, 9)
+    b = datetime(2024, 3, 4, 10)
+    c = datetime(2024, 3, 4, 11)
+    d = datetime(2024, 3, 4, 12)
+    assert merge_intervals([(c, d), (a, b), (b, c)]) == [(a, d)]
+
+
+def test_free_intervals_respects_working_hours():
+    busy = [(datetime(2024, 3, 4, 10), datetime(2024, 3, 4, 11))]
+    free = free_intervals(busy, NOW, datetime(2024, 3, 5, 0))
+    assert free == [
+        (datetime(2024, 3, 4, 9), datetime(2024, 3, 4, 10)),
+        (datetime(2024, 3, 4, 11), datetime(2024, 3, 4, 17)),
+    ]
+
+
+def test_find_slots_avoids_busy_and_does_not_overlap():
+    busy = [
+        {"start": "2024-03-04T09:00:00Z", "end": "2024-03-04T12:00:00Z"},
+        {"start": "2024-03-05T09:30:00Z", "end": "2024-03-05T16:00:00Z"},
+    ]
+    slots = find_slots(make_task(), busy, now=NOW)
+
+    assert len(slots) == 3
+    spans = [(datetime.fromisoformat(s['start']), datetime.fromisoformat(s['end'])) for s in slots]
+    for start, end in spans:
+        assert 9 <= start.hour and (end.hour < 17 or (end.hour == 17 and end.minute == 0))
+        assert not (datetime(2024, 3, 4, 9) <= start < datetime(2024, 3, 4, 12))
+    for i, (s1, e1) in enumerate(spans):
+        for s2, e2 in spans[i + 1:]:
+            assert e1 <= s2 or e2 <= s1
+
+
+def test_high_priority_prefers_mornings():
+    busy = [{"start": "2024-03-04T09:00:00Z", "end": "2024-03-04T13:00:00Z"}]
+    slots = find_slots(make_task(priority='High'), busy, now=NOW)
+    assert datetime.fromisoformat(slots[0]['start']).hour < 12
+    assert slots[0]['start'].startswith('2024-03-05')
+
+
+def test_full_calendar_returns_nothing():
+    busy = [{"start": "2024-03-04T00:00:00Z", "end": "2024-03-08T00:00:00Z"}]
+    assert find_slots(make_task(), busy, now=NOW) == []
+
+
+def test_plan_tasks_packs_without_overlap_in_priority_order():
+    tasks = [
+        SimpleNamespace(id=i, description=f'Task {i}', priority=p,
+                        estimated_duration=90, deadline=None)
+        for i, p in enumerate(['Low', 'High', 'Medium'] * 6)
+    ]
+    busy = [{"start": "2024-03-04T12:00:00Z", "end": "2024-03-04T13:00:00Z"}]
+    plan, unscheduled = plan_tasks(tasks, busy, now=NOW, days=3)
+
+    assert len(plan) + len(unscheduled) == len(tasks)
+    spans = sorted((datetime.fromisoformat(p['start']), datetime.fromisoformat(p['end'])) for p in plan)
+    for (s1, e1), (s2, e2) in zip(spans, spans[1:]):
+        assert e1 <= s2
+    for start, end in spans:
+        assert not (start < datetime(2024, 3, 4, 13) and datetime(2024, 3, 4, 12) < end)
+
+    # Everything High fits, the leftovers are the lowest priority ones
+    by_id = {t.id: t for t in tasks}
+    assert all(by_id[p['task_id']].priority == 'High' for p in plan if p['start'] < '2024-03-04T12')
+    assert all(by_id[u['task_id']].priority == 'Low' for u in unscheduled)
+
+
+def test_users_working_hours_and_timezone_are_used():
+    from zoneinfo import ZoneInfo
+    from app.services.timeline import working_intervals
+
+    preferences = {'timezone': 'America/New_York', 'working_hours': {'start': '08:00', 'end': '12:00', 'days': [0]}}
+    hours = working_intervals(preferences, datetime(2024, 3, 4), datetime(2024, 3, 8))
+    tz = ZoneInfo('America/New_York')
+
+    # Monday 08:00-12:00 New York is 13:00-17:00 UTC; nothing on the other days
+    slots = find_slots(make_task(priority='High'), [], now=NOW, hours=hours, tz=tz)
+    assert [s['start'] for s in slots] == ['2024-03-04T13:00:00', '2024-03-04T14:00:00', '2024-03-04T15:00:00']
+    assert slots[0]['reason'] == "Morning slot for peak focus and deep work"
+
+    tasks = [SimpleNamespace(id=i, description=f'Task {i}', priority='High', estimated_duration=120, deadline=None)
+             for i in range(3)]
+    plan, unscheduled = plan_tasks(tasks, [], now=NOW, hours=hours, tz=tz)
+    assert [(p['start'], p['end']) for p in plan] == [('2024-03-04T13:00:00', '2024-03-04T15:00:00'),
+                                                     ('2024-03-04T15:00:00', '2024-03-04T17:00:00')]
+    assert [u['task_id'] for u in unscheduled] == [2]
@@ -0,0 +1,78 @@
+import os
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sqlalchemy import inspect
+
+from app.extensions import db
+from tests.conftest import TestConfig
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_fast_startup_leaves_alembic_and_requests_unloaded():
+    code = (
+        "import sys\n"
+        "from tests.conftest import TestConfig\n"
+        "from app import create_app\n"
+        "create_app(type('Fast', (TestConfig,), {'FAST_STARTUP': True}))\n"
+        "print(','.join(m for m in ('alembic', 'flask_migrate', 'requests') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=BACKEND, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ''
+
+
+def test_init_db_command_creates_the_schema(tmp_path):
+    from app import create_app
+
+    config = type('Fast', (TestConfig,), {'FAST_STARTUP': True,
+                                          'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'cold.db'}"})
+    app = create_app(config)
+    assert 'migrate' not in app.extensions
+
+    result = app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert {'users', 'tasks', 'alembic_version'} <= set(inspect(db.engine).get_table_names())
+
+
+class Upstream(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    heads = 0
+
+    def do_HEAD(self):
+        Upstream.heads += 1
+        self.send_response(404)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_first_request_warms_pools_in_the_background():
+    from app import create_app
+    from app.services.outbound import outbound
+    from app.services.warmup import pool_warmer
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Upstream)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+    app = create_app(type('Warm', (TestConfig,), {
+        'WARMUP_ENABLED': True, 'WARMUP_URLS': [f'{url}/token', f'{url}/freeBusy'], 'WARMUP_DB_CONNECTIONS': 2}))
+    try:
+        assert pool_warmer.result is None
+        app.test_client().get('/api/tasks')
+        result = pool_warmer.wait(timeout=10)
+        assert result['db_connections'] == 2
+        assert result['hosts'] == [f'{url}/']
+        assert Upstream.heads == 1
+        assert url.split('//')[1] not in outbound.breakers
+
+        # Only once per process
+        app.test_client().get('/api/tasks')
+        assert pool_warmer.wait(timeout=10) is result
+    finally:
+        server.shutdown()
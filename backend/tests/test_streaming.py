@@ -0,0 +1,81 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.services.json_stream import JSONStreamParser, parse_json_text
+from app.services.llm_cache import llm_cache
+
+ANSWER = '```json\n{"suggestions": [{"start": "2030-01-01T09:00:00", "reason": "Peak focus {morning}"},' \
+         ' {"start": "2030-01-01T14:00:00", "reason": "Quiet \\"afternoon\\""}]}\n```'
+
+
+def test_parser_emits_items_as_they_complete():
+    parser = JSONStreamParser(items_key='suggestions')
+    seen = []
+    for i in range(0, len(ANSWER), 5):
+        seen += [(i, item['start']) for item in parser.feed(ANSWER[i:i + 5])]
+
+    assert [start for _, start in seen] == ['2030-01-01T09:00:00', '2030-01-01T14:00:00']
+    # The first item is out before the second one has even started
+    assert seen[0][0] < ANSWER.index('2030-01-01T14')
+    assert parser.done
+    assert parse_json_text(ANSWER)['suggestions'][1]['reason'] == 'Quiet "afternoon"'
+
+
+def test_incomplete_json_is_rejected():
+    with pytest.raises(ValueError):
+        parse_json_text('{"suggestions": [{"start": ')
+
+
+class FakeGeminiStream(BaseHTTPRequestHandler):
+    """Sends ANSWER in small chunks as streamGenerateContent SSE frames."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.end_headers()
+        for i in range(0, len(ANSWER), 16):
+            frame = {"candidates": [{"content": {"parts": [{"text": ANSWER[i:i + 16]}]}}]}
+            self.wfile.write(f"data: {json.dumps(frame)}\r\n\r\n".encode())
+            self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+def read_events(response):
+    events = []
+    for block in response.get_data(as_text=True).strip().split('\n\n'):
+        name, data = block.split('\n')
+        events.append((name[len('event: '):], json.loads(data[len('data: '):])))
+    return events
+
+
+def test_stream_relays_gemini_suggestions(app, client, auth_headers):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGeminiStream)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    app.config['GEMINI_API_KEY'] = 'key'
+    app.config['GEMINI_STREAM_URL'] = f'http://127.0.0.1:{server.server_address[1]}/stream'
+    llm_cache.clear()
+
+    task = client.post('/api/tasks', json={'description': 'Write report'}, headers=auth_headers).get_json()
+    response = client.post('/api/ai/suggest/stream', json={'task_id': task['id']}, headers=auth_headers)
+    server.shutdown()
+
+    assert response.mimetype == 'text/event-stream'
+    events = read_events(response)
+    assert [name for name, _ in events] == ['suggestion', 'suggestion', 'done']
+    assert events[0][1]['reason'] == 'Peak focus {morning}'
+    assert events[-1][1] == {"count": 2, "source": "llm"}
+
+
+def test_stream_falls_back_to_local_slots(client, auth_headers):
+    task = client.post('/api/tasks', json={'description': 'Write report'}, headers=auth_headers).get_json()
+    response = client.post('/api/ai/suggest/stream', json={'task_id': task['id']}, headers=auth_headers)
+
+    events = read_events(response)
+    assert events[-1][1]['source'] == 'local'
+    assert all(name == 'suggestion' and 'end' in data for name, data in events[:-1])
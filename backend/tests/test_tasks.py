@@ -0,0 +1,190 @@
+from datetime import datetime
+
+from app.extensions import db
+from app.models import Task, TaskTombstone
+
+
+def create_tasks(client, headers):
+    specs = [
+        ('Write report', 'High', '2024-03-05T10:00:00'),
+        ('Email team', 'Low', None),
+        ('Plan sprint', 'Medium', '2024-03-04T09:00:00'),
+        ('Review PR', 'High', '2024-03-05T10:00:00'),
+        ('Book flights', 'Low', '2024-03-10T12:00:00'),
+    ]
+    for description, priority, deadline in specs:
+        body = {'description': description, 'priority': priority, 'estimated_duration': 30}
+        if deadline:
+            body['deadline'] = deadline
+        assert client.post('/api/tasks', json=body, headers=headers).status_code == 201
+
+
+def test_unpaged_list_keeps_the_old_shape(client, auth_headers):
+    create_tasks(client, auth_headers)
+    tasks = client.get('/api/tasks', headers=auth_headers).get_json()
+    assert len(tasks) == 5
+    assert set(tasks[0]) == {'id', 'description', 'priority', 'deadline', 'estimated_duration',
+                             'status', 'scheduled_start', 'scheduled_end', 'recurrence_rule',
+                             'reminder_minutes'}
+
+
+def test_keyset_pages_cover_every_row_once(client, auth_headers):
+    create_tasks(client, auth_headers)
+    seen = []
+    cursor = None
+    while True:
+        url = '/api/tasks?limit=2&sort=deadline&fields=id,deadline'
+        if cursor:
+            url += f'&cursor={cursor}'
+        page = client.get(url, headers=auth_headers).get_json()
+        seen.extend(page['items'])
+        cursor = page['next_cursor']
+        if not cursor:
+            break
+
+    assert [t['id'] for t in seen] == [3, 1, 4, 5, 2]  # deadline order, NULL last
+    assert set(seen[0]) == {'id', 'deadline'}
+
+
+def test_filters_and_validation(client, auth_headers):
+    create_tasks(client, auth_headers)
+    high = client.get('/api/tasks?priority=High&fields=description', headers=auth_headers).get_json()
+    assert sorted(t['description'] for t in high) == ['Review PR', 'Write report']
+
+    ranged = client.get('/api/tasks?deadline_from=2024-03-05T00:00:00&deadline_to=2024-03-06T00:00:00'
+                        '&sort=-id&fields=id', headers=auth_headers).get_json()
+    assert ranged == [{'id': 4}, {'id': 1}]
+
+    assert client.get('/api/tasks?fields=password', headers=auth_headers).status_code == 400
+    assert client.get('/api/tasks?limit=2&cursor=nope', headers=auth_headers).status_code == 400
+
+
+def test_etag_and_delta_sync(app, client, auth_headers):
+    create_tasks(client, auth_headers)
+    first = client.get('/api/tasks', headers=auth_headers)
+    etag = first.headers['ETag']
+    version = int(first.headers['X-Task-Version'])
+    assert version == 5
+
+    unchanged = client.get('/api/tasks', headers={**auth_headers, 'If-None-Match': etag})
+    assert unchanged.status_code == 304
+
+    # Any ORM write bumps the version (routes, calendar scheduling, ...)
+    with app.app_context():
+        db.session.get(Task, 2).status = 'Completed'
+        db.session.delete(db.session.get(Task, 3))
+        db.session.commit()
+
+    changed = client.get('/api/tasks', headers={**auth_headers, 'If-None-Match': etag})
+    assert changed.status_code == 200
+
+    delta = client.get(f'/api/tasks?since={version}', headers=auth_headers).get_json()
+    assert delta['version'] > version
+    assert [t['id'] for t in delta['changed']] == [2]
+    assert delta['deleted'] == [3]
+
+
+def test_delta_after_pruned_tombstones_is_a_full_resync(app, client, auth_headers):
+    create_tasks(client, auth_headers)
+    client.delete('/api/tasks/1', headers=auth_headers)
+    version = int(client.get('/api/tasks', headers=auth_headers).headers['X-Task-Version'])
+    assert client.get(f'/api/tasks?since={version - 1}', headers=auth_headers).get_json()['deleted'] == [1]
+
+    # Age the tombstone past the retention window; the next delete prunes it
+    with app.app_context():
+        TaskTombstone.query.update({'deleted_at': datetime(2000, 1, 1)})
+        db.session.commit()
+    client.delete('/api/tasks/2', headers=auth_headers)
+
+    stale = client.get(f'/api/tasks?since={version - 1}', headers=auth_headers).get_json()
+    assert stale['full_resync'] is True
+    assert stale['deleted'] == [] and [t['id'] for t in stale['changed']] == [3, 4, 5]
+
+    fresh = client.get(f'/api/tasks?since={version}', headers=auth_headers).get_json()
+    assert fresh['full_resync'] is False and fresh['deleted'] == [2] and fresh['changed'] == []
+
+
+def test_delta_does_not_report_a_reused_id_as_deleted(client, auth_headers):
+    create_tasks(client, auth_headers)
+    client.delete('/api/tasks/5', headers=auth_headers)
+    # SQLite hands out the highest freed rowid again
+    reused = client.post('/api/tasks', json={'description': 'New'}, headers=auth_headers).get_json()
+    assert reused['id'] == 5
+
+    delta = client.get('/api/tasks?since=5', headers=auth_headers).get_json()
+    assert [t['id'] for t in delta['changed']] == [5]
+    assert delta['deleted'] == []
+
+
+def test_bulk_mixed_batch(client, auth_headers):
+    create_tasks(client, auth_headers)
+    response = client.post('/api/tasks/bulk', headers=auth_headers, json={'operations': [
+        {'op': 'create', 'data': {'description': 'Imported', 'deadline': '2024-04-01T09:00:00'}},
+        {'op': 'update', 'id': 1, 'data': {'status': 'Completed'}},
+        {'op': 'delete', 'id': 2},
+        {'op': 'update', 'id': 999, 'data': {'status': 'Completed'}},
+        {'op': 'create', 'data': {}},
+        {'op': 'rename'},
+    ]})
+    body = response.get_json()
+
+    assert [r['status'] for r in body['results']] == [201, 200, 200, 404, 400, 400]
+    assert body['applied'] == 3
+    assert body['results'][0]['task']['deadline'] == '2024-04-01T09:00:00'
+
+    tasks = {t['id']: t for t in client.get('/api/tasks', headers=auth_headers).get_json()}
+    assert 2 not in tasks
+    assert tasks[1]['status'] == 'Completed'
+    assert tasks[body['results'][0]['id']]['description'] == 'Imported'
+
+    delta = client.get('/api/tasks?since=5', headers=auth_headers).get_json()
+    assert delta['deleted'] == [2]
+    assert sorted(t['id'] for t in delta['changed']) == [1, 6]
+
+
+def test_bulk_rejects_ids_that_are_not_integers(client, auth_headers):
+    create_tasks(client, auth_headers)
+    response = client.post('/api/tasks/bulk', headers=auth_headers, json={'operations': [
+        {'op': 'update', 'id': [1], 'data': {'status': 'Completed'}},
+        {'op': 'delete', 'id': {'id': 2}},
+        {'op': 'delete', 'id': True},
+        {'op': 'delete', 'id': 3},
+    ]})
+    assert response.status_code == 200
+    assert [r['status'] for r in response.get_json()['results']] == [400, 400, 400, 200]
+    assert len(client.get('/api/tasks', headers=auth_headers).get_json()) == 4
+
+
+def test_bulk_rejects_invalid_fields_per_item(client, auth_headers):
+    create_tasks(client, auth_headers)
+    response = client.post('/api/tasks/bulk', headers=auth_headers, json={'operations': [
+        {'op': 'create', 'data': {'description': 'Bad date', 'deadline': 'next week'}},
+        {'op': 'create', 'data': {'description': 'Number date', 'deadline': 20240301}},
+        {'op': 'update', 'id': 1, 'data': {'estimated_duration': '60'}},
+        {'op': 'update', 'id': 2, 'data': {'status': ['Completed']}},
+        {'op': 'update', 'id': 3, 'data': {'description': ''}},
+        {'op': 'update', 'id': 4, 'data': {'deadline': '', 'estimated_duration': 30}},
+        {'op': 'create', 'data': {'description': 'Fine', 'deadline': '2024-03-01T09:00:00'}},
+    ]})
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [r['status'] for r in results] == [400, 400, 400, 400, 400, 200, 201]
+    assert results[0]['error'] == 'Invalid date format'
+    assert results[2]['error'] == 'estimated_duration must be a non-negative integer'
+
+    tasks = {t['id']: t for t in client.get('/api/tasks', headers=auth_headers).get_json()}
+    assert tasks[4]['deadline'] is None and tasks[4]['estimated_duration'] == 30
+    assert tasks[3]['description'] != ''
+
+
+def test_columnar_format(client, auth_headers):
+    create_tasks(client, auth_headers)
+    table = client.get('/api/tasks?fields=id,deadline&format=columns', headers=auth_headers).get_json()
+    assert table['fields'] == ['id', 'deadline']
+    assert table['rows'][:2] == [[1, '2024-03-05T10:00:00'], [2, None]]
+
+    page = client.get('/api/tasks?limit=2&sort=deadline&fields=description&format=columns',
+                      headers=auth_headers).get_json()
+    assert page['items'] == {'fields': ['description'], 'rows': [['Plan sprint'], ['Write report']]}
+    assert page['next_cursor']
+    assert client.get('/api/tasks?format=xml', headers=auth_headers).status_code == 400
@@ -0,0 +1,67 @@
+import random
+from datetime import datetime, timedelta
+
+from app.services.scheduler import merge_intervals
+from app.services.timeline import build_timeline, merge_busy, sweep, user_timezone, working_mask
+
+
+def test_sweep_merges_calendars_and_masks_working_hours():
+    day = datetime(2024, 3, 4)
+    primary = [(day.replace(hour=10), day.replace(hour=11)), (day.replace(hour=14), day.replace(hour=15))]
+    work = [(day.replace(hour=10, minute=30), day.replace(hour=12)), (day.replace(hour=7), day.replace(hour=8))]
+    mask = [(day.replace(hour=9), day.replace(hour=17))]
+
+    segments = sweep(primary + work, day.replace(hour=6), day.replace(hour=18), mask)
+    assert [(s.hour, e.hour, status) for s, e, status in segments] == [
+        (6, 7, 'off'), (7, 8, 'busy'), (8, 9, 'off'), (9, 10, 'free'), (10, 12, 'busy'),
+        (12, 14, 'free'), (14, 15, 'busy'), (15, 17, 'free'), (17, 18, 'off')]
+
+
+def test_merge_matches_sort_and_merge():
+    rng = random.Random(4)
+    base = datetime(2024, 1, 1)
+    for _ in range(20):
+        intervals = []
+        for _ in range(rng.randrange(0, 60)):
+            start = base + timedelta(minutes=15 * rng.randrange(200))
+            intervals.append((start, start + timedelta(minutes=15 * rng.randrange(0, 8))))
+        assert merge_busy(intervals) == merge_intervals([i for i in intervals if i[1] > i[0]])
+
+
+def test_mask_follows_local_time_across_dst():
+    # Europe/Berlin moves to summer time on 2024-03-31: 09:00 local is 08:00 UTC before, 07:00 after
+    tz = user_timezone({'timezone': 'Europe/Berlin'})
+    nine, five = datetime(2024, 1, 1, 9).time(), datetime(2024, 1, 1, 17).time()
+    mask = working_mask(datetime(2024, 3, 29), datetime(2024, 4, 2), tz, nine, five, {0, 1, 2, 3, 4})
+    assert mask == [(datetime(2024, 3, 29, 8), datetime(2024, 3, 29, 16)),
+                    (datetime(2024, 4, 1, 7), datetime(2024, 4, 1, 15))]
+
+
+def test_timeline_in_user_timezone():
+    preferences = {'timezone': 'America/New_York',
+                   'working_hours': {'start': '09:00', 'end': '12:00', 'days': [0]}}
+    busy = [{"start": "2024-03-04T15:00:00Z", "end": "2024-03-04T16:00:00Z"}]
+    result = build_timeline(busy, '2024-03-04T13:00:00Z', '2024-03-04T18:00:00Z', preferences)
+    assert result['timezone'] == 'America/New_York'
+    assert result['busy'] == [{"start": "2024-03-04T10:00:00-05:00", "end": "2024-03-04T11:00:00-05:00"}]
+    assert result['free'] == [{"start": "2024-03-04T09:00:00-05:00", "end": "2024-03-04T10:00:00-05:00"},
+                              {"start": "2024-03-04T11:00:00-05:00", "end": "2024-03-04T12:00:00-05:00"}]
+    assert [s['status'] for s in result['timeline']] == ['off', 'free', 'busy', 'free', 'off']
+
+
+def test_preferences_route(client, auth_headers):
+    defaults = client.get('/api/calendar/preferences', headers=auth_headers).get_json()
+    assert defaults == {'calendars': ['primary'], 'timezone': 'UTC',
+                        'working_hours': {'start': '09:00', 'end': '17:00', 'days': [0, 1, 2, 3, 4, 5, 6]}}
+
+    updated = client.put('/api/calendar/preferences', json={
+        'calendars': ['primary', 'team@group.calendar.google.com', 'primary'],
+        'timezone': 'Europe/Berlin', 'working_hours': {'start': '08:30', 'days': [4, 0]}
+    }, headers=auth_headers).get_json()
+    assert updated['calendars'] == ['primary', 'team@group.calendar.google.com']
+    assert updated['working_hours'] == {'start': '08:30', 'end': '17:00', 'days': [0, 4]}
+    assert client.get('/api/calendar/preferences', headers=auth_headers).get_json() == updated
+
+    for bad in ({'calendars': []}, {'timezone': 'Mars/Base'}, {'working_hours': {'start': '18:00'}},
+                {'working_hours': {'days': [7]}}):
+        assert client.put('/api/calendar/preferences', json=bad, headers=auth_headers).status_code == 400